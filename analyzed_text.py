@@ -0,0 +1,123 @@
+import re
+import bisect
+from functools import cached_property, lru_cache
+from readability import scores_from_counts, text_counts, word_syllables
+
+# 与分析器原先 re.findall(r'\b[a-zA-Z]+\b', text.lower()) 相同的词定义
+_WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+
+@lru_cache(maxsize=1)
+def load_nltk():
+    """首次使用时才导入 nltk（导入本身需一秒以上），并确认 punkt 与 stopwords 数据可用（缺失时下载）"""
+    import nltk
+
+    for resource, package in (('tokenizers/punkt', 'punkt'), ('corpora/stopwords', 'stopwords')):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package)
+    return nltk
+
+@lru_cache(maxsize=1)
+def english_stopwords():
+    """NLTK 英文停用词（只加载一次）"""
+    return frozenset(load_nltk().corpus.stopwords.words('english'))
+
+class AnalyzedText:
+    """一篇文本的分词结果，供难度分析、摘要与分类共用
+
+    小写文本在构造时生成；分句、分词、音节数、停用词标记与可读性计数在首次访问时计算并缓存，
+    同一篇文章无论被多少组件使用都只切分一次。各组件的文本参数既可以是 str，
+    也可以是 AnalyzedText（见 AnalyzedText.of）。
+    """
+
+    def __init__(self, text):
+        self.text = text or ''
+        self.lower = self.text.lower()
+
+    @classmethod
+    def of(cls, text):
+        """已是 AnalyzedText 时原样返回，否则包装 str"""
+        return text if isinstance(text, cls) else cls(text)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"<AnalyzedText {len(self.text)} chars>"
+
+    @cached_property
+    def token_count(self):
+        """按空白切分的词数（text.split() 的长度）"""
+        return len(self.text.split())
+
+    @cached_property
+    def sentence_spans(self):
+        """NLTK punkt 分句结果在原文中的 [(start, end)]"""
+        spans = []
+        position = 0
+        for sentence in load_nltk().sent_tokenize(self.text):
+            start = self.text.find(sentence, position)
+            if start < 0:
+                continue
+            position = start + len(sentence)
+            spans.append((start, position))
+        return spans
+
+    @cached_property
+    def sentences(self):
+        return [self.text[start:end] for start, end in self.sentence_spans]
+
+    @cached_property
+    def lower_sentences(self):
+        if len(self.lower) == len(self.text):
+            return [self.lower[start:end] for start, end in self.sentence_spans]
+        # 个别 Unicode 字符小写后长度会变，不能按原文位置切片
+        return [sentence.lower() for sentence in self.sentences]
+
+    @cached_property
+    def _word_matches(self):
+        return list(_WORD_RE.finditer(self.text))
+
+    @cached_property
+    def words(self):
+        """小写的英文单词（只含字母）"""
+        return [match.group().lower() for match in self._word_matches]
+
+    @cached_property
+    def word_sentences(self):
+        """每个单词所在句子的序号，与 words 等长"""
+        starts = [start for start, _ in self.sentence_spans]
+        return [max(bisect.bisect_right(starts, match.start()) - 1, 0) for match in self._word_matches]
+
+    @cached_property
+    def words_by_sentence(self):
+        """按句分组的单词，与 sentences 等长"""
+        groups = [[] for _ in self.sentence_spans]
+        if groups:
+            for word, sentence in zip(self.words, self.word_sentences):
+                groups[sentence].append(word)
+        return groups
+
+    @cached_property
+    def syllables(self):
+        """每个单词的音节数，与 words 等长"""
+        return [word_syllables(word) for word in self.words]
+
+    @cached_property
+    def stopword_mask(self):
+        """每个单词是否为停用词，与 words 等长"""
+        stop_words = english_stopwords()
+        return [word in stop_words for word in self.words]
+
+    @cached_property
+    def readability_counts(self):
+        """可读性公式共用的计数（见 readability.text_counts）"""
+        return text_counts(self.text)
+
+    @cached_property
+    def readability(self):
+        """可读性指标，另含 counts（与 readability.readability 的结果相同）"""
+        scores = scores_from_counts(self.readability_counts)
+        scores['counts'] = self.readability_counts
+        return scores
@@ -1,27 +1,121 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 import json
+import time
+import threading
 from datetime import datetime
 import os
 
-from database import DatabaseManager
-from crawler import ArticleCrawler
+from database import DatabaseManager, ARTICLE_FIELDS, ARTICLE_LIST_FIELDS, ARTICLE_DETAIL_FIELDS
 from difficulty_analyzer import DifficultyAnalyzer
 from summarizer import ArticleSummarizer
 from classifier import ArticleClassifier
+from pipeline import (
+    ArticlePipeline, cached_difficulty, cached_summary, cached_classification, cached_classification_batch
+)
+from processor import ArticleProcessor
+from result_cache import ResultCache
+from trainer import ClassifierTrainer, DEFAULT_MODEL_PATH
+from jobs import JobQueue, is_finished
 
 app = Flask(__name__)
 CORS(app)
 
+class LazyComponent:
+    """首次访问属性时才创建的组件（线程安全）
+
+    爬虫与 NLP 组件的创建（及其导入的 nltk、sumy、sklearn 等）推迟到第一个用到它们的请求，
+    import app 与 gunicorn worker 启动不再为此等待；需要时可调用 warmup() 提前完成。
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self):
+        return self._instance is not None
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+def _create_crawler():
+    from crawler import ArticleCrawler
+    return ArticleCrawler()
+
+def _create_classifier():
+    """创建分类器并加载已保存的模型（训练完成后由 classifier_trainer 热替换）"""
+    instance = ArticleClassifier()
+    ClassifierTrainer(instance, db, model_path=CLASSIFIER_MODEL_PATH).load()
+    return instance
+
 # 初始化组件
-db = DatabaseManager()
-crawler = ArticleCrawler()
-difficulty_analyzer = DifficultyAnalyzer()
-summarizer = ArticleSummarizer()
-classifier = ArticleClassifier()
+db = DatabaseManager(pool_size=int(os.environ.get('DB_POOL_SIZE', 5)))
+CLASSIFIER_MODEL_PATH = os.environ.get('CLASSIFIER_MODEL_PATH', DEFAULT_MODEL_PATH)
+crawler = LazyComponent(_create_crawler)
+difficulty_analyzer = LazyComponent(DifficultyAnalyzer)
+summarizer = LazyComponent(ArticleSummarizer)
+classifier = LazyComponent(_create_classifier)
+# 分析结果缓存：进程内 LRU + SQLite 持久层（ANALYSIS_CACHE_PERSISTENT=0 时只用内存）
+analysis_cache = ResultCache(
+    max_entries=int(os.environ.get('ANALYSIS_CACHE_SIZE', 1024)),
+    db=db if os.environ.get('ANALYSIS_CACHE_PERSISTENT', '1') != '0' else None
+)
+# 爬取时的文章分析：ANALYSIS_WORKERS > 1 时使用进程池（每个子进程各自加载一套分析组件）
+processor = ArticleProcessor(
+    workers=int(os.environ.get('ANALYSIS_WORKERS', 1)),
+    components=(difficulty_analyzer, summarizer, classifier),
+    cache=analysis_cache,
+    model_path=CLASSIFIER_MODEL_PATH
+)
+# 分类模型：用库中已分类的文章训练，分类器创建时加载已保存的模型，训练完成后热替换
+classifier_trainer = ClassifierTrainer(classifier, db, model_path=CLASSIFIER_MODEL_PATH)
+# 爬取任务入库新文章后增量更新分类模型（CLASSIFIER_AUTO_TRAIN=0 时关闭）
+CLASSIFIER_AUTO_TRAIN = os.environ.get('CLASSIFIER_AUTO_TRAIN', '1') != '0'
+# 后台任务：爬取等耗时操作不占用请求线程；同一时间只执行一个任务
+jobs = JobQueue(db, max_workers=1)
+
+# warmup() 预热用的文本
+WARMUP_TEXT = (
+    "The committee published its findings on Tuesday. Researchers said the results were encouraging. "
+    "Further studies will examine how the new policy affects students and teachers across the country."
+)
+
+def warmup():
+    """提前完成首个请求才会做的初始化：创建各组件、加载分类模型，并用一小段文本
+    走一遍分析流程（导入 nltk/sumy、加载 punkt、停用词与断字词典）。设置 APP_WARMUP=1 时在
+    import app 时执行（如 gunicorn 每个 worker 启动时），否则在第一个分析请求时逐项完成。"""
+    started = time.perf_counter()
+    for component in (crawler, difficulty_analyzer, summarizer, classifier):
+        component.get()
+    difficulty_analyzer.analyze_difficulty(WARMUP_TEXT)
+    summarizer.generate_summary(WARMUP_TEXT, sentences_count=1)
+    classifier.classify_and_tag('Warmup', WARMUP_TEXT)
+    return round(time.perf_counter() - started, 3)
+
+if os.environ.get('APP_WARMUP') == '1':
+    print(f"组件预热完成，用时 {warmup()}s")
+
+# 单个 SSE 连接的最长时间（秒），超过后由浏览器自动重连
+JOB_EVENTS_MAX_SECONDS = 25
+
+# 批量分类单次请求最多的文档数
+CLASSIFY_BATCH_MAX = int(os.environ.get('CLASSIFY_BATCH_MAX', 100))
+
+# 推荐列表不返回 created_at
+RECOMMEND_FIELDS = tuple(f for f in ARTICLE_LIST_FIELDS if f != 'created_at')
 
 # 安全序列化数据库行到字典（兼容字符串/日期）
-def _serialize_article_row(row):
+# fields 为行中各列的名称；默认对应 SELECT * 的对外展示部分
+def _serialize_article_row(row, fields=ARTICLE_DETAIL_FIELDS):
     def _date_to_str(v):
         try:
             # date/datetime
@@ -29,22 +123,26 @@ def _serialize_article_row(row):
         except Exception:
             # 已是字符串或 None
             return v
-    return {
-        'id': row[0],
-        'title': row[1],
-        'author': row[2],
-        'content': row[3],
-        'summary': row[4],
-        'url': row[5],
-        'source': row[6],
-        'publish_date': _date_to_str(row[7]),
-        'difficulty_level': row[8],
-        'difficulty_score': row[9],
-        'category': row[10],
-        'tags': row[11],
-        'word_count': row[12],
-        'created_at': row[13]
-    }
+    article = dict(zip(fields, row))
+    if 'publish_date' in article:
+        article['publish_date'] = _date_to_str(article['publish_date'])
+    return article
+
+# 解析 ?fields=title,summary,...；fields=all 返回全部列，id 总是包含在内
+def _requested_fields(default):
+    raw = request.args.get('fields')
+    if not raw:
+        return default
+    if raw.strip() == 'all':
+        return ARTICLE_FIELDS
+    
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in ARTICLE_FIELDS]
+    if unknown:
+        raise ValueError(f"不支持的字段: {', '.join(unknown)}")
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return tuple(dict.fromkeys(fields))
 
 @app.route('/')
 def index():
@@ -58,24 +156,48 @@ def articles():
 
 @app.route('/api/articles', methods=['GET'])
 def get_articles():
-    """获取文章列表"""
+    """获取文章列表（服务端排序与分页）"""
     try:
         # 获取查询参数
         limit = request.args.get('limit', 20, type=int)
         category = request.args.get('category')
         difficulty = request.args.get('difficulty')
+        source = request.args.get('source')
+        sort = request.args.get('sort', 'newest')
+        cursor = request.args.get('cursor')
         page = request.args.get('page', 1, type=int)
         
-        # 获取文章
-        articles = db.get_articles(limit=limit, category=category, difficulty=difficulty)
+        if limit < 1 or page < 1:
+            return jsonify({
+                'success': False,
+                'error': 'limit 和 page 必须为正整数'
+            }), 400
+        
+        # 有游标时走键集分页，否则按页码偏移；列表默认不读取正文
+        try:
+            fields = _requested_fields(ARTICLE_LIST_FIELDS)
+            articles, next_cursor = db.get_articles_page(
+                limit=limit, category=category, difficulty=difficulty, source=source,
+                sort=sort, cursor=cursor, offset=(page - 1) * limit, fields=fields
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
         # 转换为字典格式
-        articles_data = [_serialize_article_row(a) for a in articles]
+        articles_data = [_serialize_article_row(a, fields) for a in articles]
         
         return jsonify({
             'success': True,
             'data': articles_data,
-            'total': len(articles_data)
+            'total': db.count_articles(category=category, difficulty=difficulty, source=source),
+            'page': page,
+            'limit': limit,
+            'sort': sort,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
         
     except Exception as e:
@@ -122,9 +244,17 @@ def search_articles():
                 'error': '搜索关键词不能为空'
             }), 400
         
-        articles = db.search_articles(keyword, limit)
+        try:
+            fields = _requested_fields(ARTICLE_LIST_FIELDS)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        articles = db.search_articles(keyword, limit, fields=fields)
         
-        articles_data = [_serialize_article_row(a) for a in articles]
+        articles_data = [_serialize_article_row(a, fields) for a in articles]
         
         return jsonify({
             'success': True,
@@ -191,69 +321,136 @@ def get_difficulty_stats():
             'error': str(e)
         }), 500
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """获取文章库汇总统计"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': db.get_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/sources', methods=['GET'])
+def get_sources():
+    """获取所有文章来源"""
+    try:
+        sources_data = [{'name': name, 'count': count} for name, count in db.get_sources()]
+        
+        return jsonify({
+            'success': True,
+            'data': sources_data
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _run_crawl_job(params, report):
+    """后台爬取任务：边抓取边分析入库，每批提交后汇报进度"""
+    max_articles = params.get('max_articles', 10)
+    source = params.get('source', 'all')  # 'bbc', 'cnn', 'all'
+    
+    # 根据源选择爬取方法（生成器，边抓取边分析入库）
+    if source == 'bbc':
+        articles = crawler.iter_bbc_news(max_articles)
+    elif source == 'cnn':
+        articles = crawler.iter_cnn_news(max_articles)
+    else:
+        articles = crawler.iter_all_sources(max_articles // 2)
+    
+    pipeline = ArticlePipeline(db, processor.process, progress=report, **processor.pipeline_options())
+    result = pipeline.run(articles)
+    # RSS源状态在其文章入库后才写入
+    crawler.commit_feed_states()
+    
+    crawled_count = result['crawled']
+    processed_ok = result['processed']
+    saved_count = result['saved']
+    skipped_count = max(processed_ok - saved_count, 0)
+    failed_count = result['failed']
+    
+    training = None
+    if CLASSIFIER_AUTO_TRAIN and saved_count:
+        try:
+            training = classifier_trainer.update()
+        except Exception as e:
+            print(f"分类模型增量训练失败: {e}")
+    
+    return {
+        'message': f'爬取:{crawled_count} | 处理成功:{processed_ok} | 保存:{saved_count} | 跳过(重复):{skipped_count} | 处理失败:{failed_count}',
+        'crawled_count': crawled_count,
+        'processed_ok': processed_ok,
+        'saved_count': saved_count,
+        'skipped_count': skipped_count,
+        'failed_count': failed_count,
+        'stages': result['stages'],
+        'classifier_training': training
+    }
+
+jobs.register('crawl', _run_crawl_job)
+
+def _run_train_classifier_job(params, report):
+    """后台训练任务：从数据库分批读取已分类的文章训练模型，完成后热替换"""
+    return classifier_trainer.update(full=bool(params.get('full')), progress=report)
+
+jobs.register('train_classifier', _run_train_classifier_job)
+
 @app.route('/api/crawl', methods=['POST'])
 def crawl_articles():
-    """爬取新文章"""
+    """提交后台爬取任务，立即返回任务 ID（202）"""
     try:
-        data = request.get_json()
-        max_articles = data.get('max_articles', 10)
-        source = data.get('source', 'all')  # 'bbc', 'cnn', 'all'
-        
-        # 根据源选择爬取方法
-        if source == 'bbc':
-            articles = crawler.crawl_bbc_news(max_articles)
-        elif source == 'cnn':
-            articles = crawler.crawl_cnn_news(max_articles)
-        else:
-            articles = crawler.crawl_all_sources(max_articles // 2)
-        
-        # 处理每篇文章
-        processed_articles = []
-        failed_count = 0
-        for article in articles:
-            try:
-                # 分析难度
-                difficulty_result = difficulty_analyzer.analyze_difficulty(article['content'])
-                article['difficulty_level'] = difficulty_result['difficulty_level']
-                article['difficulty_score'] = difficulty_result['difficulty_score']
-                
-                # 生成摘要
-                summary = summarizer.generate_summary(article['content'], sentences_count=3)
-                article['summary'] = summary
-                
-                # 分类和标签
-                category = classifier.classify_article(
-                    article['title'], 
-                    article['content'], 
-                    article.get('url'),
-                    article.get('source')
-                )
-                article['category'] = category
-                
-                tags = classifier.extract_tags(article['title'], article['content'])
-                article['tags'] = ', '.join(tags)
-                
-                processed_articles.append(article)
-                
-            except Exception as e:
-                print(f"处理文章失败: {e}")
-                failed_count += 1
-                continue
-        
-        # 保存到数据库
-        saved_count = crawler.save_articles_to_db(processed_articles)
-        processed_ok = len(processed_articles)
-        skipped_count = max(processed_ok - saved_count, 0)
-        crawled_count = len(articles)
+        data = request.get_json(silent=True) or {}
+        try:
+            max_articles = int(data.get('max_articles', 10))
+        except (TypeError, ValueError):
+            max_articles = 0
+        if max_articles < 1:
+            return jsonify({
+                'success': False,
+                'error': 'max_articles 必须是正整数'
+            }), 400
+        
+        job_id = jobs.submit('crawl', {
+            'max_articles': max_articles,
+            'source': data.get('source', 'all')
+        })
         
         return jsonify({
             'success': True,
-            'message': f'爬取:{crawled_count} | 处理成功:{processed_ok} | 保存:{saved_count} | 跳过(重复):{skipped_count} | 处理失败:{failed_count}',
-            'crawled_count': crawled_count,
-            'processed_ok': processed_ok,
-            'saved_count': saved_count,
-            'skipped_count': skipped_count,
-            'failed_count': failed_count
+            'message': f'爬取任务已提交（任务 {job_id}）',
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}',
+            'events_url': f'/api/jobs/{job_id}/events'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询后台任务状态、进度与结果"""
+    try:
+        job = jobs.get(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': '任务不存在'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': job
         })
         
     except Exception as e:
@@ -262,6 +459,51 @@ def crawl_articles():
             'error': str(e)
         }), 500
 
+@app.route('/api/jobs/<int:job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """以 Server-Sent Events 推送任务进度
+    
+    任务有变化时发送 progress 事件（id 为任务 version），结束时发送 done 事件。
+    每个连接最多保持 JOB_EVENTS_MAX_SECONDS 秒，浏览器的 EventSource 会自动重连
+    （带上 Last-Event-ID，未变化的状态不会重复发送），避免长期占用同步 worker。
+    """
+    if not jobs.get(job_id):
+        return jsonify({
+            'success': False,
+            'error': '任务不存在'
+        }), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    last_version = int(last_event_id) if last_event_id.isdigit() else None
+    
+    def stream():
+        version = last_version
+        deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+        idle_since = time.monotonic()
+        yield "retry: 2000\n\n"
+        while True:
+            job = jobs.get(job_id)
+            finished = is_finished(job)
+            # 已结束的任务即使状态未变（重连时）也发送 done，通知客户端关闭连接
+            if job['version'] != version or finished:
+                version = job['version']
+                idle_since = time.monotonic()
+                event = 'done' if finished else 'progress'
+                yield f"id: {version}\nevent: {event}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if finished or time.monotonic() >= deadline:
+                return
+            if time.monotonic() - idle_since >= 15:
+                # 注释行作心跳，防止代理断开空闲连接
+                idle_since = time.monotonic()
+                yield ": keepalive\n\n"
+            # 本进程内的任务变化会立即唤醒；其他进程的任务靠 1 秒轮询
+            jobs.wait_for_change(1.0)
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/analyze-difficulty', methods=['POST'])
 def analyze_difficulty():
     """分析文本难度"""
@@ -275,7 +517,7 @@ def analyze_difficulty():
                 'error': '文本内容不能为空'
             }), 400
         
-        result = difficulty_analyzer.analyze_difficulty(text)
+        result = cached_difficulty(difficulty_analyzer, text, cache=analysis_cache)
         explanation = difficulty_analyzer.get_difficulty_explanation(result)
         
         return jsonify({
@@ -305,7 +547,7 @@ def generate_summary():
                 'error': '文本内容不能为空'
             }), 400
         
-        summary = summarizer.generate_summary(text, method, sentences_count)
+        summary = cached_summary(summarizer, text, method, sentences_count, cache=analysis_cache)
         quality_score = summarizer.get_summary_quality_score(text, summary)
         
         return jsonify({
@@ -340,14 +582,13 @@ def classify_text():
                 'error': '标题或内容不能为空'
             }), 400
         
-        category = classifier.classify_article(title, content, url, source)
-        tags = classifier.extract_tags(title, content)
+        result = cached_classification(classifier, title, content, url, source, cache=analysis_cache)
         
         return jsonify({
             'success': True,
             'data': {
-                'category': category,
-                'tags': tags
+                'category': result['category'],
+                'tags': result['tags']
             }
         })
         
@@ -357,6 +598,107 @@ def classify_text():
             'error': str(e)
         }), 500
 
+@app.route('/api/classify/batch', methods=['POST'])
+def classify_batch():
+    """批量分类：{"articles": [{"title", "content", "url", "source"}, ...], "top_k": 3}"""
+    try:
+        data = request.get_json() or {}
+        documents = data.get('articles')
+        try:
+            top_k = int(data.get('top_k', 3))
+        except (TypeError, ValueError):
+            top_k = 0
+        
+        if not isinstance(documents, list) or not documents:
+            return jsonify({
+                'success': False,
+                'error': 'articles 必须是非空列表'
+            }), 400
+        if len(documents) > CLASSIFY_BATCH_MAX:
+            return jsonify({
+                'success': False,
+                'error': f'单次最多分类 {CLASSIFY_BATCH_MAX} 篇'
+            }), 400
+        if top_k < 1:
+            return jsonify({
+                'success': False,
+                'error': 'top_k 必须是正整数'
+            }), 400
+        invalid = [i for i, d in enumerate(documents)
+                   if not isinstance(d, dict) or not (d.get('title') or d.get('content'))]
+        if invalid:
+            return jsonify({
+                'success': False,
+                'error': f'第 {invalid[0]} 篇的标题或内容不能为空'
+            }), 400
+        invalid = [i for i, d in enumerate(documents)
+                   if any(d.get(field) is not None and not isinstance(d.get(field), str)
+                          for field in ('title', 'content', 'url', 'source'))]
+        if invalid:
+            return jsonify({
+                'success': False,
+                'error': f'第 {invalid[0]} 篇的 title、content、url、source 必须是字符串'
+            }), 400
+        
+        results = cached_classification_batch(classifier, documents, top_k=top_k, cache=analysis_cache)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'results': results,
+                'count': len(results)
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/classifier/train', methods=['POST'])
+def train_classifier():
+    """提交分类模型训练任务（full=true 时从头训练，否则只训练新文章），立即返回任务 ID（202）"""
+    try:
+        data = request.get_json(silent=True) or {}
+        job_id = jobs.submit('train_classifier', {'full': bool(data.get('full', False))})
+        
+        return jsonify({
+            'success': True,
+            'message': f'训练任务已提交（任务 {job_id}）',
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}',
+            'events_url': f'/api/jobs/{job_id}/events'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/classifier', methods=['GET'])
+def classifier_info():
+    """当前分类模型的状态"""
+    model = classifier.ml_classifier
+    return jsonify({
+        'success': True,
+        'data': {
+            'trained': classifier.is_trained,
+            'model_version': classifier.model_version,
+            'samples_seen': getattr(model, 'samples_seen', None),
+            'classes': [str(c) for c in getattr(model, 'classes_', [])] if classifier.is_trained else []
+        }
+    })
+
+@app.route('/api/analysis-cache/stats', methods=['GET'])
+def analysis_cache_stats():
+    """分析结果缓存的命中/未命中计数（仅本进程）"""
+    return jsonify({
+        'success': True,
+        'data': analysis_cache.stats()
+    })
+
 @app.route('/api/recommend', methods=['GET'])
 def recommend_articles():
     """推荐文章"""
@@ -382,16 +724,18 @@ def recommend_articles():
             else:
                 difficulty = 'Expert'
         
-        # 获取推荐文章
-        articles = db.get_articles(limit=limit, category=category, difficulty=difficulty)
+        # 获取推荐文章（推荐列表无需 content/created_at，查询时即不读取）
+        try:
+            fields = _requested_fields(RECOMMEND_FIELDS)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        articles = db.get_articles(limit=limit, category=category, difficulty=difficulty, fields=fields)
         
-        articles_data = []
-        for a in articles:
-            d = _serialize_article_row(a)
-            # 推荐列表无需 content/created_at
-            d.pop('content', None)
-            d.pop('created_at', None)
-            articles_data.append(d)
+        articles_data = [_serialize_article_row(a, fields) for a in articles]
         
         return jsonify({
             'success': True,
@@ -439,11 +783,18 @@ if __name__ == '__main__':
     print("GET  /api/articles/search?q=关键词 - 搜索文章")
     print("GET  /api/categories - 获取分类列表")
     print("GET  /api/difficulty-stats - 获取难度统计")
+    print("GET  /api/stats - 获取汇总统计")
+    print("GET  /api/sources - 获取来源列表")
     print("GET  /api/recommend - 推荐文章")
-    print("POST /api/crawl - 爬取新文章")
+    print("POST /api/crawl - 提交后台爬取任务")
+    print("GET  /api/jobs/<id> - 查询任务状态")
+    print("GET  /api/jobs/<id>/events - 任务进度推送（SSE）")
     print("POST /api/analyze-difficulty - 分析文本难度")
     print("POST /api/generate-summary - 生成摘要")
     print("POST /api/classify - 分类文本")
+    print("POST /api/classify/batch - 批量分类（含各分类概率）")
+    print("POST /api/classifier/train - 提交分类模型训练任务")
+    print("GET  /api/classifier - 分类模型状态")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
 
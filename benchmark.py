@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准脚本（只使用 fixtures/ 下的本地数据，不访问网络）：
+  python benchmark.py extract [--repeat 20]   正文抽取：lxml 快速路径 vs 原 BeautifulSoup 实现
+  python benchmark.py process [--articles 500] [--workers 1 2 4]
+                                              文章分析：单进程 vs 进程池
+  python benchmark.py readability [--repeat 5]
+                                              可读性指标：textstat 逐项调用 vs 单次计数引擎
+  python benchmark.py keywords [--articles 200] [--repeat 5]
+                                              分类关键词匹配：逐词 str.count 循环 vs 关键词自动机
+  python benchmark.py model-load [--repeat 5]
+                                              分类模型冷启动加载：pickle vs .npy 模型目录（内存映射）
+  python benchmark.py startup [--repeat 3]    Web 服务冷启动：import app 与首个请求的耗时
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def load_fixtures(subdir, pattern='*'):
+    """读取 fixtures/<subdir> 下的文件，返回 [(文件名, bytes)]"""
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, subdir, pattern)))
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    return fixtures
+
+def best_of(func, items, repeat):
+    """对 items 逐个调用 func，重复 repeat 轮，返回最快一轮的秒数"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def print_timings(rows, count, unit='页'):
+    """rows 为 [(名称, 秒数)]，以第一行为基准输出耗时与加速比"""
+    baseline = rows[0][1]
+    print(f"{'实现':<28}{'总耗时(ms)':>12}{'每' + unit + '(ms)':>12}{'加速比':>10}")
+    for name, seconds in rows:
+        print(f"{name:<30}{seconds * 1000:>12.2f}{seconds * 1000 / count:>12.3f}{baseline / seconds:>10.1f}x")
+
+def legacy_article_text(content):
+    """原 crawler._download_article_text 的 BeautifulSoup 实现，作为对照"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    selectors = [
+        'article',
+        'div.article__content',
+        'div.c-article-content',
+        'div#content',
+        'div.entry-content',
+        'section.article-body',
+        'div.l-container'
+    ]
+    texts = []
+    for sel in selectors:
+        node = soup.select_one(sel)
+        if node:
+            ps = node.find_all(['p','li'])
+            texts = [p.get_text().strip() for p in ps if p.get_text().strip()]
+            if len(' '.join(texts)) > 200:
+                break
+    if not texts:
+        ps = soup.find_all('p')
+        texts = [p.get_text().strip() for p in ps if p.get_text().strip()]
+    return '\n'.join(texts)
+
+def bench_extract(args):
+    from extractor import extract_article_text
+
+    pages = load_fixtures('html', '*.html')
+    if not pages:
+        print("fixtures/html 下没有页面")
+        return
+    contents = [content for _, content in pages]
+    total_kb = sum(len(c) for c in contents) / 1024
+    print(f"正文抽取基准：{len(pages)} 个页面，共 {total_kb:.0f} KB，重复 {args.repeat} 轮取最快")
+
+    rows = []
+    try:
+        # 先核对两种实现的输出一致
+        mismatches = [name for name, content in pages
+                      if legacy_article_text(content) != extract_article_text(content)]
+        rows.append(('BeautifulSoup(html.parser)', best_of(legacy_article_text, contents, args.repeat)))
+    except ImportError:
+        mismatches = None
+        print("未安装 beautifulsoup4，跳过对照实现")
+    rows.append(('lxml 快速路径', best_of(extract_article_text, contents, args.repeat)))
+
+    print_timings(rows, len(pages))
+    if mismatches:
+        print(f"⚠️  输出不一致的页面: {', '.join(mismatches)}")
+    elif mismatches is not None:
+        print("✅ 两种实现输出一致")
+
+def fixture_articles(count):
+    """由 fixtures/html 的正文循环生成 count 篇文章"""
+    from extractor import extract_article_text
+
+    texts = [extract_article_text(content) for _, content in load_fixtures('html', '*.html')]
+    texts = [text for text in texts if text]
+    return [
+        {'title': f'Fixture article {i}', 'content': texts[i % len(texts)],
+         'url': f'https://example.com/bench/{i}', 'source': 'Benchmark'}
+        for i in range(count)
+    ] if texts else []
+
+def bench_process(args):
+    from processor import ArticleProcessor
+
+    articles = fixture_articles(args.articles)
+    if not articles:
+        print("fixtures/html 下没有可用的正文")
+        return
+    print(f"文章分析基准：{len(articles)} 篇，CPU 核数 {os.cpu_count()}，chunk_size={args.chunk_size}")
+
+    rows = []
+    for workers in args.workers:
+        with ArticleProcessor(workers=workers, chunk_size=args.chunk_size) as processor:
+            # 预热：子进程启动与模型加载不计入耗时
+            list(processor.process_all(articles[:workers * args.chunk_size]))
+            start = time.perf_counter()
+            failed = sum(1 for _, error in processor.process_all(articles) if error is not None)
+            rows.append((f'{workers} 个进程', time.perf_counter() - start))
+        if failed:
+            print(f"⚠️  {workers} 个进程: {failed} 篇处理失败")
+
+    print_timings(rows, len(articles), unit='篇')
+
+# DifficultyAnalyzer 使用的可读性指标
+READABILITY_METRICS = (
+    'flesch_reading_ease', 'flesch_kincaid_grade', 'gunning_fog',
+    'smog_index', 'automated_readability_index',
+)
+
+def readability_corpus():
+    """fixtures/text 下的文本加上 fixtures/html 抽取出的正文"""
+    from extractor import extract_article_text
+
+    texts = [content.decode('utf-8') for _, content in load_fixtures('text', '*.txt')]
+    texts += [extract_article_text(content) for _, content in load_fixtures('html', '*.html')]
+    return [text for text in texts if text.strip()]
+
+def textstat_readability(text):
+    """原 DifficultyAnalyzer 的做法：逐项调用 textstat（每篇文章都是新文本，先清空其内部缓存）"""
+    import textstat
+
+    textstat.textstat._cache_clear()
+    scores = {metric: getattr(textstat, metric)(text) for metric in READABILITY_METRICS}
+    scores['sentences'] = textstat.sentence_count(text)
+    return scores
+
+def bench_readability(args):
+    from readability import readability, word_syllables
+
+    texts = readability_corpus()
+    if not texts:
+        print("fixtures 下没有文本")
+        return
+    print(f"可读性基准：{len(texts)} 篇，共 {sum(len(t.split()) for t in texts)} 词，重复 {args.repeat} 轮取最快")
+
+    # 先核对两种实现的输出
+    max_diff = {metric: 0.0 for metric in READABILITY_METRICS + ('sentences',)}
+    for text in texts:
+        expected = textstat_readability(text)
+        actual = readability(text)
+        actual['sentences'] = actual['counts']['sentences']
+        for metric in max_diff:
+            max_diff[metric] = max(max_diff[metric], abs(expected[metric] - actual[metric]))
+
+    def engine(text):
+        # 每轮都从冷的音节缓存开始，与 textstat 对等
+        word_syllables.cache_clear()
+        readability(text)
+
+    rows = [
+        ('textstat 逐项调用', best_of(textstat_readability, texts, args.repeat)),
+        ('单次计数引擎', best_of(engine, texts, args.repeat)),
+        ('单次计数引擎（音节缓存已热）', best_of(readability, texts, args.repeat)),
+    ]
+    print_timings(rows, len(texts), unit='篇')
+    worst = max(max_diff.values())
+    if worst > 0.01:
+        print("⚠️  与 textstat 的最大偏差: " + ', '.join(f"{k}={v:g}" for k, v in max_diff.items() if v))
+    else:
+        print(f"✅ 与 textstat 输出一致（最大偏差 {worst:g}）")
+
+def legacy_keyword_match(classifier, article):
+    """原 ArticleClassifier 的关键词匹配：每个关键词对全文做一次子串扫描，作为对照"""
+    full_text = f"{article['title'].lower()} {article['content'].lower()}"
+    category_scores = {}
+    for category, keywords in classifier.category_keywords.items():
+        category_scores[category] = sum(
+            full_text.count(keyword.lower()) * len(keyword.split()) for keyword in keywords
+        )
+    tags = [tag for tag, keywords in classifier.tag_keywords.items()
+            if any(keyword in full_text for keyword in keywords)]
+    url_lower = article['url'].lower()
+    url_category = next((category for category, keywords in classifier.category_keywords.items()
+                         if any(keyword in url_lower for keyword in keywords)), None)
+    return category_scores, tags, url_category
+
+def automaton_keyword_match(classifier, article):
+    """当前实现：分类、标签与 URL 各扫描一次关键词自动机"""
+    full_text = classifier._full_text(article['title'], article['content'])
+    category_scores, tags = classifier._match_keywords(full_text)
+    return category_scores, tags, classifier._classify_by_url(article['url'])
+
+def bench_keywords(args):
+    from classifier import ArticleClassifier
+
+    articles = fixture_articles(args.articles)
+    if not articles:
+        print("fixtures/html 下没有可用的正文")
+        return
+    classifier = ArticleClassifier()
+    keyword_count = sum(len(k) for k in classifier.category_keywords.values()) + \
+        sum(len(k) for k in classifier.tag_keywords.values())
+    print(f"关键词匹配基准：{len(articles)} 篇，{keyword_count} 个关键词，重复 {args.repeat} 轮取最快")
+
+    # 自动机按整词匹配，统计与子串匹配结果不同的文章（如 'ai' 不再命中 'said'）
+    changed = 0
+    for article in articles:
+        old_scores, _, _ = legacy_keyword_match(classifier, article)
+        new_scores, _, _ = automaton_keyword_match(classifier, article)
+        if classifier._best_category(old_scores) != classifier._best_category(new_scores):
+            changed += 1
+
+    rows = [
+        ('逐词 str.count 循环', best_of(lambda a: legacy_keyword_match(classifier, a), articles, args.repeat)),
+        ('关键词自动机', best_of(lambda a: automaton_keyword_match(classifier, a), articles, args.repeat)),
+    ]
+    print_timings(rows, len(articles), unit='篇')
+    print(f"按整词匹配后关键词分类改变的文章：{changed}/{len(articles)} 篇")
+
+# 在新进程中计时加载模型与第一次预测（导入模块不计入），输出 JSON
+MODEL_LOAD_SCRIPT = """
+import json, sys, time
+import pickle
+import model_store
+import trainer
+path, fmt = sys.argv[1], sys.argv[2]
+started = time.perf_counter()
+if fmt == 'pickle':
+    with open(path, 'rb') as f:
+        model = pickle.load(f)
+else:
+    model = model_store.load_model(path, mmap=(fmt == 'mmap'))
+loaded = time.perf_counter()
+model.predict_proba(['The team won the match and the bank reported record profits.'])
+print(json.dumps({'load': loaded - started, 'first_predict': time.perf_counter() - loaded}))
+"""
+
+def bench_model_load(args):
+    import pickle
+    import model_store
+    from trainer import OnlineTextModel
+
+    articles = fixture_articles(200)
+    if not articles:
+        print("fixtures/html 下没有可用的正文")
+        return
+    classes = ['Technology', 'Business', 'Health', 'Education', 'Culture', 'Politics', 'Environment', 'Sports']
+    model = OnlineTextModel(classes)
+    model.partial_fit([a['content'] for a in articles], [classes[i % len(classes)] for i in range(len(articles))])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, 'model.pkl')
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(model, f)
+        store_path = os.path.join(tmp, 'store')
+        metadata = model_store.save_model(model, store_path)
+        store_bytes = sum(os.path.getsize(os.path.join(store_path, metadata['version'], name))
+                          for name in metadata['files'])
+        print(f"模型加载基准：{len(classes)} 个分类 × {metadata['feature_count']} 维特征，"
+              f"pickle {os.path.getsize(pickle_path) / 1e6:.1f} MB，.npy 目录 {store_bytes / 1e6:.1f} MB；"
+              f"每种格式启动 {args.repeat} 个新进程取最快")
+
+        here = os.path.dirname(os.path.abspath(__file__))
+        print(f"{'格式':<26}{'加载(ms)':>12}{'首次预测(ms)':>14}{'合计(ms)':>12}")
+        for name, path, fmt in (('pickle', pickle_path, 'pickle'),
+                                ('.npy 目录（完整读入）', store_path, 'load'),
+                                ('.npy 目录（内存映射）', store_path, 'mmap')):
+            runs = []
+            for _ in range(args.repeat):
+                output = subprocess.run([sys.executable, '-c', MODEL_LOAD_SCRIPT, path, fmt], cwd=here,
+                                        capture_output=True, text=True, check=True).stdout
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+            best = min(runs, key=lambda run: run['load'] + run['first_predict'])
+            print(f"{name:<26}{best['load'] * 1000:>12.2f}{best['first_predict'] * 1000:>14.2f}"
+                  f"{(best['load'] + best['first_predict']) * 1000:>12.2f}")
+
+# 在新进程中计时 import app、（可选）warmup 与首个轻量/分析请求，输出 JSON
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app as web
+timings = {'import': time.perf_counter() - started}
+if sys.argv[1] == 'warmup':
+    started = time.perf_counter()
+    web.warmup()
+    timings['warmup'] = time.perf_counter() - started
+client = web.app.test_client()
+started = time.perf_counter()
+assert client.get('/api/categories').status_code == 200
+timings['first_light'] = time.perf_counter() - started
+started = time.perf_counter()
+text = 'The committee published its findings on Tuesday. ' * 20
+assert client.post('/api/analyze-difficulty', json={'text': text}).status_code == 200
+timings['first_analysis'] = time.perf_counter() - started
+print(json.dumps(timings))
+"""
+
+def bench_startup(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    # 在临时目录中启动，数据库与模型文件不落在仓库里；分析缓存只用内存
+    env = dict(os.environ, PYTHONPATH=here, ANALYSIS_CACHE_PERSISTENT='0', CLASSIFIER_AUTO_TRAIN='0')
+    modes = [('冷启动', 'cold')]
+    if args.warmup:
+        modes.append(('冷启动 + warmup()', 'warmup'))
+    print(f"启动基准：每种方式启动 {args.repeat} 个新进程取中位数（单位 ms）")
+    print(f"{'方式':<22}{'import app':>12}{'warmup':>10}{'首个列表请求':>14}{'首个分析请求':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, mode in modes:
+            runs = []
+            for _ in range(args.repeat):
+                output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, mode], cwd=tmp, env=env,
+                                        capture_output=True, text=True, check=True).stdout
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+            median = {key: sorted(run.get(key, 0.0) for run in runs)[len(runs) // 2] for key in runs[0]}
+            print(f"{name:<22}{median['import'] * 1000:>12.0f}{median.get('warmup', 0) * 1000:>10.0f}"
+                  f"{median['first_light'] * 1000:>14.0f}{median['first_analysis'] * 1000:>14.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="外刊推荐系统性能基准")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract = subparsers.add_parser('extract', help='正文抽取')
+    extract.add_argument('--repeat', type=int, default=20)
+    extract.set_defaults(func=bench_extract)
+
+    process = subparsers.add_parser('process', help='文章分析（进程池）')
+    process.add_argument('--articles', type=int, default=500)
+    process.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    process.add_argument('--chunk-size', type=int, default=8)
+    process.set_defaults(func=bench_process)
+
+    readability = subparsers.add_parser('readability', help='可读性指标')
+    readability.add_argument('--repeat', type=int, default=5)
+    readability.set_defaults(func=bench_readability)
+
+    keywords = subparsers.add_parser('keywords', help='分类关键词匹配')
+    keywords.add_argument('--articles', type=int, default=200)
+    keywords.add_argument('--repeat', type=int, default=5)
+    keywords.set_defaults(func=bench_keywords)
+
+    model_load = subparsers.add_parser('model-load', help='分类模型冷启动加载')
+    model_load.add_argument('--repeat', type=int, default=5)
+    model_load.set_defaults(func=bench_model_load)
+
+    startup = subparsers.add_parser('startup', help='Web 服务冷启动')
+    startup.add_argument('--repeat', type=int, default=3)
+    startup.add_argument('--no-warmup', dest='warmup', action='store_false', help='不测量 warmup() 方式')
+    startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,17 @@
 import re
-import jieba
 from collections import Counter, defaultdict
 import math
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
+import numpy as np
 import pickle
 import os
+from analyzed_text import AnalyzedText
+from keyword_matcher import KeywordMatcher
+import model_store
 
 class ArticleClassifier:
+    # 算法版本：结果会因实现调整而变化时加一，使分析结果缓存失效
+    ALGORITHM_VERSION = 2
+    
     def __init__(self):
         # 预定义分类关键词
         self.category_keywords = {
@@ -102,23 +105,105 @@ class ArticleClassifier:
             'Feature': ['feature', 'profile', 'spotlight', 'focus', 'highlight', 'showcase']
         }
         
+        # 分类与标签关键词编译成一个自动机，一次扫描完成全部匹配
+        self._build_keyword_matcher()
+        
         # 初始化机器学习分类器
         self.ml_classifier = None
         self.vectorizer = None
         self.is_trained = False
     
+    def _build_keyword_matcher(self):
+        """由 category_keywords 与 tag_keywords 构造关键词自动机"""
+        patterns = []
+        for category, keywords in self.category_keywords.items():
+            for keyword in keywords:
+                # 根据关键词长度给予不同权重，多词关键词权重更高
+                patterns.append((keyword, ('category', category, len(keyword.split()))))
+        for tag, keywords in self.tag_keywords.items():
+            for keyword in keywords:
+                patterns.append((keyword, ('tag', tag, 1)))
+        self.keyword_matcher = KeywordMatcher(patterns)
+    
+    def _match_keywords(self, text):
+        """一次扫描得到各分类的关键词得分与命中的标签"""
+        category_scores = dict.fromkeys(self.category_keywords, 0)
+        matched_tags = set()
+        for kind, label, weight in self.keyword_matcher.scan(text):
+            if kind == 'category':
+                category_scores[label] += weight
+            else:
+                matched_tags.add(label)
+        return category_scores, [tag for tag in self.tag_keywords if tag in matched_tags]
+    
     def classify_article(self, title, content, url=None, source=None):
-        """对文章进行分类"""
+        """对文章进行分类（content 可以是 str 或 AnalyzedText）"""
+        return self.classify_and_tag(title, content, url, source)['category']
+    
+    def classify_and_tag(self, title, content, url=None, source=None):
+        """分类并提取标签，关键词只扫描一次，返回 {'category', 'tags'}"""
         # 合并标题和内容
-        full_text = f"{title} {content}".lower()
-        
-        # 使用关键词匹配分类
-        keyword_classification = self._classify_by_keywords(full_text)
-        
+        full_text = self._full_text(title, content)
+        category_scores, keyword_tags = self._match_keywords(full_text)
         # 使用机器学习分类（如果已训练）
-        ml_classification = None
-        if self.is_trained:
-            ml_classification = self._classify_by_ml(full_text)
+        ml_classification = self._classify_by_ml(full_text) if self.is_trained else None
+        return {
+            'category': self._classify(category_scores, url, source, ml_classification),
+            'tags': self._combine_tags(keyword_tags, content),
+        }
+    
+    def classify_batch(self, titles, contents, urls=None, sources=None, top_k=3):
+        """批量分类，返回与输入等长的 [{'category', 'tags', 'top_categories'}]
+
+        分类与标签的规则与 classify_and_tag 相同。top_categories 为概率最高的 top_k 个
+        分类 [{'category', 'probability'}]：已训练机器学习模型时取模型的预测概率
+        （全部文档一次向量化、一次预测），否则取各分类关键词得分的占比。
+        """
+        count = len(titles)
+        urls = list(urls) if urls is not None else [None] * count
+        sources = list(sources) if sources is not None else [None] * count
+        full_texts = [self._full_text(title, content) for title, content in zip(titles, contents)]
+        matches = [self._match_keywords(text) for text in full_texts]
+        
+        probabilities, classes = self._predict_proba_batch(full_texts)
+        ml_predictions = [None] * count
+        if probabilities is not None:
+            ml_predictions = [classes[i] for i in probabilities.argmax(axis=1)]
+        else:
+            # 未训练模型：关键词得分归一化为概率
+            classes = list(self.category_keywords)
+            scores = np.array([[category_scores[c] for c in classes] for category_scores, _ in matches], dtype=float)
+            scores = scores.reshape(count, len(classes))
+            totals = scores.sum(axis=1, keepdims=True)
+            probabilities = np.divide(scores, totals, out=np.zeros_like(scores), where=totals > 0)
+        top = np.argsort(-probabilities, axis=1, kind='stable')[:, :max(1, top_k)]
+        
+        results = []
+        for i, (category_scores, keyword_tags) in enumerate(matches):
+            results.append({
+                'category': self._classify(category_scores, urls[i], sources[i], ml_predictions[i]),
+                'tags': self._combine_tags(keyword_tags, contents[i]),
+                'top_categories': [
+                    {'category': str(classes[j]), 'probability': round(float(probabilities[i, j]), 4)}
+                    for j in top[i] if probabilities[i, j] > 0
+                ],
+            })
+        return results
+    
+    def _predict_proba_batch(self, texts):
+        """机器学习模型对一批文本的预测概率矩阵与对应的分类；未训练或失败时返回 (None, None)"""
+        model = self.ml_classifier
+        if not self.is_trained or not model or not texts:
+            return None, None
+        try:
+            return model.predict_proba(texts), list(model.classes_)
+        except Exception as e:
+            print(f"机器学习批量分类失败: {e}")
+            return None, None
+    
+    def _classify(self, category_scores, url=None, source=None, ml_classification=None):
+        # 使用关键词匹配分类
+        keyword_classification = self._best_category(category_scores)
         
         # 根据URL分类
         url_classification = self._classify_by_url(url) if url else None
@@ -142,19 +227,10 @@ class ArticleClassifier:
     
     def _classify_by_keywords(self, text):
         """基于关键词的分类"""
-        category_scores = {}
-        
-        for category, keywords in self.category_keywords.items():
-            score = 0
-            for keyword in keywords:
-                # 计算关键词出现次数
-                count = text.count(keyword.lower())
-                # 根据关键词长度给予不同权重
-                weight = len(keyword.split())  # 多词关键词权重更高
-                score += count * weight
-            
-            category_scores[category] = score
-        
+        category_scores, _ = self._match_keywords(text)
+        return self._best_category(category_scores)
+    
+    def _best_category(self, category_scores):
         # 返回得分最高的分类
         if category_scores:
             best_category = max(category_scores, key=category_scores.get)
@@ -165,11 +241,13 @@ class ArticleClassifier:
     
     def _classify_by_ml(self, text):
         """使用机器学习分类"""
-        if not self.is_trained or not self.ml_classifier:
+        # 只读取一次模型引用，训练任务同时替换模型也不受影响
+        model = self.ml_classifier
+        if not self.is_trained or not model:
             return None
         
         try:
-            prediction = self.ml_classifier.predict([text])[0]
+            prediction = model.predict([text])[0]
             return prediction
         except Exception as e:
             print(f"机器学习分类失败: {e}")
@@ -182,11 +260,11 @@ class ArticleClassifier:
         
         url_lower = url.lower()
         
-        # 先尝试关键字词表（宽匹配）
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                if keyword in url_lower:
-                    return category
+        # 先尝试关键字词表（URL 按非字母数字切词，取词表顺序中第一个命中的分类）
+        matched = {label for kind, label, _ in self.keyword_matcher.scan(url_lower) if kind == 'category'}
+        for category in self.category_keywords:
+            if category in matched:
+                return category
         
         # 再尝试正则兜底
         for pattern, cat in self.url_category_patterns:
@@ -210,29 +288,30 @@ class ArticleClassifier:
                 return r
         return 'Culture'
     
+    def _full_text(self, title, content):
+        """小写的 "标题 正文"，正文的小写形式取自 AnalyzedText；标题或正文为 None 时按空串处理"""
+        content = AnalyzedText.of(content if content is not None else '')
+        return f"{(title or '').lower()} {content.lower}"
+    
     def extract_tags(self, title, content):
-        """提取文章标签"""
-        full_text = f"{title} {content}".lower()
-        tags = []
-        
+        """提取文章标签（content 可以是 str 或 AnalyzedText）"""
         # 基于关键词提取标签
-        for tag, keywords in self.tag_keywords.items():
-            for keyword in keywords:
-                if keyword in full_text:
-                    tags.append(tag)
-                    break
-        
+        _, keyword_tags = self._match_keywords(self._full_text(title, content))
+        return self._combine_tags(keyword_tags, content)
+    
+    def _combine_tags(self, keyword_tags, content):
         # 基于内容特征提取标签
-        content_tags = self._extract_content_tags(content)
-        tags.extend(content_tags)
+        tags = keyword_tags + self._extract_content_tags(content)
         
-        # 去重并限制数量
-        tags = list(set(tags))[:5]
+        # 去重并限制数量（保持顺序，结果稳定）
+        tags = list(dict.fromkeys(tags))[:5]
         
         return tags if tags else ['General']
     
     def _extract_content_tags(self, content):
         """基于内容特征提取标签"""
+        doc = AnalyzedText.of(content if content is not None else '')
+        content = doc.text
         tags = []
         
         # 检查是否包含数据/统计
@@ -248,11 +327,11 @@ class ArticleClassifier:
             tags.append('List')
         
         # 检查是否包含时间信息
-        if re.search(r'\d{4}|\d{1,2}/\d{1,2}/\d{4}|january|february|march|april|may|june|july|august|september|october|november|december', content.lower()):
+        if re.search(r'\d{4}|\d{1,2}/\d{1,2}/\d{4}|january|february|march|april|may|june|july|august|september|october|november|december', doc.lower):
             tags.append('Timeline')
         
         # 检查文章长度
-        word_count = len(content.split())
+        word_count = doc.token_count
         if word_count > 1000:
             tags.append('Long Read')
         elif word_count < 300:
@@ -280,7 +359,11 @@ class ArticleClassifier:
                 print("训练数据不足")
                 return False
             
-            # 创建分类管道
+            # 创建分类管道（sklearn 只在训练时导入）
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.naive_bayes import MultinomialNB
+            from sklearn.pipeline import Pipeline
+            
             self.ml_classifier = Pipeline([
                 ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
                 ('classifier', MultinomialNB())
@@ -297,31 +380,49 @@ class ArticleClassifier:
             print(f"训练分类器失败: {e}")
             return False
     
-    def save_classifier(self, filepath='classifier_model.pkl'):
-        """保存训练好的分类器"""
+    def save_classifier(self, filepath=model_store.DEFAULT_MODEL_ROOT):
+        """保存训练好的分类器：filepath 为模型目录，每次保存生成一个新版本（见 model_store）"""
         if not self.is_trained:
             print("没有训练好的分类器可保存")
             return False
         
         try:
-            with open(filepath, 'wb') as f:
-                pickle.dump(self.ml_classifier, f)
-            print(f"分类器已保存到 {filepath}")
+            metadata = model_store.save_model(self.ml_classifier, filepath)
+            print(f"分类器已保存到 {filepath}（版本 {metadata['version']}）")
             return True
         except Exception as e:
             print(f"保存分类器失败: {e}")
             return False
     
-    def load_classifier(self, filepath='classifier_model.pkl'):
-        """加载训练好的分类器"""
+    def swap_model(self, model):
+        """替换机器学习模型（如 trainer.ClassifierTrainer 训练出的新模型）
+
+        只做引用赋值，分类过程中每次只读取一次模型引用，并发的分类请求使用完整的旧模型或新模型。
+        """
+        self.ml_classifier = model
+        self.is_trained = model is not None
+    
+    @property
+    def model_version(self):
+        """当前模型的版本标识，作为分类结果缓存参数；未训练时为 0"""
+        model = self.ml_classifier
+        if not self.is_trained or model is None:
+            return 0
+        return getattr(model, 'version', None) or type(model).__name__
+    
+    def load_classifier(self, filepath=model_store.DEFAULT_MODEL_ROOT, version=None):
+        """加载训练好的分类器：filepath 为模型目录（默认加载当前版本）；旧的 .pkl 文件仍可读取"""
         if not os.path.exists(filepath):
             print(f"分类器文件不存在: {filepath}")
             return False
         
         try:
-            with open(filepath, 'rb') as f:
-                self.ml_classifier = pickle.load(f)
-            self.is_trained = True
+            if os.path.isdir(filepath):
+                model = model_store.load_model(filepath, version)
+            else:
+                with open(filepath, 'rb') as f:
+                    model = pickle.load(f)
+            self.swap_model(model)
             print(f"分类器已从 {filepath} 加载")
             return True
         except Exception as e:
@@ -338,7 +439,8 @@ class ArticleClassifier:
             self.category_keywords[category] = []
         
         self.category_keywords[category].extend(keywords)
-        self.category_keywords[category] = list(set(self.category_keywords[category]))
+        self.category_keywords[category] = list(dict.fromkeys(self.category_keywords[category]))
+        self._build_keyword_matcher()
 
 if __name__ == "__main__":
     # 测试示例
@@ -1,25 +1,284 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import time
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 import json
 from database import DatabaseManager
+from rate_limiter import HostRateLimiter
+from url_utils import canonicalize_url
+from page_cache import PageCache, CacheMiss
+from extractor import extract_article_text, extract_links, extract_bbc_article, extract_cnn_article
 import feedparser
 
+# 优先使用稳定的 RSS 源：(名称, RSS地址, 默认分类)
+DEFAULT_RSS_SOURCES = [
+    # BBC - 多个分类
+    ("BBC News", "http://feeds.bbci.co.uk/news/rss.xml", "Politics"),
+    ("BBC World", "http://feeds.bbci.co.uk/news/world/rss.xml", "Politics"),
+    ("BBC Business", "http://feeds.bbci.co.uk/news/business/rss.xml", "Business"),
+    ("BBC Technology", "http://feeds.bbci.co.uk/news/technology/rss.xml", "Technology"),
+    ("BBC Health", "http://feeds.bbci.co.uk/news/health/rss.xml", "Health"),
+    ("BBC Science", "http://feeds.bbci.co.uk/news/science_and_environment/rss.xml", "Environment"),
+    ("BBC Education", "http://feeds.bbci.co.uk/news/education/rss.xml", "Education"),
+    
+    # CNN - 多个分类
+    ("CNN Top Stories", "http://rss.cnn.com/rss/edition.rss", "Politics"),
+    ("CNN World", "http://rss.cnn.com/rss/edition_world.rss", "Politics"),
+    ("CNN Business", "http://rss.cnn.com/rss/money_news_international.rss", "Business"),
+    ("CNN Technology", "http://rss.cnn.com/rss/edition_technology.rss", "Technology"),
+    ("CNN Health", "http://rss.cnn.com/rss/edition_health.rss", "Health"),
+    
+    # The Guardian - 多个分类
+    ("The Guardian World", "https://www.theguardian.com/world/rss", "Politics"),
+    ("The Guardian Business", "https://www.theguardian.com/business/rss", "Business"),
+    ("The Guardian Technology", "https://www.theguardian.com/technology/rss", "Technology"),
+    ("The Guardian Environment", "https://www.theguardian.com/environment/rss", "Environment"),
+    ("The Guardian Education", "https://www.theguardian.com/education/rss", "Education"),
+    ("The Guardian Culture", "https://www.theguardian.com/culture/rss", "Culture"),
+    ("The Guardian Sport", "https://www.theguardian.com/sport/rss", "Sports"),
+    ("The Guardian Science", "https://www.theguardian.com/science/rss", "Environment"),
+    
+    # Reuters - 多个分类
+    ("Reuters World", "https://www.reuters.com/rssFeed/worldNews", "Politics"),
+    ("Reuters Business", "https://www.reuters.com/rssFeed/businessNews", "Business"),
+    ("Reuters Technology", "https://www.reuters.com/rssFeed/technologyNews", "Technology"),
+    ("Reuters Health", "https://www.reuters.com/rssFeed/healthNews", "Health"),
+    ("Reuters Environment", "https://www.reuters.com/rssFeed/environmentNews", "Environment"),
+    ("Reuters Sports", "https://www.reuters.com/rssFeed/sportsNews", "Sports"),
+    
+    # NPR - 多个分类
+    ("NPR News", "https://feeds.npr.org/1001/rss.xml", "Politics"),
+    ("NPR World", "https://feeds.npr.org/1004/rss.xml", "Politics"),
+    ("NPR Business", "https://feeds.npr.org/1006/rss.xml", "Business"),
+    ("NPR Technology", "https://feeds.npr.org/1019/rss.xml", "Technology"),
+    ("NPR Health", "https://feeds.npr.org/1128/rss.xml", "Health"),
+    ("NPR Education", "https://feeds.npr.org/1013/rss.xml", "Education"),
+    ("NPR Science", "https://feeds.npr.org/1007/rss.xml", "Environment"),
+    
+    # Associated Press
+    ("Associated Press", "https://feeds.apnews.com/rss/apf-topnews", "Politics"),
+    ("AP Business", "https://feeds.apnews.com/rss/apf-business", "Business"),
+    ("AP Technology", "https://feeds.apnews.com/rss/apf-technology", "Technology"),
+    ("AP Health", "https://feeds.apnews.com/rss/apf-health", "Health"),
+    ("AP Sports", "https://feeds.apnews.com/rss/apf-sports", "Sports"),
+    
+    # TIME Magazine
+    ("TIME", "https://feeds.feedburner.com/time/topstories", "Politics"),
+    ("TIME Business", "https://feeds.feedburner.com/time/business", "Business"),
+    ("TIME Health", "https://feeds.feedburner.com/time/health", "Health"),
+    ("TIME Science", "https://feeds.feedburner.com/time/science", "Environment"),
+    
+    # Newsweek
+    ("Newsweek", "https://www.newsweek.com/rss", "Politics"),
+    ("Newsweek Tech", "https://www.newsweek.com/tech-science/rss", "Technology"),
+    ("Newsweek Health", "https://www.newsweek.com/health/rss", "Health"),
+    
+    # The Economist
+    ("The Economist", "https://www.economist.com/rss", "Business"),
+    
+    # 科技类专业媒体
+    ("TechCrunch", "https://techcrunch.com/feed/", "Technology"),
+    ("Wired", "https://www.wired.com/feed/rss", "Technology"),
+    ("Ars Technica", "http://feeds.arstechnica.com/arstechnica/index", "Technology"),
+    ("The Verge", "https://www.theverge.com/rss/index.xml", "Technology"),
+    ("MIT Technology Review", "https://www.technologyreview.com/feed/", "Technology"),
+    ("Engadget", "https://www.engadget.com/rss.xml", "Technology"),
+    ("ZDNet", "https://www.zdnet.com/news/rss.xml", "Technology"),
+    
+    # 商业类专业媒体
+    ("Forbes", "https://www.forbes.com/real-time/feed2/", "Business"),
+    ("Business Insider", "https://www.businessinsider.com/rss", "Business"),
+    ("Financial Times", "https://www.ft.com/rss/home", "Business"),
+    ("Harvard Business Review", "https://hbr.org/feed", "Business"),
+    ("Bloomberg", "https://feeds.bloomberg.com/markets/news.rss", "Business"),
+    ("Wall Street Journal", "https://feeds.a.dj.com/rss/RSSWorldNews.xml", "Business"),
+    ("MarketWatch", "https://feeds.marketwatch.com/marketwatch/topstories/", "Business"),
+    
+    # 科学健康类
+    ("Scientific American", "http://rss.sciam.com/ScientificAmerican-Global", "Environment"),
+    ("Nature News", "https://www.nature.com/nature.rss", "Environment"),
+    ("New Scientist", "https://www.newscientist.com/feed/home/", "Environment"),
+    ("Science Magazine", "https://www.science.org/rss/news_current.xml", "Environment"),
+    ("WebMD Health News", "https://www.webmd.com/rss/rss.aspx?RSSSource=RSS_PUBLIC", "Health"),
+    ("Medical News Today", "https://www.medicalnewstoday.com/rss", "Health"),
+    ("Healthline", "https://www.healthline.com/rss", "Health"),
+    
+    # 教育类
+    ("Education Week", "https://www.edweek.org/feed", "Education"),
+    ("Chronicle of Higher Education", "https://www.chronicle.com/section/News/6/rss", "Education"),
+    ("Inside Higher Ed", "https://www.insidehighered.com/rss.xml", "Education"),
+    
+    # 环境类
+    ("Environmental News Network", "https://www.enn.com/rss", "Environment"),
+    ("Climate Central", "https://www.climatecentral.org/rss.xml", "Environment"),
+    ("National Geographic", "https://www.nationalgeographic.com/pages/article/feeds", "Environment"),
+    
+    # 文化类
+    ("Smithsonian Magazine", "https://www.smithsonianmag.com/rss/latest_articles/", "Culture"),
+    ("The New Yorker", "https://www.newyorker.com/feed/news", "Culture"),
+    ("The Atlantic", "https://www.theatlantic.com/feed/all/", "Culture"),
+    ("Slate", "https://slate.com/feeds/all.rss", "Culture"),
+    ("Vox", "https://www.vox.com/rss/index.xml", "Culture"),
+    
+    # 体育类
+    ("ESPN", "https://www.espn.com/espn/rss/news", "Sports"),
+    ("Sports Illustrated", "https://www.si.com/rss/si_topstories.rss", "Sports"),
+    ("BBC Sport", "http://feeds.bbci.co.uk/sport/rss.xml", "Sports"),
+    ("CNN Sports", "http://rss.cnn.com/rss/edition_sport.rss", "Sports"),
+    
+    # 国际媒体
+    ("Al Jazeera", "https://www.aljazeera.com/xml/rss/all.xml", "Politics"),
+    ("Deutsche Welle", "https://rss.dw.com/rdf/rss-en-all", "Politics"),
+    ("France 24", "https://www.france24.com/en/rss", "Politics"),
+    ("RT News", "https://www.rt.com/rss/", "Politics"),
+    
+    # 其他优质源
+    ("Politico", "https://www.politico.com/rss/politicopicks.xml", "Politics"),
+    ("The Hill", "https://thehill.com/news/feed/", "Politics"),
+    ("Foreign Affairs", "https://www.foreignaffairs.com/rss.xml", "Politics"),
+    ("Foreign Policy", "https://foreignpolicy.com/feed/", "Politics")
+]
+
 class ArticleCrawler:
-    def __init__(self):
+    def __init__(self, max_workers=8, per_host_limit=2, feed_timeout=120,
+                 rate_per_host=2.0, burst_per_host=4, max_retries=2):
+        # 并发配置：全局同时请求数、单域名同时请求数、单个RSS源的总耗时上限（秒）
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.feed_timeout = feed_timeout
+        # 限速配置：每个域名的令牌桶速率/突发量，429/503 时的最大重试次数
+        self.rate_limiter = HostRateLimiter(rate=rate_per_host, burst=burst_per_host)
+        self.max_retries = max_retries
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # 连接池需容纳所有并发线程，否则多余连接会被反复建立/丢弃
+        adapter = HTTPAdapter(pool_connections=self.max_workers * 4, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._global_slots = threading.BoundedSemaphore(self.max_workers)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.last_crawl_report = []
+        
+        # 抓取前去重：本轮已领取的规范化 URL；use_feed_cache 控制RSS条件请求与高水位
+        self.skip_known_urls = True
+        self.use_feed_cache = True
+        self._seen_urls = set()
+        self._seen_lock = threading.Lock()
+        # 已抓取、等待文章入库后再写入的RSS源状态：{rss_url: (文章URL列表, 状态)}
+        self._pending_feed_states = {}
+        self._feed_states_lock = threading.Lock()
+        
+        # 页面磁盘缓存（None 表示不缓存）；replay 为 True 时只读缓存、不访问网络
+        self.page_cache = PageCache()
+        self.replay = False
+        
         self.db = DatabaseManager()
+    
+    @contextmanager
+    def _host_slot(self, host):
+        """占用一个单域名并发名额"""
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+        with slot:
+            yield
+    
+    def _fetch(self, url, timeout=10, **kwargs):
+        """所有抓取路径共用的 GET
+        
+        先按域名令牌桶限速，再受全局与单域名并发上限约束；
+        遇到 429/503 时按 Retry-After（或指数退避）暂停该域名后重试。
+        """
+        host = urlparse(url).netloc.lower()
+        for attempt in range(self.max_retries + 1):
+            if self.cancel_event.is_set():
+                raise RuntimeError("抓取已取消")
+            # 在占用并发名额之前等待令牌，避免排队线程占着名额空等
+            self.rate_limiter.acquire(host, self.cancel_event)
+            with self._global_slots, self._host_slot(host):
+                response = self.session.get(url, timeout=timeout, **kwargs)
+            
+            if response.status_code not in (429, 503):
+                self.rate_limiter.record_success(host)
+                return response
+            
+            delay = self.rate_limiter.backoff(host, response.headers.get('Retry-After'))
+            print(f"{host} 返回 {response.status_code}，暂停 {delay:.0f}s 后重试")
+        return response
+    
+    def _fetch_cached(self, url, timeout=10, use_cache=True, **kwargs):
+        """先查页面缓存再走 _fetch，成功的响应写回缓存
+        
+        use_cache=False 时不读缓存（仍写入，供回放使用）；
+        回放模式下只读缓存（忽略过期时间），未命中抛出 CacheMiss。
+        """
+        if self.replay:
+            cached = self.page_cache.get(url, max_age=float('inf')) if self.page_cache else None
+            if cached is None:
+                raise CacheMiss(f"页面缓存中没有 {url}")
+            return cached
+        
+        if use_cache and self.page_cache is not None:
+            cached = self.page_cache.get(url)
+            if cached is not None:
+                return cached
+        
+        response = self._fetch(url, timeout=timeout, **kwargs)
+        if self.page_cache is not None:
+            self.page_cache.put(url, response)
+        return response
+    
+    def _filter_new_urls(self, urls, limit=None):
+        """剔除已入库、本轮已领取或重复出现的 URL（按规范化 URL 判断），保持原顺序
+        
+        返回的 URL 视为已被本轮领取，其他源再遇到时会跳过；空链接原样保留。
+        """
+        urls = list(urls)
+        known = self.db.known_urls(urls) if self.skip_known_urls else set()
+        fresh = []
+        with self._seen_lock:
+            for url in urls:
+                if limit is not None and len(fresh) >= limit:
+                    break
+                if not url:
+                    fresh.append(url)
+                    continue
+                key = canonicalize_url(url)
+                if url in known or key in self._seen_urls:
+                    continue
+                self._seen_urls.add(key)
+                fresh.append(url)
+        return fresh
+    
+    def _reset_seen_urls(self):
+        """开始新一轮抓取时清空已领取的 URL"""
+        with self._seen_lock:
+            self._seen_urls.clear()
+    
+    def cancel(self):
+        """取消正在进行的抓取：未开始的请求不再发出，进行中的源尽快返回"""
+        self.cancel_event.set()
         
     def crawl_bbc_news(self, max_articles=20):
         """爬取BBC News文章"""
+        return list(self.iter_bbc_news(max_articles))
+    
+    def iter_bbc_news(self, max_articles=20):
+        """逐篇产出BBC News文章（流式）"""
         print("开始爬取BBC News...")
-        articles = []
+        self._reset_seen_urls()
         
         # BBC News主要页面
         urls = [
@@ -32,26 +291,23 @@ class ArticleCrawler:
         
         for url in urls:
             try:
-                response = self.session.get(url, timeout=10)
+                response = self._fetch_cached(url, timeout=10, use_cache=False)
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
                 
                 # 查找文章链接
                 article_links = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
+                for href in extract_links(response.content):
                     if '/news/' in href and href not in article_links:
                         full_url = urljoin('https://www.bbc.com', href)
                         if self._is_valid_article_url(full_url):
                             article_links.append(full_url)
                 
                 # 爬取每篇文章
-                for article_url in article_links[:max_articles//len(urls)]:
+                for article_url in self._filter_new_urls(article_links, limit=max_articles//len(urls)):
                     try:
                         article = self._crawl_bbc_article(article_url)
                         if article:
-                            articles.append(article)
-                            time.sleep(1)  # 避免请求过快
+                            yield article
                     except Exception as e:
                         print(f"爬取文章失败 {article_url}: {e}")
                         continue
@@ -59,43 +315,29 @@ class ArticleCrawler:
             except Exception as e:
                 print(f"爬取页面失败 {url}: {e}")
                 continue
-        
-        return articles
+    
     
     def _crawl_bbc_article(self, url):
         """爬取单篇BBC文章"""
         try:
-            response = self.session.get(url, timeout=10)
+            response = self._fetch_cached(url, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 提取标题
-            title_elem = soup.find('h1', {'data-testid': 'headline'}) or soup.find('h1', class_='story-headline')
-            if not title_elem:
+            # 提取标题、正文、作者与发布时间
+            fields = extract_bbc_article(response.content)
+            if not fields:
                 return None
-            title = title_elem.get_text().strip()
-            
-            # 提取内容
-            content_elem = soup.find('div', {'data-testid': 'story-body'}) or soup.find('div', class_='story-body')
-            if not content_elem:
-                return None
-            
-            # 提取段落文本
-            paragraphs = content_elem.find_all('p')
-            content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+            title = fields['title']
+            content = fields['content']
             
             if len(content) < 200:  # 内容太短，跳过
                 return None
             
-            # 提取作者
-            author_elem = soup.find('span', {'data-testid': 'byline'}) or soup.find('span', class_='byline')
-            author = author_elem.get_text().strip() if author_elem else "BBC News"
+            author = fields['author'] or "BBC News"
             
-            # 提取发布日期
-            date_elem = soup.find('time', {'data-testid': 'timestamp'}) or soup.find('time')
+            # 解析发布日期
             publish_date = None
-            if date_elem:
-                date_str = date_elem.get('datetime') or date_elem.get_text()
+            if fields['date'] is not None:
+                date_str = fields['date']
                 try:
                     publish_date = datetime.fromisoformat(date_str.replace('Z', '+00:00')).date()
                 except:
@@ -123,8 +365,12 @@ class ArticleCrawler:
     
     def crawl_cnn_news(self, max_articles=20):
         """爬取CNN News文章"""
+        return list(self.iter_cnn_news(max_articles))
+    
+    def iter_cnn_news(self, max_articles=20):
+        """逐篇产出CNN News文章（流式）"""
         print("开始爬取CNN News...")
-        articles = []
+        self._reset_seen_urls()
         
         # CNN主要页面
         urls = [
@@ -137,26 +383,23 @@ class ArticleCrawler:
         
         for url in urls:
             try:
-                response = self.session.get(url, timeout=10)
+                response = self._fetch_cached(url, timeout=10, use_cache=False)
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
                 
                 # 查找文章链接
                 article_links = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
+                for href in extract_links(response.content):
                     if '/2024/' in href and href not in article_links:
                         full_url = urljoin('https://edition.cnn.com', href)
                         if self._is_valid_article_url(full_url):
                             article_links.append(full_url)
                 
                 # 爬取每篇文章
-                for article_url in article_links[:max_articles//len(urls)]:
+                for article_url in self._filter_new_urls(article_links, limit=max_articles//len(urls)):
                     try:
                         article = self._crawl_cnn_article(article_url)
                         if article:
-                            articles.append(article)
-                            time.sleep(1)
+                            yield article
                     except Exception as e:
                         print(f"爬取文章失败 {article_url}: {e}")
                         continue
@@ -164,42 +407,29 @@ class ArticleCrawler:
             except Exception as e:
                 print(f"爬取页面失败 {url}: {e}")
                 continue
-        
-        return articles
+    
     
     def _crawl_cnn_article(self, url):
         """爬取单篇CNN文章"""
         try:
-            response = self.session.get(url, timeout=10)
+            response = self._fetch_cached(url, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 提取标题
-            title_elem = soup.find('h1', class_='headline__text') or soup.find('h1')
-            if not title_elem:
+            # 提取标题、正文、作者与更新时间
+            fields = extract_cnn_article(response.content)
+            if not fields:
                 return None
-            title = title_elem.get_text().strip()
-            
-            # 提取内容
-            content_elem = soup.find('div', class_='article__content') or soup.find('div', class_='l-container')
-            if not content_elem:
-                return None
-            
-            paragraphs = content_elem.find_all('p')
-            content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+            title = fields['title']
+            content = fields['content']
             
             if len(content) < 200:
                 return None
             
-            # 提取作者
-            author_elem = soup.find('span', class_='metadata__byline__author')
-            author = author_elem.get_text().strip() if author_elem else "CNN"
+            author = fields['author'] or "CNN"
             
             # 提取发布日期
-            date_elem = soup.find('div', class_='update-time')
             publish_date = datetime.now().date()
-            if date_elem:
-                date_text = date_elem.get_text()
+            if fields['date'] is not None:
+                date_text = fields['date']
                 # 简单的日期解析
                 if 'hours ago' in date_text or 'minutes ago' in date_text:
                     publish_date = datetime.now().date()
@@ -262,166 +492,190 @@ class ArticleCrawler:
             return 'Culture'
     
     def crawl_all_sources(self, max_articles_per_source=20):
-        """爬取所有源的文章"""
-        all_articles = []
-        
-        # 优先使用稳定的 RSS 源
-        rss_sources = [
-            # BBC - 多个分类
-            ("BBC News", "http://feeds.bbci.co.uk/news/rss.xml", "Politics"),
-            ("BBC World", "http://feeds.bbci.co.uk/news/world/rss.xml", "Politics"),
-            ("BBC Business", "http://feeds.bbci.co.uk/news/business/rss.xml", "Business"),
-            ("BBC Technology", "http://feeds.bbci.co.uk/news/technology/rss.xml", "Technology"),
-            ("BBC Health", "http://feeds.bbci.co.uk/news/health/rss.xml", "Health"),
-            ("BBC Science", "http://feeds.bbci.co.uk/news/science_and_environment/rss.xml", "Environment"),
-            ("BBC Education", "http://feeds.bbci.co.uk/news/education/rss.xml", "Education"),
-            
-            # CNN - 多个分类
-            ("CNN Top Stories", "http://rss.cnn.com/rss/edition.rss", "Politics"),
-            ("CNN World", "http://rss.cnn.com/rss/edition_world.rss", "Politics"),
-            ("CNN Business", "http://rss.cnn.com/rss/money_news_international.rss", "Business"),
-            ("CNN Technology", "http://rss.cnn.com/rss/edition_technology.rss", "Technology"),
-            ("CNN Health", "http://rss.cnn.com/rss/edition_health.rss", "Health"),
-            
-            # The Guardian - 多个分类
-            ("The Guardian World", "https://www.theguardian.com/world/rss", "Politics"),
-            ("The Guardian Business", "https://www.theguardian.com/business/rss", "Business"),
-            ("The Guardian Technology", "https://www.theguardian.com/technology/rss", "Technology"),
-            ("The Guardian Environment", "https://www.theguardian.com/environment/rss", "Environment"),
-            ("The Guardian Education", "https://www.theguardian.com/education/rss", "Education"),
-            ("The Guardian Culture", "https://www.theguardian.com/culture/rss", "Culture"),
-            ("The Guardian Sport", "https://www.theguardian.com/sport/rss", "Sports"),
-            ("The Guardian Science", "https://www.theguardian.com/science/rss", "Environment"),
-            
-            # Reuters - 多个分类
-            ("Reuters World", "https://www.reuters.com/rssFeed/worldNews", "Politics"),
-            ("Reuters Business", "https://www.reuters.com/rssFeed/businessNews", "Business"),
-            ("Reuters Technology", "https://www.reuters.com/rssFeed/technologyNews", "Technology"),
-            ("Reuters Health", "https://www.reuters.com/rssFeed/healthNews", "Health"),
-            ("Reuters Environment", "https://www.reuters.com/rssFeed/environmentNews", "Environment"),
-            ("Reuters Sports", "https://www.reuters.com/rssFeed/sportsNews", "Sports"),
-            
-            # NPR - 多个分类
-            ("NPR News", "https://feeds.npr.org/1001/rss.xml", "Politics"),
-            ("NPR World", "https://feeds.npr.org/1004/rss.xml", "Politics"),
-            ("NPR Business", "https://feeds.npr.org/1006/rss.xml", "Business"),
-            ("NPR Technology", "https://feeds.npr.org/1019/rss.xml", "Technology"),
-            ("NPR Health", "https://feeds.npr.org/1128/rss.xml", "Health"),
-            ("NPR Education", "https://feeds.npr.org/1013/rss.xml", "Education"),
-            ("NPR Science", "https://feeds.npr.org/1007/rss.xml", "Environment"),
-            
-            # Associated Press
-            ("Associated Press", "https://feeds.apnews.com/rss/apf-topnews", "Politics"),
-            ("AP Business", "https://feeds.apnews.com/rss/apf-business", "Business"),
-            ("AP Technology", "https://feeds.apnews.com/rss/apf-technology", "Technology"),
-            ("AP Health", "https://feeds.apnews.com/rss/apf-health", "Health"),
-            ("AP Sports", "https://feeds.apnews.com/rss/apf-sports", "Sports"),
-            
-            # TIME Magazine
-            ("TIME", "https://feeds.feedburner.com/time/topstories", "Politics"),
-            ("TIME Business", "https://feeds.feedburner.com/time/business", "Business"),
-            ("TIME Health", "https://feeds.feedburner.com/time/health", "Health"),
-            ("TIME Science", "https://feeds.feedburner.com/time/science", "Environment"),
-            
-            # Newsweek
-            ("Newsweek", "https://www.newsweek.com/rss", "Politics"),
-            ("Newsweek Tech", "https://www.newsweek.com/tech-science/rss", "Technology"),
-            ("Newsweek Health", "https://www.newsweek.com/health/rss", "Health"),
-            
-            # The Economist
-            ("The Economist", "https://www.economist.com/rss", "Business"),
-            
-            # 科技类专业媒体
-            ("TechCrunch", "https://techcrunch.com/feed/", "Technology"),
-            ("Wired", "https://www.wired.com/feed/rss", "Technology"),
-            ("Ars Technica", "http://feeds.arstechnica.com/arstechnica/index", "Technology"),
-            ("The Verge", "https://www.theverge.com/rss/index.xml", "Technology"),
-            ("MIT Technology Review", "https://www.technologyreview.com/feed/", "Technology"),
-            ("Engadget", "https://www.engadget.com/rss.xml", "Technology"),
-            ("ZDNet", "https://www.zdnet.com/news/rss.xml", "Technology"),
-            
-            # 商业类专业媒体
-            ("Forbes", "https://www.forbes.com/real-time/feed2/", "Business"),
-            ("Business Insider", "https://www.businessinsider.com/rss", "Business"),
-            ("Financial Times", "https://www.ft.com/rss/home", "Business"),
-            ("Harvard Business Review", "https://hbr.org/feed", "Business"),
-            ("Bloomberg", "https://feeds.bloomberg.com/markets/news.rss", "Business"),
-            ("Wall Street Journal", "https://feeds.a.dj.com/rss/RSSWorldNews.xml", "Business"),
-            ("MarketWatch", "https://feeds.marketwatch.com/marketwatch/topstories/", "Business"),
-            
-            # 科学健康类
-            ("Scientific American", "http://rss.sciam.com/ScientificAmerican-Global", "Environment"),
-            ("Nature News", "https://www.nature.com/nature.rss", "Environment"),
-            ("New Scientist", "https://www.newscientist.com/feed/home/", "Environment"),
-            ("Science Magazine", "https://www.science.org/rss/news_current.xml", "Environment"),
-            ("WebMD Health News", "https://www.webmd.com/rss/rss.aspx?RSSSource=RSS_PUBLIC", "Health"),
-            ("Medical News Today", "https://www.medicalnewstoday.com/rss", "Health"),
-            ("Healthline", "https://www.healthline.com/rss", "Health"),
-            
-            # 教育类
-            ("Education Week", "https://www.edweek.org/feed", "Education"),
-            ("Chronicle of Higher Education", "https://www.chronicle.com/section/News/6/rss", "Education"),
-            ("Inside Higher Ed", "https://www.insidehighered.com/rss.xml", "Education"),
-            
-            # 环境类
-            ("Environmental News Network", "https://www.enn.com/rss", "Environment"),
-            ("Climate Central", "https://www.climatecentral.org/rss.xml", "Environment"),
-            ("National Geographic", "https://www.nationalgeographic.com/pages/article/feeds", "Environment"),
-            
-            # 文化类
-            ("Smithsonian Magazine", "https://www.smithsonianmag.com/rss/latest_articles/", "Culture"),
-            ("The New Yorker", "https://www.newyorker.com/feed/news", "Culture"),
-            ("The Atlantic", "https://www.theatlantic.com/feed/all/", "Culture"),
-            ("Slate", "https://slate.com/feeds/all.rss", "Culture"),
-            ("Vox", "https://www.vox.com/rss/index.xml", "Culture"),
-            
-            # 体育类
-            ("ESPN", "https://www.espn.com/espn/rss/news", "Sports"),
-            ("Sports Illustrated", "https://www.si.com/rss/si_topstories.rss", "Sports"),
-            ("BBC Sport", "http://feeds.bbci.co.uk/sport/rss.xml", "Sports"),
-            ("CNN Sports", "http://rss.cnn.com/rss/edition_sport.rss", "Sports"),
-            
-            # 国际媒体
-            ("Al Jazeera", "https://www.aljazeera.com/xml/rss/all.xml", "Politics"),
-            ("Deutsche Welle", "https://rss.dw.com/rdf/rss-en-all", "Politics"),
-            ("France 24", "https://www.france24.com/en/rss", "Politics"),
-            ("RT News", "https://www.rt.com/rss/", "Politics"),
-            
-            # 其他优质源
-            ("Politico", "https://www.politico.com/rss/politicopicks.xml", "Politics"),
-            ("The Hill", "https://thehill.com/news/feed/", "Politics"),
-            ("Foreign Affairs", "https://www.foreignaffairs.com/rss.xml", "Politics"),
-            ("Foreign Policy", "https://foreignpolicy.com/feed/", "Politics")
-        ]
-
-        for source_name, rss_url, default_category in rss_sources:
-            try:
-                articles = self.crawl_rss_feed(rss_url, source_name, default_category, max_articles_per_source)
-                all_articles.extend(articles)
-            except Exception as e:
-                print(f"RSS源失败 {source_name}: {e}")
-                continue
+        """爬取所有源的文章（并发，返回所有源文章的合并列表）"""
+        return self.crawl_feeds(DEFAULT_RSS_SOURCES, max_articles_per_source)
+    
+    def iter_all_sources(self, max_articles_per_source=20):
+        """爬取所有源的文章，按源完成的先后逐篇产出（流式）"""
+        return self.iter_feeds(DEFAULT_RSS_SOURCES, max_articles_per_source)
+    
+    def crawl_feeds(self, rss_sources, max_articles_per_source=20):
+        """并发抓取多个RSS源，结果按 rss_sources 的顺序合并
+        
+        每个源的耗时、篇数与状态记录在 self.last_crawl_report 中。
+        """
+        rss_sources = list(rss_sources)
+        results = [[] for _ in rss_sources]
+        for index, articles, _ in self._iter_feed_results(rss_sources, max_articles_per_source):
+            results[index] = articles
+        return [article for articles in results for article in articles]
+    
+    def iter_feeds(self, rss_sources, max_articles_per_source=20):
+        """并发抓取多个RSS源，按源完成的先后逐篇产出文章（流式）"""
+        for _, articles, _ in self._iter_feed_results(rss_sources, max_articles_per_source):
+            yield from articles
+    
+    def _iter_feed_results(self, rss_sources, max_articles_per_source):
+        """并发抓取RSS源，按完成先后产出 (源序号, articles, 报告项)
+        
+        同时在途的源不超过 max_workers 个，调用方停止消费时不再提交新的源（背压）。
+        结束后每个源的报告写入 self.last_crawl_report，未开始的源记为 cancelled。
+        """
+        rss_sources = list(rss_sources)
+        self.cancel_event.clear()
+        self._reset_seen_urls()
+        with self._feed_states_lock:
+            self._pending_feed_states = {}
+        started = time.monotonic()
+        report = [None] * len(rss_sources)
+        total = 0
         
-        print(f"总共爬取到 {len(all_articles)} 篇文章")
-        return all_articles
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {}
+        next_index = 0
+        try:
+            while True:
+                while (next_index < len(rss_sources) and len(pending) < self.max_workers
+                       and not self.cancel_event.is_set()):
+                    source_name, rss_url, default_category = rss_sources[next_index]
+                    future = pool.submit(
+                        self._timed_crawl_feed, rss_url, source_name, default_category, max_articles_per_source
+                    )
+                    pending[future] = next_index
+                    next_index += 1
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    articles, entry = future.result()
+                    report[index] = entry
+                    total += len(articles)
+                    yield index, articles, entry
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            for index, (source_name, rss_url, _) in enumerate(rss_sources):
+                if report[index] is None:
+                    report[index] = {'source': source_name, 'url': rss_url, 'status': 'cancelled',
+                                     'articles': 0, 'seconds': 0.0}
+            self.last_crawl_report = report
+            failed = [r for r in report if r['status'] != 'ok']
+            print(f"总共爬取到 {total} 篇文章，{len(report)} 个源，"
+                  f"失败/超时 {len(failed)} 个，耗时 {time.monotonic() - started:.1f}s")
+    
+    def _timed_crawl_feed(self, rss_url, source_name, default_category, max_articles):
+        """抓取单个源并记录耗时；异常不向外抛出，返回 (articles, 报告项)"""
+        started = time.monotonic()
+        entry = {'source': source_name, 'url': rss_url, 'status': 'ok', 'articles': 0}
+        articles = []
+        try:
+            articles = self.crawl_rss_feed(rss_url, source_name, default_category, max_articles)
+            entry['articles'] = len(articles)
+            if self.cancel_event.is_set():
+                entry['status'] = 'cancelled'
+            elif time.monotonic() - started >= self.feed_timeout:
+                entry['status'] = 'timeout'
+        except Exception as e:
+            print(f"RSS源失败 {source_name}: {e}")
+            entry['status'] = 'error'
+            entry['error'] = str(e)
+        entry['seconds'] = round(time.monotonic() - started, 2)
+        return articles, entry
 
-    def crawl_rss_feed(self, rss_url, source_name, default_category, max_articles=50):
-        """基于RSS稳定抓取文章列表并获取正文"""
+    def crawl_rss_feed(self, rss_url, source_name, default_category, max_articles=50, timeout=None):
+        """基于RSS稳定抓取文章列表并获取正文
+        
+        使用条件请求（ETag / Last-Modified），RSS未更新（304）时直接返回空列表；
+        只处理比上次抓取的高水位更新、且未见过的条目。
+        正文页面并发下载；超过 timeout（默认 self.feed_timeout 秒）或被取消时，
+        放弃尚未完成的下载，返回已得到的文章（此时不更新RSS状态，下次重试）。
+        """
         print(f"开始爬取RSS: {source_name}")
-        feed = feedparser.parse(rss_url)
-        articles = []
+        deadline = time.monotonic() + (timeout or self.feed_timeout)
+        # 回放时RSS来自缓存，不使用也不更新条件请求状态
+        use_feed_state = self.use_feed_cache and not self.replay
+        state = self.db.get_feed_state(rss_url) if use_feed_state else None
+        
+        feed, resp = self._parse_feed(rss_url, state)
+        if feed is None:
+            print(f"{source_name}: RSS未更新，跳过")
+            self.db.touch_feed_state(rss_url, resp.status_code)
+            return []
         
-        for entry in feed.entries[:max_articles]:
+        high_water = state['high_water'] if state else None
+        seen_ids = set(state['entry_ids']) if state else set()
+        
+        entries = []
+        # 上次已处理过的条目，保存状态时继续保留
+        seen_entry_ids = []
+        for entry in feed.entries:
             try:
                 title = entry.title if hasattr(entry, 'title') else ''
                 link = entry.link if hasattr(entry, 'link') else ''
                 author = getattr(entry, 'author', source_name)
                 published = None
+                published_at = None
                 if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published = datetime(*entry.published_parsed[:6]).date()
+                    published_at = datetime(*entry.published_parsed[:6])
+                    published = published_at.date()
                 
+                entry_id = getattr(entry, 'id', None) or link
+                # 高水位之前的条目与上次见过的条目都已处理过
+                if entry_id in seen_ids or (published_at and high_water and published_at <= high_water):
+                    seen_entry_ids.append(entry_id)
+                    continue
+                entries.append((entry, title, link, author, published, published_at, entry_id))
+            except Exception as e:
+                print(f"解析RSS文章失败 {source_name}: {e}")
+                continue
+        
+        # 下载正文前去重：已入库或本轮已抓取的链接直接跳过
+        fresh_links = self._filter_new_urls([e[2] for e in entries], limit=max_articles)
+        # 达到 max_articles 后未检查的条目留到下次：不记为已见，高水位也不越过它们
+        deferred = []
+        if max_articles is not None and len(fresh_links) >= max_articles:
+            claimed = 0
+            for i, e in enumerate(entries):
+                if claimed == len(fresh_links):
+                    deferred = entries[i:]
+                    break
+                if e[2] == fresh_links[claimed]:
+                    claimed += 1
+        handled = entries[:len(entries) - len(deferred)]
+        by_link = {}
+        for e in entries:
+            by_link.setdefault(e[2], []).append(e)
+        skipped = (len(entries) if max_articles is None else min(len(entries), max_articles)) - len(fresh_links)
+        entries = [by_link[link].pop(0) for link in fresh_links]
+        if skipped > 0:
+            print(f"{source_name}: 跳过 {skipped} 篇已抓取的文章")
+        
+        futures = []
+        complete = True
+        if entries:
+            # 单个源的正文大多来自同一域名，线程数超过单域名上限并无收益
+            pool = ThreadPoolExecutor(max_workers=min(self.per_host_limit, len(entries)))
+            try:
+                futures = [pool.submit(self._download_entry_text, e[2]) for e in entries]
+                pending = set(futures)
+                while pending and not self.cancel_event.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        print(f"RSS源超时 {source_name}: 放弃 {len(pending)} 篇未完成的正文")
+                        break
+                    _, pending = wait(pending, timeout=min(remaining, 1.0), return_when=FIRST_COMPLETED)
+                complete = not pending
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        
+        articles = []
+        for (entry, title, link, author, published, _, _), future in zip(entries, futures):
+            if not future.done() or future.cancelled():
+                continue
+            try:
                 # 抓正文页面，容错尽量简单
-                content_text = self._download_article_text(link)
+                content_text = future.result()
                 if not content_text or len(content_text) < 200:
                     # RSS摘要兜底
                     summary = getattr(entry, 'summary', '')
@@ -442,54 +696,97 @@ class ArticleCrawler:
                     'word_count': len(content_text.split())
                 }
                 articles.append(article_data)
-                time.sleep(0.2)
             except Exception as e:
                 print(f"解析RSS文章失败 {source_name}: {e}")
                 continue
         
+        # 全部正文下载完才记录状态，否则下次仍需完整请求；状态在文章入库后
+        # 由 commit_feed_states 写入，入库前中断时这些条目下次会重新抓取
+        if complete and use_feed_state:
+            processed_times = [e[5] for e in handled if e[5]]
+            if processed_times:
+                candidate = max([high_water] + processed_times if high_water else processed_times)
+                # 有更早的条目被推迟时不推进高水位，否则下次会被当作已处理
+                if not any(e[5] and e[5] <= candidate for e in deferred):
+                    high_water = candidate
+            self._remember_feed_state(rss_url, [a['url'] for a in articles if a['url']], {
+                # 仍有推迟的条目时不保存缓存验证器，下次请求不会得到 304
+                'etag': None if deferred else resp.headers.get('ETag'),
+                'last_modified': None if deferred else resp.headers.get('Last-Modified'),
+                'entry_ids': seen_entry_ids + [e[6] for e in handled],
+                'high_water': high_water,
+                'status': resp.status_code,
+            })
+        
         return articles
+    
+    def _remember_feed_state(self, rss_url, article_urls, state):
+        """暂存RSS源的新状态，等该源的文章入库后再由 commit_feed_states 写入数据库"""
+        with self._feed_states_lock:
+            self._pending_feed_states[rss_url] = (article_urls, state)
+    
+    def commit_feed_states(self):
+        """写入暂存的RSS源状态：只写入文章已全部入库的源，返回写入的源数
+        
+        有文章未入库（分析失败、抓取中断）的源不更新状态，下次抓取时重新处理其条目；
+        已入库的文章会在抓取前去重时跳过。
+        """
+        with self._feed_states_lock:
+            pending = self._pending_feed_states
+            self._pending_feed_states = {}
+        committed = 0
+        for rss_url, (article_urls, state) in pending.items():
+            missing = set(article_urls) - self.db.known_urls(article_urls)
+            if missing:
+                print(f"{rss_url}: {len(missing)} 篇文章未入库，不更新RSS状态")
+                continue
+            self.db.save_feed_state(rss_url, **state)
+            committed += 1
+        return committed
+    
+    def _parse_feed(self, rss_url, state=None):
+        """通过统一的 _fetch 下载RSS（带超时与并发限制）后交给 feedparser 解析
+        
+        state 中有 ETag / Last-Modified 时发送条件请求；返回 (feed, response)，
+        服务端返回 304 时 feed 为 None。200 响应会写入页面缓存，供回放模式使用。
+        """
+        request_headers = {}
+        if state and state.get('etag'):
+            request_headers['If-None-Match'] = state['etag']
+        if state and state.get('last_modified'):
+            request_headers['If-Modified-Since'] = state['last_modified']
+        
+        resp = self._fetch_cached(rss_url, timeout=10, use_cache=False, headers=request_headers)
+        if resp.status_code == 304:
+            return None, resp
+        resp.raise_for_status()
+        headers = {k.lower(): v for k, v in resp.headers.items()}
+        headers['content-location'] = resp.url
+        return feedparser.parse(resp.content, response_headers=headers), resp
+    
+    def _download_entry_text(self, url):
+        """下载单篇RSS文章正文（在线程池中执行）"""
+        if self.cancel_event.is_set():
+            return None
+        return self._download_article_text(url)
 
     def _download_article_text(self, url):
         """下载页面并尽量抽取正文（通用兜底版）"""
         try:
-            resp = self.session.get(url, timeout=10)
+            resp = self._fetch_cached(url, timeout=10)
             resp.raise_for_status()
-            soup = BeautifulSoup(resp.content, 'html.parser')
-            # 常见正文容器兜底
-            selectors = [
-                'article',
-                'div.article__content',
-                'div.c-article-content',
-                'div#content',
-                'div.entry-content',
-                'section.article-body',
-                'div.l-container'
-            ]
-            texts = []
-            for sel in selectors:
-                node = soup.select_one(sel)
-                if node:
-                    ps = node.find_all(['p','li'])
-                    texts = [p.get_text().strip() for p in ps if p.get_text().strip()]
-                    if len(' '.join(texts)) > 200:
-                        break
-            if not texts:
-                # 全页兜底
-                ps = soup.find_all('p')
-                texts = [p.get_text().strip() for p in ps if p.get_text().strip()]
-            return '\n'.join(texts)
+            return extract_article_text(resp.content)
         except Exception:
             return None
     
     def save_articles_to_db(self, articles):
-        """将文章保存到数据库"""
-        saved_count = 0
-        for article in articles:
-            article_id = self.db.add_article(article)
-            if article_id:
-                saved_count += 1
-        
-        print(f"成功保存 {saved_count} 篇文章到数据库")
+        """将文章批量保存到数据库（单事务）"""
+        results = self.db.add_articles_bulk(articles)
+        self.commit_feed_states()
+        saved_count = sum(1 for r in results if r['id'])
+        duplicate_count = sum(1 for r in results if r['duplicate'])
+        
+        print(f"成功保存 {saved_count} 篇文章到数据库，跳过重复 {duplicate_count} 篇")
         return saved_count
 
 if __name__ == "__main__":
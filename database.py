@@ -1,9 +1,275 @@
 import sqlite3
 import os
+import json
+import base64
+import math
+import re
+import sys
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from url_utils import canonicalize_url
+
+# 连接级 PRAGMA 默认值（可通过构造参数 pragmas 覆盖）
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',      # 读写并发：读不阻塞写
+    'synchronous': 'NORMAL',    # WAL 下 NORMAL 已足够安全，避免每次提交 fsync
+    'cache_size': -16000,       # 负数单位为 KB，约 16MB 页缓存
+    'mmap_size': 134217728,     # 128MB 内存映射读
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,       # 毫秒，写锁竞争时等待而不是立即报错
+}
+
+# 文章写入的列（顺序与 _article_values 一致）
+ARTICLE_INSERT_COLUMNS = (
+    'title', 'author', 'content', 'summary', 'url', 'source',
+    'publish_date', 'difficulty_level', 'difficulty_score',
+    'category', 'tags', 'word_count', 'canonical_url'
+)
+
+_INSERT_ARTICLE_SQL = (
+    f"INSERT INTO articles ({', '.join(ARTICLE_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(ARTICLE_INSERT_COLUMNS))})"
+)
+
+def _article_values(article_data):
+    """按 ARTICLE_INSERT_COLUMNS 顺序取出文章字段（canonical_url 缺省时由 url 计算）"""
+    values = dict(article_data)
+    if not values.get('canonical_url'):
+        values['canonical_url'] = canonicalize_url(values.get('url'))
+    return tuple(values.get(column) for column in ARTICLE_INSERT_COLUMNS)
+
+def _backfill_canonical_urls(conn):
+    """为已有文章计算 canonical_url"""
+    rows = conn.execute("SELECT id, url FROM articles WHERE url IS NOT NULL").fetchall()
+    conn.executemany(
+        "UPDATE articles SET canonical_url = ? WHERE id = ?",
+        [(canonicalize_url(url), article_id) for article_id, url in rows]
+    )
+
+# 统计汇总维度：(维度名, 取值表达式)；空值统一记为 ''
+STATS_DIMENSIONS = (
+    ('all', "''"),
+    ('category', "IFNULL(category, '')"),
+    ('source', "IFNULL(source, '')"),
+    ('difficulty', "IFNULL(difficulty_level, '')"),
+)
+
+# /api/stats 返回的难度分位点
+STATS_PERCENTILES = (25, 50, 75, 90)
+
+def _stats_trigger_sql(name, event, changes):
+    """生成维护 article_stats 的触发器；changes 为 [(new/old, +1/-1), ...]"""
+    statements = []
+    for row, sign in changes:
+        for dimension, expr in STATS_DIMENSIONS:
+            value = re.sub(r'\b(category|source|difficulty_level)\b', rf'{row}.\1', expr)
+            statements.append(
+                f"INSERT OR IGNORE INTO article_stats (dimension, value) VALUES ('{dimension}', {value});"
+            )
+            statements.append(f'''
+                UPDATE article_stats SET
+                    article_count = article_count + ({sign}),
+                    score_sum = score_sum + ({sign}) * IFNULL({row}.difficulty_score, 0),
+                    score_count = score_count + ({sign}) * ({row}.difficulty_score IS NOT NULL)
+                WHERE dimension = '{dimension}' AND value = {value};''')
+    body = '\n'.join(statements)
+    return f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON articles BEGIN\n{body}\nEND"
+
+# 结构迁移：(版本号, [SQL...])，按 PRAGMA user_version 只执行尚未应用的版本
+SCHEMA_MIGRATIONS = [
+    (1, [
+        # 列表页：分类 + 难度筛选，按时间倒序
+        "CREATE INDEX IF NOT EXISTS idx_articles_category_difficulty_created ON articles (category, difficulty_level, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_articles_category_created ON articles (category, created_at)",
+        # 推荐 / 难度统计：仅按难度筛选或分组
+        "CREATE INDEX IF NOT EXISTS idx_articles_difficulty_created ON articles (difficulty_level, created_at)",
+        # 按来源浏览
+        "CREATE INDEX IF NOT EXISTS idx_articles_source_created ON articles (source, created_at)",
+        # 无筛选的时间排序，带 id 便于稳定排序
+        "CREATE INDEX IF NOT EXISTS idx_articles_created ON articles (created_at, id)",
+    ]),
+    (2, [
+        # 按难度 / 篇幅排序的分页（表达式与 ARTICLE_SORT_ORDERS 保持一致）
+        "CREATE INDEX IF NOT EXISTS idx_articles_difficulty_score ON articles (IFNULL(difficulty_score, 0), id)",
+        "CREATE INDEX IF NOT EXISTS idx_articles_word_count ON articles (IFNULL(word_count, 0), id)",
+    ]),
+    (3, [
+        # 统计汇总表：按维度增量维护文章数与难度分累计，供 /api/stats 与 /api/sources 使用
+        '''
+            CREATE TABLE IF NOT EXISTS article_stats (
+                dimension TEXT NOT NULL,
+                value TEXT NOT NULL,
+                article_count INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                score_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, value)
+            )
+        ''',
+        "DELETE FROM article_stats",
+    ] + [
+        f'''
+            INSERT INTO article_stats (dimension, value, article_count, score_sum, score_count)
+            SELECT '{dimension}', {expr}, COUNT(*), IFNULL(SUM(difficulty_score), 0), COUNT(difficulty_score)
+            FROM articles GROUP BY 2
+        '''
+        for dimension, expr in STATS_DIMENSIONS
+    ] + [
+        "INSERT OR IGNORE INTO article_stats (dimension, value) VALUES ('all', '')",
+        _stats_trigger_sql('article_stats_ai', 'AFTER INSERT', [('new', 1)]),
+        _stats_trigger_sql('article_stats_ad', 'AFTER DELETE', [('old', -1)]),
+        _stats_trigger_sql(
+            'article_stats_au', 'AFTER UPDATE OF category, source, difficulty_level, difficulty_score',
+            [('old', -1), ('new', 1)]
+        ),
+        # 难度分位数：按分数有序遍历的覆盖索引
+        "CREATE INDEX IF NOT EXISTS idx_articles_score ON articles (difficulty_score) WHERE difficulty_score IS NOT NULL",
+    ]),
+    (4, [
+        # 规范化 URL：抓取前按它判断文章是否已入库
+        "ALTER TABLE articles ADD COLUMN canonical_url TEXT",
+        _backfill_canonical_urls,
+        "CREATE INDEX IF NOT EXISTS idx_articles_canonical_url ON articles (canonical_url)",
+    ]),
+    (5, [
+        # RSS 条件请求状态：缓存验证器、已见条目与发布时间高水位
+        '''
+        CREATE TABLE IF NOT EXISTS feed_state (
+            feed_url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            entry_ids TEXT NOT NULL DEFAULT '[]',
+            high_water TEXT,
+            last_status INTEGER,
+            last_checked TIMESTAMP
+        )
+        ''',
+    ]),
+    (6, [
+        # 后台任务：owner 为执行进程（主机名:pid），version 每次更新加一，供进度推送判断变化
+        '''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            params TEXT,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            owner TEXT,
+            version INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)",
+    ]),
+    (7, [
+        # 文本分析结果缓存：cache_key 由文本内容哈希、组件、参数与算法版本组成，value 为 JSON
+        '''
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            cache_key TEXT PRIMARY KEY,
+            component TEXT NOT NULL,
+            value TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_analysis_cache_created ON analysis_cache (created_at)",
+    ]),
+]
+
+# 后台任务状态：queued → running → succeeded / failed
+JOB_TERMINAL_STATUSES = ('succeeded', 'failed')
+
+# 每个RSS源最多保留的已见条目ID数
+FEED_ENTRY_IDS_LIMIT = 1000
+
+# articles 表全部列（与 SELECT * 的顺序一致）
+ARTICLE_FIELDS = (
+    'id', 'title', 'author', 'content', 'summary', 'url', 'source',
+    'publish_date', 'difficulty_level', 'difficulty_score', 'category',
+    'tags', 'word_count', 'created_at', 'updated_at', 'canonical_url'
+)
+
+# 对外展示的文章字段（不含 updated_at 等内部记录列，均位于 SELECT * 的前部）
+ARTICLE_DETAIL_FIELDS = ARTICLE_FIELDS[:ARTICLE_FIELDS.index('updated_at')]
+
+# 列表视图默认投影：不读取正文
+ARTICLE_LIST_FIELDS = (
+    'id', 'title', 'author', 'summary', 'url', 'source', 'publish_date',
+    'difficulty_level', 'difficulty_score', 'category', 'tags',
+    'word_count', 'created_at'
+)
+
+def _select_columns(fields=None, prefix=''):
+    """把字段序列转换为 SELECT 列清单；None 表示全部列"""
+    if fields is None:
+        return f"{prefix}*"
+    unknown = [f for f in fields if f not in ARTICLE_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"不支持的字段: {', '.join(unknown) or '(空)'}")
+    return ', '.join(f"{prefix}{f}" for f in fields)
+
+# 列表排序方式（与前端 sortOrder 选项一致）：名称 -> (排序键表达式, 方向)
+# 空值按 0 处理，与前端原先的客户端排序保持一致
+ARTICLE_SORT_ORDERS = {
+    'newest': ('created_at', 'DESC'),
+    'oldest': ('created_at', 'ASC'),
+    'difficulty_asc': ('IFNULL(difficulty_score, 0)', 'ASC'),
+    'difficulty_desc': ('IFNULL(difficulty_score, 0)', 'DESC'),
+    'length_asc': ('IFNULL(word_count, 0)', 'ASC'),
+    'length_desc': ('IFNULL(word_count, 0)', 'DESC'),
+}
+
+def encode_cursor(sort, key, article_id):
+    """把分页位置编码为不透明的 URL 安全字符串"""
+    payload = json.dumps([sort, key, article_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, sort):
+    """解析分页游标，返回 (排序键, id)；游标无效或与排序方式不符时抛出 ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, key, article_id = json.loads(base64.urlsafe_b64decode(padded).decode('utf-8'))
+    except Exception:
+        raise ValueError("无效的分页游标")
+    if cursor_sort != sort or not isinstance(article_id, int):
+        raise ValueError("分页游标与排序方式不匹配")
+    return key, article_id
+
+_ARTICLE_BY_ID_SQL = "SELECT * FROM articles WHERE id = ?"
+
+_DIFFICULTY_STATS_SQL = '''
+    SELECT difficulty_level, COUNT(*) as count 
+    FROM articles 
+    WHERE difficulty_level IS NOT NULL
+    GROUP BY difficulty_level
+'''
+
+# 全文检索列权重（bm25）：标题 > 摘要 > 正文
+FTS_COLUMN_WEIGHTS = (10.0, 5.0, 1.0)
+
+def _build_fts_query(keyword):
+    """把用户输入转换为 FTS5 MATCH 表达式
+    
+    支持 "双引号短语" 与 末尾 * 的前缀查询，其余词按 AND 组合；
+    每个词都被引号包裹，避免用户输入触发 FTS5 语法错误。
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', keyword or ''):
+        tokens = re.findall(r'\w+', phrase or word)
+        if not tokens:
+            continue
+        term = '"' + ' '.join(tokens) + '"'
+        if word and word.endswith('*'):
+            term += '*'
+        terms.append(term)
+    return ' '.join(terms)
 
 class DatabaseManager:
-    def __init__(self, db_path="None"):
+    def __init__(self, db_path="None", pool_size=5, pool_timeout=30, pragmas=None):
          # 动态设置数据库路径
         if db_path is None:
             if os.path.exists('/data'):
@@ -12,194 +278,765 @@ class DatabaseManager:
                 self.db_path = 'articles.db'  # 本地开发
         else:
             self.db_path = db_path
+        
+        # 连接池配置：内存数据库每个连接互相独立，只能使用单连接
+        self.pool_size = 1 if self.db_path == ':memory:' else max(1, int(pool_size))
+        self.pool_timeout = pool_timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        
+        self.fts_enabled = False
+        self._lock = threading.Lock()
+        self._reset_pool()
         self.init_database()
     
+    def _reset_pool(self):
+        """重建空连接池（初始化或 fork 之后调用）"""
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+        self._created = 0
+        self._pid = os.getpid()
+    
+    def _create_connection(self):
+        """创建一个新连接并应用 PRAGMA"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+    
+    def _acquire(self):
+        """从连接池借出连接，池未满时按需创建"""
+        # gunicorn --preload 等场景下 fork 出的子进程不能复用父进程的连接
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset_pool()
+        
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_create = self._created < self.pool_size
+            if can_create:
+                self._created += 1
+        
+        if can_create:
+            try:
+                return self._create_connection()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        try:
+            return self._pool.get(timeout=self.pool_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"数据库连接池已耗尽 (pool_size={self.pool_size})")
+    
+    def _release(self, conn):
+        """归还连接，未提交的事务一律回滚"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put_nowait(conn)
+        except Exception:
+            # 连接已损坏或池已满：直接关闭并释放名额
+            conn.close()
+            with self._lock:
+                self._created -= 1
+    
+    @contextmanager
+    def connection(self):
+        """借出一个连接：with db.connection() as conn: ...
+        
+        块内抛出异常时回滚，退出时连接自动归还连接池；写操作需自行 commit。
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+    
+    def close(self):
+        """关闭连接池中所有空闲连接"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+    
     def init_database(self):
         """初始化数据库表结构"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 创建文章表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS articles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                author TEXT,
-                content TEXT NOT NULL,
-                summary TEXT,
-                url TEXT UNIQUE,
-                source TEXT,
-                publish_date DATE,
-                difficulty_level TEXT,
-                difficulty_score REAL,
-                category TEXT,
-                tags TEXT,
-                word_count INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建分类表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建标签表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tags (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建文章标签关联表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS article_tags (
-                article_id INTEGER,
-                tag_id INTEGER,
-                FOREIGN KEY (article_id) REFERENCES articles (id),
-                FOREIGN KEY (tag_id) REFERENCES tags (id),
-                PRIMARY KEY (article_id, tag_id)
-            )
-        ''')
-        
-        # 插入默认分类
-        default_categories = [
-            ('Technology', '科技类文章'),
-            ('Business', '商业类文章'),
-            ('Health', '健康类文章'),
-            ('Education', '教育类文章'),
-            ('Culture', '文化类文章'),
-            ('Politics', '政治类文章'),
-            ('Environment', '环境类文章'),
-            ('Sports', '体育类文章')
-        ]
-        
-        cursor.executemany('''
-            INSERT OR IGNORE INTO categories (name, description) VALUES (?, ?)
-        ''', default_categories)
-        
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # 创建文章表
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    author TEXT,
+                    content TEXT NOT NULL,
+                    summary TEXT,
+                    url TEXT UNIQUE,
+                    source TEXT,
+                    publish_date DATE,
+                    difficulty_level TEXT,
+                    difficulty_score REAL,
+                    category TEXT,
+                    tags TEXT,
+                    word_count INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # 创建分类表
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS categories (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    description TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # 创建标签表
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS tags (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # 创建文章标签关联表
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS article_tags (
+                    article_id INTEGER,
+                    tag_id INTEGER,
+                    FOREIGN KEY (article_id) REFERENCES articles (id),
+                    FOREIGN KEY (tag_id) REFERENCES tags (id),
+                    PRIMARY KEY (article_id, tag_id)
+                )
+            ''')
+            
+            # 插入默认分类
+            default_categories = [
+                ('Technology', '科技类文章'),
+                ('Business', '商业类文章'),
+                ('Health', '健康类文章'),
+                ('Education', '教育类文章'),
+                ('Culture', '文化类文章'),
+                ('Politics', '政治类文章'),
+                ('Environment', '环境类文章'),
+                ('Sports', '体育类文章')
+            ]
+            
+            cursor.executemany('''
+                INSERT OR IGNORE INTO categories (name, description) VALUES (?, ?)
+            ''', default_categories)
+            
+            conn.commit()
+        
+        self._migrate_schema()
+        self._init_search_index()
+    
+    def _migrate_schema(self):
+        """按版本号依次应用 SCHEMA_MIGRATIONS 中尚未执行的迁移"""
+        with self.connection() as conn:
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            for version, statements in SCHEMA_MIGRATIONS:
+                if version <= current:
+                    continue
+                for statement in statements:
+                    # 需要 Python 参与的数据迁移以可调用对象给出
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+                current = version
+    
+    def get_schema_version(self):
+        """当前数据库结构版本"""
+        with self.connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def explain_query_plan(self, query, params=()):
+        """返回查询计划的描述列表（EXPLAIN QUERY PLAN 的 detail 列）"""
+        with self.connection() as conn:
+            return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    
+    def _init_search_index(self):
+        """创建 FTS5 全文索引及同步触发器；FTS5 不可用时退回 LIKE 搜索"""
+        with self.connection() as conn:
+            existed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+            ).fetchone() is not None
+            
+            try:
+                # 外部内容表：索引只存倒排，正文仍由 articles 保存
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                        title, summary, content,
+                        content='articles', content_rowid='id',
+                        tokenize='porter unicode61 remove_diacritics 2'
+                    )
+                ''')
+            except sqlite3.OperationalError as e:
+                print(f"FTS5 不可用，搜索将使用 LIKE: {e}")
+                self.fts_enabled = False
+                return
+            
+            conn.executescript('''
+                CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+                    INSERT INTO articles_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END;
+                
+                CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                END;
+                
+                CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, summary, content ON articles BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                    INSERT INTO articles_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END;
+            ''')
+            self.fts_enabled = True
+        
+        # 旧数据库首次启用全文索引时回填已有文章
+        if not existed:
+            self.rebuild_search_index()
+    
+    def rebuild_search_index(self):
+        """根据 articles 表重建全文索引，返回索引的文章数"""
+        if not self.fts_enabled:
+            return 0
+        
+        with self.connection() as conn:
+            conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+            conn.commit()
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
     
     def add_article(self, article_data):
         """添加文章到数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                cursor.execute(_INSERT_ARTICLE_SQL, _article_values(article_data))
+                
+                article_id = cursor.lastrowid
+                conn.commit()
+                return article_id
+                
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                print(f"文章已存在: {article_data.get('url')}")
+                return None
+    
+    def add_articles_bulk(self, articles, chunk_size=200):
+        """批量添加文章：整批在同一事务内分块 executemany，只提交一次
         
-        try:
-            cursor.execute('''
-                INSERT INTO articles (
-                    title, author, content, summary, url, source, 
-                    publish_date, difficulty_level, difficulty_score, 
-                    category, tags, word_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                article_data.get('title'),
-                article_data.get('author'),
-                article_data.get('content'),
-                article_data.get('summary'),
-                article_data.get('url'),
-                article_data.get('source'),
-                article_data.get('publish_date'),
-                article_data.get('difficulty_level'),
-                article_data.get('difficulty_score'),
-                article_data.get('category'),
-                article_data.get('tags'),
-                article_data.get('word_count')
-            ))
+        返回与输入顺序一致的结果列表，每项为
+        {'url': ..., 'id': 文章ID或None, 'duplicate': 是否因URL重复被跳过}；
+        id 为 None 且非重复表示该行违反其他约束（如标题为空）被忽略。
+        """
+        results = []
+        with self.connection() as conn:
+            # IMMEDIATE 先拿写锁，保证“查重 → 插入 → 取ID”之间不被其他写入打断
+            conn.execute("BEGIN IMMEDIATE")
+            
+            chunk = []
+            for article_data in articles:
+                chunk.append(article_data)
+                if len(chunk) >= chunk_size:
+                    results.extend(self._insert_chunk(conn, chunk))
+                    chunk = []
+            if chunk:
+                results.extend(self._insert_chunk(conn, chunk))
             
-            article_id = cursor.lastrowid
             conn.commit()
-            return article_id
+        return results
+    
+    def _insert_chunk(self, conn, chunk):
+        """在当前事务内插入一块文章（INSERT OR IGNORE），返回逐行结果"""
+        urls = list({a.get('url') for a in chunk if a.get('url')})
+        placeholders = ', '.join('?' * len(urls))
+        existing = set()
+        if urls:
+            existing = {row[0] for row in conn.execute(
+                f"SELECT url FROM articles WHERE url IN ({placeholders})", urls
+            )}
+        
+        # 有 URL 的行走 executemany；无 URL 的行无法按 URL 回查 ID，单独插入
+        conn.executemany(
+            _INSERT_ARTICLE_SQL.replace('INSERT INTO', 'INSERT OR IGNORE INTO', 1),
+            [_article_values(a) for a in chunk if a.get('url')]
+        )
+        
+        ids = {}
+        if urls:
+            ids = dict(conn.execute(
+                f"SELECT url, id FROM articles WHERE url IN ({placeholders})", urls
+            ).fetchall())
+        
+        results = []
+        seen = set()
+        for article_data in chunk:
+            url = article_data.get('url')
+            if not url:
+                cursor = conn.execute(_INSERT_ARTICLE_SQL, _article_values(article_data))
+                results.append({'url': url, 'id': cursor.lastrowid, 'duplicate': False})
+                continue
             
-        except sqlite3.IntegrityError:
-            print(f"文章已存在: {article_data.get('url')}")
-            return None
-        finally:
-            conn.close()
+            # 库中已有或同批次内重复出现的 URL 都视为重复
+            duplicate = url in existing or url in seen
+            seen.add(url)
+            results.append({'url': url, 'id': None if duplicate else ids.get(url), 'duplicate': duplicate})
+        return results
+    
+    def known_urls(self, urls, chunk_size=500):
+        """返回 urls 中已入库的那些（按规范化 URL 比较），用于抓取前去重"""
+        by_canonical = {}
+        for url in urls:
+            if url:
+                by_canonical.setdefault(canonicalize_url(url), []).append(url)
+        
+        known = set()
+        canonical = list(by_canonical)
+        with self.connection() as conn:
+            for start in range(0, len(canonical), chunk_size):
+                chunk = canonical[start:start + chunk_size]
+                placeholders = ', '.join('?' * len(chunk))
+                for (value,) in conn.execute(
+                    f"SELECT canonical_url FROM articles WHERE canonical_url IN ({placeholders})", chunk
+                ):
+                    known.update(by_canonical[value])
+        return known
+    
+    def iter_article_contents(self, batch_size=500):
+        """按 id 顺序分批产出 [(id, content)]，键集分页，不一次读入全部正文"""
+        last_id = 0
+        while True:
+            with self.connection() as conn:
+                rows = conn.execute(
+                    "SELECT id, content FROM articles WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+    
+    def iter_labeled_articles(self, after_id=0, batch_size=500):
+        """按 id 顺序分批产出 id > after_id 且有分类的 [(id, title, content, category)]，供分类模型训练"""
+        last_id = after_id
+        while True:
+            with self.connection() as conn:
+                rows = conn.execute('''
+                    SELECT id, title, content, category FROM articles
+                    WHERE id > ? AND category IS NOT NULL AND category NOT IN ('', 'Unknown')
+                    ORDER BY id LIMIT ?
+                ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+    
+    def get_labeled_categories(self):
+        """文章中出现过的分类（不含空值与 Unknown）"""
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT DISTINCT category FROM articles
+                WHERE category IS NOT NULL AND category NOT IN ('', 'Unknown')
+            ''').fetchall()
+        return sorted(row[0] for row in rows)
+    
+    def update_difficulties(self, updates):
+        """批量更新难度 [(id, difficulty_level, difficulty_score)]，整批一个事务
+    
+        只改写结果有变化的行（统计汇总触发器随之更新），返回改动的行数。
+        """
+        with self.connection() as conn:
+            cursor = conn.executemany('''
+                UPDATE articles SET difficulty_level = ?, difficulty_score = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND (difficulty_level IS NOT ? OR difficulty_score IS NOT ?)
+            ''', [(level, score, article_id, level, score) for article_id, level, score in updates])
+            conn.commit()
+            return cursor.rowcount
     
-    def get_articles(self, limit=50, category=None, difficulty=None):
-        """获取文章列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_articles(self, limit=50, category=None, difficulty=None, source=None, fields=None):
+        """获取文章列表；fields 为列名序列时只查询这些列（按给定顺序）"""
+        query, params = self._build_articles_query(limit, category, difficulty, source, fields=fields)
+        with self.connection() as conn:
+            return conn.execute(query, params).fetchall()
+    
+    def get_articles_page(self, limit=12, category=None, difficulty=None, source=None,
+                          sort='newest', cursor=None, offset=0, fields=None):
+        """分页获取文章列表
+        
+        传入上一页返回的 cursor 时使用键集分页（WHERE (排序键, id) < 上一页末行），
+        否则按 offset 跳页。返回 (rows, next_cursor)，没有下一页时 next_cursor 为 None。
+        fields 为列名序列时只查询这些列，且必须包含 id。
+        """
+        if fields is not None and 'id' not in fields:
+            raise ValueError("分页查询的字段必须包含 id")
+        after = decode_cursor(cursor, sort) if cursor else None
+        query, params = self._build_articles_query(
+            limit + 1, category, difficulty, source, sort=sort, after=after,
+            offset=0 if after else offset, with_sort_key=True, fields=fields
+        )
+        with self.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            id_index = fields.index('id') if fields is not None else 0
+            next_cursor = encode_cursor(sort, last[-1], last[id_index])
         
-        query = "SELECT * FROM articles WHERE 1=1"
+        # 去掉末尾附加的排序键列，保持与所选列一致的行结构
+        return [row[:-1] for row in rows], next_cursor
+    
+    def count_articles(self, category=None, difficulty=None, source=None):
+        """统计符合筛选条件的文章数（走筛选列索引）"""
+        where, params = self._build_articles_filter(category, difficulty, source)
+        with self.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM articles WHERE {where}", params).fetchone()[0]
+    
+    def _build_articles_filter(self, category=None, difficulty=None, source=None):
+        """构造文章筛选条件，返回 (WHERE 子句, 参数)"""
+        clauses = ["1=1"]
         params = []
         
         if category:
-            query += " AND category = ?"
+            clauses.append("category = ?")
             params.append(category)
         
         if difficulty:
-            query += " AND difficulty_level = ?"
+            clauses.append("difficulty_level = ?")
             params.append(difficulty)
         
-        query += " ORDER BY created_at DESC LIMIT ?"
-        params.append(limit)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        
+        return ' AND '.join(clauses), params
+    
+    def _build_articles_query(self, limit, category=None, difficulty=None, source=None,
+                              sort='newest', after=None, offset=0, with_sort_key=False, fields=None):
+        """构造文章列表查询，返回 (SQL, 参数)
         
-        cursor.execute(query, params)
-        articles = cursor.fetchall()
+        after 为 (排序键, id) 时只返回排在其后的行；with_sort_key 在行末附加排序键列。
+        """
+        if sort not in ARTICLE_SORT_ORDERS:
+            raise ValueError(f"不支持的排序方式: {sort}")
+        key, direction = ARTICLE_SORT_ORDERS[sort]
         
-        conn.close()
-        return articles
+        where, params = self._build_articles_filter(category, difficulty, source)
+        if after is not None:
+            # 等价于 (key, id) < (?, ?)，拆开写以便表达式索引能做范围定位
+            op = '<' if direction == 'DESC' else '>'
+            where += f" AND {key} {op}= ? AND ({key} {op} ? OR id {op} ?)"
+            params.extend([after[0], after[0], after[1]])
+        
+        columns = _select_columns(fields)
+        if with_sort_key:
+            columns += f", {key}"
+        query = f"SELECT {columns} FROM articles WHERE {where} ORDER BY {key} {direction}, id {direction} LIMIT ?"
+        params.append(limit)
+        if offset:
+            query += " OFFSET ?"
+            params.append(offset)
+        
+        return query, params
     
     def get_article_by_id(self, article_id):
         """根据ID获取文章详情"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM articles WHERE id = ?", (article_id,))
-        article = cursor.fetchone()
-        
-        conn.close()
-        return article
+        with self.connection() as conn:
+            return conn.execute(_ARTICLE_BY_ID_SQL, (article_id,)).fetchone()
     
-    def search_articles(self, keyword, limit=20):
-        """搜索文章"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def search_articles(self, keyword, limit=20, fields=None):
+        """搜索文章：优先使用 FTS5 按 bm25 相关度排序，不可用时退回 LIKE"""
+        match_query = _build_fts_query(keyword) if self.fts_enabled else ''
         
-        cursor.execute('''
-            SELECT * FROM articles 
-            WHERE title LIKE ? OR content LIKE ? OR summary LIKE ?
-            ORDER BY created_at DESC LIMIT ?
-        ''', (f'%{keyword}%', f'%{keyword}%', f'%{keyword}%', limit))
+        if match_query:
+            try:
+                with self.connection() as conn:
+                    return conn.execute(f'''
+                        SELECT {_select_columns(fields, 'a.')} FROM articles_fts
+                        JOIN articles a ON a.id = articles_fts.rowid
+                        WHERE articles_fts MATCH ?
+                        ORDER BY bm25(articles_fts, {', '.join(map(str, FTS_COLUMN_WEIGHTS))})
+                        LIMIT ?
+                    ''', (match_query, limit)).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"全文检索失败，退回 LIKE 搜索: {e}")
         
-        articles = cursor.fetchall()
-        conn.close()
-        return articles
+        return self._search_articles_like(keyword, limit, fields)
+    
+    def _search_articles_like(self, keyword, limit, fields=None):
+        """LIKE 全表扫描搜索（FTS5 不可用时的兜底）"""
+        with self.connection() as conn:
+            return conn.execute(f'''
+                SELECT {_select_columns(fields)} FROM articles 
+                WHERE title LIKE ? OR content LIKE ? OR summary LIKE ?
+                ORDER BY created_at DESC LIMIT ?
+            ''', (f'%{keyword}%', f'%{keyword}%', f'%{keyword}%', limit)).fetchall()
     
     def get_categories(self):
         """获取所有分类"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM categories")
-        categories = cursor.fetchall()
-        
-        conn.close()
-        return categories
+        with self.connection() as conn:
+            return conn.execute("SELECT * FROM categories").fetchall()
+    
+    def get_stats(self):
+        """汇总统计：总数、难度均值/分位数、各维度计数与最近更新时间"""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT dimension, value, article_count, score_sum, score_count "
+                "FROM article_stats WHERE article_count > 0"
+            ).fetchall()
+            
+            stats = {
+                'total_articles': 0,
+                'scored_articles': 0,
+                'avg_difficulty_score': None,
+                'difficulty_percentiles': {},
+                'by_category': [],
+                'by_source': [],
+                'by_difficulty': [],
+                'last_update': conn.execute("SELECT MAX(created_at) FROM articles").fetchone()[0]
+            }
+            for dimension, value, count, score_sum, score_count in rows:
+                if dimension == 'all':
+                    stats['total_articles'] = count
+                    stats['scored_articles'] = score_count
+                    if score_count:
+                        stats['avg_difficulty_score'] = round(score_sum / score_count, 2)
+                else:
+                    stats[f'by_{dimension}'].append({'name': value or None, 'count': count})
+            
+            for key in ('by_category', 'by_source', 'by_difficulty'):
+                stats[key].sort(key=lambda item: -item['count'])
+            
+            # 最近秩分位数：在分数索引上按偏移定位，不做全表排序
+            scored = stats['scored_articles']
+            for p in STATS_PERCENTILES:
+                if not scored:
+                    break
+                offset = max(math.ceil(p / 100 * scored) - 1, 0)
+                stats['difficulty_percentiles'][f'p{p}'] = conn.execute(
+                    "SELECT difficulty_score FROM articles WHERE difficulty_score IS NOT NULL "
+                    "ORDER BY difficulty_score LIMIT 1 OFFSET ?", (offset,)
+                ).fetchone()[0]
+            
+            return stats
+    
+    def get_sources(self):
+        """获取所有来源及其文章数，按文章数降序"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT value, article_count FROM article_stats
+                WHERE dimension = 'source' AND value != '' AND article_count > 0
+                ORDER BY article_count DESC, value
+            ''').fetchall()
     
     def get_difficulty_stats(self):
         """获取难度统计"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT difficulty_level, COUNT(*) as count 
-            FROM articles 
-            WHERE difficulty_level IS NOT NULL
-            GROUP BY difficulty_level
-        ''')
-        
-        stats = cursor.fetchall()
-        conn.close()
-        return stats
+        with self.connection() as conn:
+            return conn.execute(_DIFFICULTY_STATS_SQL).fetchall()
+    
+    def get_feed_state(self, feed_url):
+        """获取RSS源上次抓取的状态，从未抓取过时返回 None
+        
+        返回 dict：etag、last_modified、entry_ids（列表）、high_water（datetime 或 None）。
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, entry_ids, high_water FROM feed_state WHERE feed_url = ?",
+                (feed_url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, entry_ids, high_water = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'entry_ids': json.loads(entry_ids or '[]'),
+            'high_water': datetime.fromisoformat(high_water) if high_water else None,
+        }
+    
+    def save_feed_state(self, feed_url, etag=None, last_modified=None, entry_ids=(), high_water=None, status=None):
+        """保存RSS源本次抓取的状态
+        
+        entry_ids 与已保存的ID合并（新的在前），最多保留 FEED_ENTRY_IDS_LIMIT 个。
+        """
+        previous = self.get_feed_state(feed_url)
+        merged = list(dict.fromkeys(list(entry_ids) + (previous['entry_ids'] if previous else [])))
+        with self.connection() as conn:
+            conn.execute('''
+                INSERT INTO feed_state (feed_url, etag, last_modified, entry_ids, high_water, last_status, last_checked)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(feed_url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    entry_ids = excluded.entry_ids,
+                    high_water = excluded.high_water,
+                    last_status = excluded.last_status,
+                    last_checked = excluded.last_checked
+            ''', (
+                feed_url, etag, last_modified,
+                json.dumps(merged[:FEED_ENTRY_IDS_LIMIT]),
+                high_water.isoformat() if high_water else None,
+                status
+            ))
+            conn.commit()
+    
+    def touch_feed_state(self, feed_url, status=None):
+        """RSS未更新（304）时只记录检查时间与状态码"""
+        with self.connection() as conn:
+            conn.execute(
+                "UPDATE feed_state SET last_status = ?, last_checked = CURRENT_TIMESTAMP WHERE feed_url = ?",
+                (status, feed_url)
+            )
+            conn.commit()
+    
+    def create_job(self, kind, params=None, owner=None):
+        """新建一条排队中的后台任务，返回任务 ID"""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, params, owner) VALUES (?, ?, ?)",
+                (kind, json.dumps(params or {}), owner)
+            )
+            conn.commit()
+            return cursor.lastrowid
+    
+    def update_job(self, job_id, status=None, progress=None, result=None, error=None):
+        """更新任务状态/进度/结果（None 表示不修改该项），同时递增 version"""
+        assignments = ["version = version + 1"]
+        params = []
+        if status is not None:
+            assignments.append("status = ?")
+            params.append(status)
+            if status == 'running':
+                assignments.append("started_at = CURRENT_TIMESTAMP")
+            elif status in JOB_TERMINAL_STATUSES:
+                assignments.append("finished_at = CURRENT_TIMESTAMP")
+        for column, value in (('progress', progress), ('result', result)):
+            if value is not None:
+                assignments.append(f"{column} = ?")
+                params.append(json.dumps(value))
+        if error is not None:
+            assignments.append("error = ?")
+            params.append(error)
+        
+        with self.connection() as conn:
+            conn.execute(f"UPDATE jobs SET {', '.join(assignments)} WHERE id = ?", params + [job_id])
+            conn.commit()
+    
+    def get_job(self, job_id):
+        """获取任务详情（JSON 列已解析），不存在时返回 None"""
+        with self.connection() as conn:
+            row = conn.execute('''
+                SELECT id, kind, status, params, progress, result, error, version,
+                       created_at, started_at, finished_at
+                FROM jobs WHERE id = ?
+            ''', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(
+            ('id', 'kind', 'status', 'params', 'progress', 'result', 'error', 'version',
+             'created_at', 'started_at', 'finished_at'),
+            row
+        ))
+        for column in ('params', 'progress', 'result'):
+            job[column] = json.loads(job[column]) if job[column] else None
+        return job
+    
+    def fail_orphaned_jobs(self, is_alive):
+        """把执行进程已不存在的未完成任务标记为失败，返回处理数
+        
+        is_alive(owner) 判断 owner 对应的进程是否仍在运行。
+        """
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, owner FROM jobs WHERE status NOT IN (?, ?)", JOB_TERMINAL_STATUSES
+            ).fetchall()
+            orphaned = [job_id for job_id, owner in rows if not is_alive(owner)]
+            for job_id in orphaned:
+                conn.execute('''
+                    UPDATE jobs SET status = 'failed', error = '任务执行进程已退出',
+                        finished_at = CURRENT_TIMESTAMP, version = version + 1
+                    WHERE id = ?
+                ''', (job_id,))
+            conn.commit()
+        return len(orphaned)
+    
+    def get_cached_result(self, cache_key):
+        """读取分析结果缓存（JSON 字符串），不存在时返回 None"""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM analysis_cache WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def put_cached_result(self, cache_key, component, value):
+        """写入分析结果缓存（value 为 JSON 字符串）"""
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (cache_key, component, value) VALUES (?, ?, ?)",
+                (cache_key, component, value)
+            )
+            conn.commit()
+    
+    def prune_cached_results(self, max_entries):
+        """只保留最新的 max_entries 条分析结果缓存，返回删除数"""
+        with self.connection() as conn:
+            cursor = conn.execute('''
+                DELETE FROM analysis_cache WHERE cache_key IN (
+                    SELECT cache_key FROM analysis_cache
+                    ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+            conn.commit()
+            return cursor.rowcount
+    
+    def clear_cached_results(self, component=None):
+        """清空分析结果缓存（可只清某个组件），返回删除数"""
+        with self.connection() as conn:
+            if component:
+                cursor = conn.execute("DELETE FROM analysis_cache WHERE component = ?", (component,))
+            else:
+                cursor = conn.execute("DELETE FROM analysis_cache")
+            conn.commit()
+            return cursor.rowcount
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rebuild-fts":
+        # 用法: python database.py --rebuild-fts [数据库路径]
+        db = DatabaseManager(sys.argv[2] if len(sys.argv) > 2 else None)
+        if db.fts_enabled:
+            count = db.rebuild_search_index()
+            print(f"全文索引重建完成，共 {count} 篇文章")
+        else:
+            print("当前 SQLite 不支持 FTS5，无法重建全文索引")
+        db.close()
+    else:
+        print("用法: python database.py --rebuild-fts [数据库路径]")
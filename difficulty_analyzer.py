@@ -1,22 +1,43 @@
-import textstat
-import re
-import nltk
+import bisect
+import numpy as np
 from collections import Counter
-import math
+from analyzed_text import AnalyzedText
+from readability import COUNT_FIELDS, score_arrays
 
 class DifficultyAnalyzer:
+    # 算法版本：结果会因实现调整而变化时加一，使分析结果缓存失效
+    ALGORITHM_VERSION = 1
+    
+    # 正文（去掉首尾空白）短于该字符数时不做分析
+    MIN_TEXT_LENGTH = 100
+    
+    # 综合评分中各指标的权重
+    SCORE_WEIGHTS = {
+        'flesch': 0.25,
+        'fk_grade': 0.20,
+        'gunning_fog': 0.20,
+        'vocab_complexity': 0.20,
+        'syntax_complexity': 0.15
+    }
+    
+    # 分数区间与难度等级 / 推荐考试：分数 < 阈值[i] 时取第 i 项，都不小于时取最后一项
+    LEVEL_THRESHOLDS = (30, 50, 70)
+    LEVELS = ('Beginner', 'Intermediate', 'Advanced', 'Expert')
+    EXAM_THRESHOLDS = (30, 40, 50, 60, 70)
+    EXAMS = ('CET-4', 'CET-6', 'IELTS-6.0 / TOEFL-80', 'IELTS-6.5 / TOEFL-90', 'IELTS-7.0', 'TOEFL-100+')
+    
+    # 句法复杂度的简单启发式：从句与介词短语的标志词
+    CLAUSE_INDICATORS = ('that', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how')
+    PHRASE_INDICATORS = ('in', 'on', 'at', 'by', 'for', 'with', 'from', 'to', 'of')
+    
+    # 批量评分时逐篇收集的原始计数
+    FEATURES = COUNT_FIELDS + (
+        'token_count', 'vocab_words', 'vocab_letters', 'long_words', 'complex_words',
+        'syntax_sentences', 'clauses', 'phrases',
+    )
+    
     def __init__(self):
-        # 下载必要的NLTK数据
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-        
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords')
-        
+        # NLTK 及其数据在首次分析时才加载（见 analyzed_text.load_nltk）
         # 四六级、雅思托福词汇量参考
         self.vocab_levels = {
             'CET-4': 4000,      # 大学英语四级
@@ -38,113 +59,114 @@ class DifficultyAnalyzer:
         }
     
     def analyze_difficulty(self, text):
-        """分析文章难度"""
-        if not text or len(text.strip()) < 100:
-            return {
-                'difficulty_level': 'Unknown',
-                'difficulty_score': 0,
-                'recommended_exam': 'Unknown',
-                'details': {}
-            }
-        
-        # 基础文本统计
-        word_count = len(text.split())
-        sentence_count = textstat.sentence_count(text)
-        char_count = len(text)
-        
-        # 计算各种难度指标
-        flesch_reading_ease = textstat.flesch_reading_ease(text)
-        flesch_kincaid_grade = textstat.flesch_kincaid_grade(text)
-        gunning_fog = textstat.gunning_fog(text)
-        smog_index = textstat.smog_index(text)
-        automated_readability = textstat.automated_readability_index(text)
-        
-        # 词汇复杂度分析
-        vocab_complexity = self._analyze_vocabulary_complexity(text)
-        
-        # 句法复杂度分析
-        syntax_complexity = self._analyze_syntax_complexity(text)
-        
-        # 综合难度评分 (0-100)
-        difficulty_score = self._calculate_comprehensive_score(
-            flesch_reading_ease, flesch_kincaid_grade, gunning_fog,
-            vocab_complexity, syntax_complexity
-        )
-        
-        # 确定难度等级
-        difficulty_level = self._determine_difficulty_level(difficulty_score)
-        
-        # 推荐考试
-        recommended_exam = self._recommend_exam_level(difficulty_score)
+        """分析文章难度（text 可以是 str 或 AnalyzedText）"""
+        return self.analyze_batch([text])[0]
+    
+    def analyze_batch(self, texts):
+        """批量分析难度，返回与 texts 等长的结果列表（格式同 analyze_difficulty）
         
-        return {
-            'difficulty_level': difficulty_level,
-            'difficulty_score': round(difficulty_score, 2),
-            'recommended_exam': recommended_exam,
-            'details': {
-                'flesch_reading_ease': round(flesch_reading_ease, 2),
-                'flesch_kincaid_grade': round(flesch_kincaid_grade, 2),
-                'gunning_fog': round(gunning_fog, 2),
-                'smog_index': round(smog_index, 2),
-                'automated_readability': round(automated_readability, 2),
-                'vocab_complexity': round(vocab_complexity, 2),
-                'syntax_complexity': round(syntax_complexity, 2),
-                'word_count': word_count,
-                'sentence_count': sentence_count,
-                'avg_sentence_length': round(word_count / sentence_count, 2) if sentence_count > 0 else 0
+        逐篇只做分词计数，各项指标、综合评分与等级划分对全部文本一次性用数组计算。
+        """
+        docs = [AnalyzedText.of(text) for text in texts]
+        analyzable = [i for i, doc in enumerate(docs) if len(doc.text.strip()) >= self.MIN_TEXT_LENGTH]
+        results = [self._unknown_result() for _ in docs]
+        if not analyzable:
+            return results
+        
+        features = self._feature_arrays([docs[i] for i in analyzable])
+        metrics = self._score_arrays(features)
+        level_indices = np.searchsorted(self.LEVEL_THRESHOLDS, metrics['difficulty_score'], side='right')
+        exam_indices = np.searchsorted(self.EXAM_THRESHOLDS, metrics['difficulty_score'], side='right')
+        
+        for row, i in enumerate(analyzable):
+            word_count = int(features['token_count'][row])
+            sentence_count = int(features['sentences'][row])
+            value = {name: float(values[row]) for name, values in metrics.items()}
+            results[i] = {
+                'difficulty_level': self.LEVELS[level_indices[row]],
+                'difficulty_score': round(value['difficulty_score'], 2),
+                'recommended_exam': self.EXAMS[exam_indices[row]],
+                'details': {
+                    'flesch_reading_ease': round(value['flesch_reading_ease'], 2),
+                    'flesch_kincaid_grade': round(value['flesch_kincaid_grade'], 2),
+                    'gunning_fog': round(value['gunning_fog'], 2),
+                    'smog_index': round(value['smog_index'], 2),
+                    'automated_readability': round(value['automated_readability_index'], 2),
+                    'vocab_complexity': round(value['vocab_complexity'], 2),
+                    'syntax_complexity': round(value['syntax_complexity'], 2),
+                    'word_count': word_count,
+                    'sentence_count': sentence_count,
+                    'avg_sentence_length': round(word_count / sentence_count, 2) if sentence_count > 0 else 0
+                }
             }
+        return results
+    
+    def _unknown_result(self):
+        """文本过短、无法分析时的结果"""
+        return {
+            'difficulty_level': 'Unknown',
+            'difficulty_score': 0,
+            'recommended_exam': 'Unknown',
+            'details': {}
         }
     
-    def _analyze_vocabulary_complexity(self, text):
-        """分析词汇复杂度"""
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        word_count = len(words)
-        
-        if word_count == 0:
-            return 0
-        
-        # 计算平均词长
-        avg_word_length = sum(len(word) for word in words) / word_count
-        
-        # 计算长词比例 (6个字母以上)
-        long_words = [word for word in words if len(word) > 6]
-        long_word_ratio = len(long_words) / word_count
-        
-        # 计算复杂词汇比例 (基于词频)
-        complex_words = self._get_complex_words(words)
-        complex_word_ratio = len(complex_words) / word_count
-        
-        # 词汇复杂度评分 (0-100)
-        vocab_score = (avg_word_length * 10 + long_word_ratio * 30 + complex_word_ratio * 40)
-        return min(vocab_score, 100)
+    def _text_features(self, doc):
+        """单篇文本的原始计数（FEATURES 中的各项）"""
+        features = dict(doc.readability_counts)
+        features['token_count'] = doc.token_count
+        
+        # 词汇：词数、总字母数、长词 (6个字母以上) 数、复杂词数
+        words = doc.words
+        features['vocab_words'] = len(words)
+        features['vocab_letters'] = sum(len(word) for word in words)
+        features['long_words'] = sum(1 for word in words if len(word) > 6)
+        features['complex_words'] = len(self._get_complex_words(words))
+        
+        # 句法：使用 NLTK 分句（由 AnalyzedText 完成并缓存），统计从句与短语标志词
+        sentences = doc.lower_sentences
+        features['syntax_sentences'] = len(sentences)
+        features['clauses'] = sum(
+            1 for sentence in sentences for indicator in self.CLAUSE_INDICATORS if indicator in sentence
+        )
+        features['phrases'] = sum(
+            1 for sentence in sentences for indicator in self.PHRASE_INDICATORS if indicator in sentence
+        )
+        return features
     
-    def _analyze_syntax_complexity(self, text):
-        """分析句法复杂度"""
-        # 使用 NLTK 进行分句，避免 textstat 无 sentence_split 方法
-        sentences = nltk.sent_tokenize(text)
-        if not sentences:
-            return 0
-        
-        total_clauses = 0
-        total_phrases = 0
-        
-        for sentence in sentences:
-            # 计算从句数量 (简单启发式)
-            clause_indicators = ['that', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how']
-            clauses = sum(1 for indicator in clause_indicators if indicator in sentence.lower())
-            total_clauses += clauses
-            
-            # 计算短语数量 (介词短语等)
-            phrase_indicators = ['in', 'on', 'at', 'by', 'for', 'with', 'from', 'to', 'of']
-            phrases = sum(1 for indicator in phrase_indicators if indicator in sentence.lower())
-            total_phrases += phrases
-        
-        avg_clauses_per_sentence = total_clauses / len(sentences)
-        avg_phrases_per_sentence = total_phrases / len(sentences)
-        
-        # 句法复杂度评分 (0-100)
-        syntax_score = (avg_clauses_per_sentence * 20 + avg_phrases_per_sentence * 15)
-        return min(syntax_score, 100)
+    def _feature_arrays(self, docs):
+        """把多篇文本的原始计数收集为 {名称: 数组}"""
+        rows = [self._text_features(doc) for doc in docs]
+        matrix = np.array([[row[name] for name in self.FEATURES] for row in rows], dtype=float)
+        return {name: matrix[:, column] for column, name in enumerate(self.FEATURES)}
+    
+    def _score_arrays(self, features):
+        """由计数数组计算全部指标与综合评分（数组运算）"""
+        metrics = score_arrays(features)
+        metrics['vocab_complexity'] = self._vocabulary_complexity(
+            features['vocab_words'], features['vocab_letters'], features['long_words'], features['complex_words']
+        )
+        metrics['syntax_complexity'] = self._syntax_complexity(
+            features['syntax_sentences'], features['clauses'], features['phrases']
+        )
+        metrics['difficulty_score'] = self._calculate_comprehensive_score(
+            metrics['flesch_reading_ease'], metrics['flesch_kincaid_grade'], metrics['gunning_fog'],
+            metrics['vocab_complexity'], metrics['syntax_complexity']
+        )
+        return metrics
+    
+    def _vocabulary_complexity(self, word_count, letters, long_words, complex_words):
+        """词汇复杂度 (0-100)：平均词长、长词比例与复杂词比例的加权"""
+        has_words = word_count > 0
+        per_word = np.where(has_words, word_count, 1)
+        vocab_score = (letters / per_word * 10 + long_words / per_word * 30 + complex_words / per_word * 40)
+        return np.where(has_words, np.minimum(vocab_score, 100), 0.0)
+    
+    def _syntax_complexity(self, sentence_count, clauses, phrases):
+        """句法复杂度 (0-100)：平均每句从句与短语标志词数的加权"""
+        has_sentences = sentence_count > 0
+        per_sentence = np.where(has_sentences, sentence_count, 1)
+        syntax_score = (clauses / per_sentence * 20 + phrases / per_sentence * 15)
+        return np.where(has_sentences, np.minimum(syntax_score, 100), 0.0)
     
     def _get_complex_words(self, words):
         """识别复杂词汇"""
@@ -160,23 +182,16 @@ class DifficultyAnalyzer:
         return complex_words
     
     def _calculate_comprehensive_score(self, flesch, fk_grade, gunning_fog, vocab_complexity, syntax_complexity):
-        """计算综合难度评分"""
+        """计算综合难度评分（参数可以是标量或等长数组）"""
         # 将Flesch Reading Ease转换为0-100分数 (分数越高越难)
-        flesch_score = max(0, 100 - flesch)
+        flesch_score = np.maximum(0, 100 - flesch)
         
         # 标准化其他指标到0-100
-        fk_score = min(fk_grade * 5, 100)  # 年级水平 * 5
-        gunning_score = min(gunning_fog * 4, 100)  # Gunning Fog * 4
+        fk_score = np.minimum(fk_grade * 5, 100)  # 年级水平 * 5
+        gunning_score = np.minimum(gunning_fog * 4, 100)  # Gunning Fog * 4
         
         # 加权平均
-        weights = {
-            'flesch': 0.25,
-            'fk_grade': 0.20,
-            'gunning_fog': 0.20,
-            'vocab_complexity': 0.20,
-            'syntax_complexity': 0.15
-        }
-        
+        weights = self.SCORE_WEIGHTS
         comprehensive_score = (
             flesch_score * weights['flesch'] +
             fk_score * weights['fk_grade'] +
@@ -189,29 +204,11 @@ class DifficultyAnalyzer:
     
     def _determine_difficulty_level(self, score):
         """根据分数确定难度等级"""
-        if score < 30:
-            return 'Beginner'
-        elif score < 50:
-            return 'Intermediate'
-        elif score < 70:
-            return 'Advanced'
-        else:
-            return 'Expert'
+        return self.LEVELS[bisect.bisect_right(self.LEVEL_THRESHOLDS, score)]
     
     def _recommend_exam_level(self, score):
         """根据分数推荐考试等级"""
-        if score < 30:
-            return 'CET-4'
-        elif score < 40:
-            return 'CET-6'
-        elif score < 50:
-            return 'IELTS-6.0 / TOEFL-80'
-        elif score < 60:
-            return 'IELTS-6.5 / TOEFL-90'
-        elif score < 70:
-            return 'IELTS-7.0'
-        else:
-            return 'TOEFL-100+'
+        return self.EXAMS[bisect.bisect_right(self.EXAM_THRESHOLDS, score)]
     
     def get_difficulty_explanation(self, difficulty_data):
         """获取难度分析解释"""
@@ -0,0 +1,138 @@
+import lxml.html
+from lxml import etree
+
+def _has_class(name):
+    """XPath 条件：class 属性包含 name（与 CSS 的 .name 相同）"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def _xpaths(*expressions):
+    return [etree.XPath(expr) for expr in expressions]
+
+# 通用正文容器，按优先级排列（与原 BeautifulSoup 选择器一一对应）
+ARTICLE_CONTAINERS = _xpaths(
+    '//article',
+    f'//div[{_has_class("article__content")}]',
+    f'//div[{_has_class("c-article-content")}]',
+    "//div[@id='content']",
+    f'//div[{_has_class("entry-content")}]',
+    f'//section[{_has_class("article-body")}]',
+    f'//div[{_has_class("l-container")}]',
+)
+
+BBC_TITLE = _xpaths("//h1[@data-testid='headline']", f'//h1[{_has_class("story-headline")}]')
+BBC_BODY = _xpaths("//div[@data-testid='story-body']", f'//div[{_has_class("story-body")}]')
+BBC_BYLINE = _xpaths("//span[@data-testid='byline']", f'//span[{_has_class("byline")}]')
+BBC_TIME = _xpaths("//time[@data-testid='timestamp']", '//time')
+
+CNN_TITLE = _xpaths(f'//h1[{_has_class("headline__text")}]', '//h1')
+CNN_BODY = _xpaths(f'//div[{_has_class("article__content")}]', f'//div[{_has_class("l-container")}]')
+CNN_BYLINE = _xpaths(f'//span[{_has_class("metadata__byline__author")}]')
+CNN_UPDATE_TIME = _xpaths(f'//div[{_has_class("update-time")}]')
+
+_ALL_PARAGRAPHS = etree.XPath('//p')
+_LINK_HREFS = etree.XPath('//a/@href')
+
+def parse_html(content):
+    """用 lxml 解析页面（bytes 或 str），空文档返回 None
+
+    bytes 先按 UTF-8 解码，失败时交给 libxml2 按页面声明的 charset 解码。
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8')
+        except UnicodeDecodeError:
+            return _parse_document(content)
+    try:
+        return _parse_document(content)
+    except ValueError:
+        # 带 encoding 声明的 XML 头不能以 str 解析
+        return _parse_document(content.encode('utf-8'))
+
+def _parse_document(content):
+    try:
+        return lxml.html.document_fromstring(content)
+    except etree.ParserError:
+        return None
+
+def _first(root, xpaths):
+    """依次尝试 xpaths，返回第一个有结果的表达式匹配到的首个节点"""
+    for xpath in xpaths:
+        nodes = xpath(root)
+        if nodes:
+            return nodes[0]
+    return None
+
+def _text(node):
+    return node.text_content().strip()
+
+def node_texts(node, tags=('p', 'li')):
+    """node 内所有 tags 节点的非空文本（按文档顺序，每个节点只取一次文本）"""
+    texts = []
+    for element in node.iter(*tags):
+        text = element.text_content().strip()
+        if text:
+            texts.append(text)
+    return texts
+
+def extract_article_text(content):
+    """通用正文抽取：依次尝试常见正文容器，都不足 200 字符时退回全页段落"""
+    root = parse_html(content)
+    if root is None:
+        return ''
+
+    texts = []
+    for xpath in ARTICLE_CONTAINERS:
+        nodes = xpath(root)
+        if nodes:
+            texts = node_texts(nodes[0])
+            if len(' '.join(texts)) > 200:
+                break
+    if not texts:
+        # 全页兜底
+        texts = [text for text in (_text(p) for p in _ALL_PARAGRAPHS(root)) if text]
+    return '\n'.join(texts)
+
+def extract_links(content):
+    """页面中所有 <a> 的 href（按文档顺序，未去重）"""
+    root = parse_html(content)
+    if root is None:
+        return []
+    return [str(href) for href in _LINK_HREFS(root)]
+
+def extract_bbc_article(content):
+    """抽取 BBC 文章页的标题、正文、作者与时间字符串；缺少标题或正文容器时返回 None"""
+    root = parse_html(content)
+    if root is None:
+        return None
+    title_elem = _first(root, BBC_TITLE)
+    body_elem = _first(root, BBC_BODY)
+    if title_elem is None or body_elem is None:
+        return None
+
+    author_elem = _first(root, BBC_BYLINE)
+    time_elem = _first(root, BBC_TIME)
+    return {
+        'title': _text(title_elem),
+        'content': '\n'.join(node_texts(body_elem, ('p',))),
+        'author': _text(author_elem) if author_elem is not None else None,
+        'date': (time_elem.get('datetime') or time_elem.text_content()) if time_elem is not None else None,
+    }
+
+def extract_cnn_article(content):
+    """抽取 CNN 文章页的标题、正文、作者与更新时间文本；缺少标题或正文容器时返回 None"""
+    root = parse_html(content)
+    if root is None:
+        return None
+    title_elem = _first(root, CNN_TITLE)
+    body_elem = _first(root, CNN_BODY)
+    if title_elem is None or body_elem is None:
+        return None
+
+    author_elem = _first(root, CNN_BYLINE)
+    time_elem = _first(root, CNN_UPDATE_TIME)
+    return {
+        'title': _text(title_elem),
+        'content': '\n'.join(node_texts(body_elem, ('p',))),
+        'author': _text(author_elem) if author_elem is not None else None,
+        'date': time_elem.text_content() if time_elem is not None else None,
+    }
@@ -0,0 +1,86 @@
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from database import JOB_TERMINAL_STATUSES
+
+def current_owner():
+    """当前进程的标识：主机名:pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def owner_is_alive(owner):
+    """owner 对应的进程是否仍在运行（其他主机上的进程视为已退出）"""
+    try:
+        host, pid = owner.rsplit(':', 1)
+        pid = int(pid)
+    except (AttributeError, ValueError):
+        return False
+    if host != socket.gethostname():
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobQueue:
+    """进程内后台任务队列
+
+    任务记录保存在 SQLite 的 jobs 表中（跨进程可查询），在本进程的线程池中执行。
+    处理函数签名为 handler(params, report)：调用 report(progress_dict) 汇报进度，
+    返回值（需可 JSON 序列化）作为任务结果，抛出异常则任务失败。
+    """
+
+    def __init__(self, db, max_workers=1):
+        self.db = db
+        self.owner = current_owner()
+        self._handlers = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='job')
+        self._changed = threading.Condition()
+        # 上次运行时被中断的任务不会再执行，直接标记失败
+        self.db.fail_orphaned_jobs(owner_is_alive)
+
+    def register(self, kind, handler):
+        """注册任务类型的处理函数"""
+        self._handlers[kind] = handler
+
+    def submit(self, kind, params=None):
+        """提交任务并立即返回任务 ID；未注册的任务类型抛出 ValueError"""
+        if kind not in self._handlers:
+            raise ValueError(f"未知的任务类型: {kind}")
+        job_id = self.db.create_job(kind, params, owner=self.owner)
+        self._executor.submit(self._run, job_id, kind, params or {})
+        return job_id
+
+    def get(self, job_id):
+        return self.db.get_job(job_id)
+
+    def wait_for_change(self, timeout):
+        """等待本进程内任意任务状态变化，最多 timeout 秒"""
+        with self._changed:
+            self._changed.wait(timeout)
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def _update(self, job_id, **fields):
+        self.db.update_job(job_id, **fields)
+        self._notify()
+
+    def _run(self, job_id, kind, params):
+        self._update(job_id, status='running')
+        try:
+            result = self._handlers[kind](params, lambda progress: self._update(job_id, progress=progress))
+        except Exception as e:
+            print(f"后台任务失败 {kind}#{job_id}: {e}")
+            self._update(job_id, status='failed', error=str(e) or e.__class__.__name__)
+            return
+        self._update(job_id, status='succeeded', result=result)
+
+def is_finished(job):
+    return job['status'] in JOB_TERMINAL_STATUSES
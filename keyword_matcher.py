@@ -0,0 +1,74 @@
+import re
+
+# 关键词与文本按同一规则切成词：连续的小写字母/数字
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+def keyword_tokens(text):
+    """小写后切词；'e-learning' → ['e', 'learning']"""
+    return _TOKEN_RE.findall(str(text).lower())
+
+class KeywordMatcher:
+    """词级 Aho-Corasick 多关键词匹配器
+
+    patterns 为 [(关键词, 值)]。关键词按词切分后编译成一个自动机，scan 对文本只做
+    一次线性扫描，每命中一个关键词就产出它的值（同一关键词对应多个值时逐个产出）。
+    匹配以整词为单位，'ai' 不会命中 'said'，'ar' 不会命中 'are'；关键词最后一个词
+    也接受 suffixes 中的词尾（默认复数 s/es），'student' 可以命中 'students'。
+    自动机构造后不再修改，关键词变化时重新构造。
+    """
+
+    def __init__(self, patterns=(), suffixes=('s', 'es')):
+        self.suffixes = tuple(suffixes)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.pattern_count = 0
+        for keyword, value in patterns:
+            self._add(keyword, value)
+        self._link()
+
+    def _add(self, keyword, value):
+        tokens = keyword_tokens(keyword)
+        if not tokens:
+            return
+        self.pattern_count += 1
+        for last in [tokens[-1]] + [tokens[-1] + suffix for suffix in self.suffixes]:
+            state = 0
+            for token in tokens[:-1] + [last]:
+                state = self._child(state, token)
+            # 复数变体与已有关键词重合时（'sport' + s 与 'sports'）同一个值只计一次
+            if value not in self._out[state]:
+                self._out[state].append(value)
+
+    def _child(self, state, token):
+        child = self._goto[state].get(token)
+        if child is None:
+            child = len(self._goto)
+            self._goto[state][token] = child
+            self._goto.append({})
+            self._fail.append(0)
+            self._out.append([])
+        return child
+
+    def _link(self):
+        """按层（广度优先）计算失败链接，并把失败状态的输出并入各状态"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, text):
+        """逐个产出 text 中命中关键词的值（重复出现的关键词重复产出）"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for token in keyword_tokens(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                yield from out[state]
@@ -0,0 +1,249 @@
+import os
+import json
+import shutil
+import uuid
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+# 存储格式版本：目录结构或数组含义变化时加一
+FORMAT_VERSION = 1
+
+# 分类模型的默认目录
+DEFAULT_MODEL_ROOT = os.path.join('models', 'classifier')
+
+# 模型根目录下指向当前版本的文件
+CURRENT_FILE = 'CURRENT'
+METADATA_FILE = 'metadata.json'
+# 保存新版本时持有的锁文件（多个进程可能同时训练并保存）
+LOCK_FILE = '.lock'
+
+class ModelStoreError(Exception):
+    """模型目录缺失、格式不支持或校验失败"""
+
+def _version_name(number):
+    return f"v{number:04d}"
+
+def list_versions(root):
+    """root 下已保存的版本名，按版本号升序"""
+    if not os.path.isdir(root):
+        return []
+    names = [name for name in os.listdir(root)
+             if name.startswith('v') and name[1:].isdigit() and os.path.isdir(os.path.join(root, name))]
+    return sorted(names, key=lambda name: int(name[1:]))
+
+def current_version(root):
+    """CURRENT 指向的版本名；没有时返回 None"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+@contextmanager
+def _store_lock(root):
+    """root 的跨进程独占锁：分配版本号、改名与切换 CURRENT 期间持有，进程退出时自动释放"""
+    with open(os.path.join(root, LOCK_FILE), 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _combined_checksum(files):
+    return hashlib.sha256(
+        ''.join(f"{name}:{files[name]}\n" for name in sorted(files)).encode('utf-8')
+    ).hexdigest()
+
+def _nb_arrays(nb):
+    return {
+        # 分类名保存为定长字符串数组（.npy 不保存 object 数组）
+        'classes': np.asarray(nb.classes_).astype(str),
+        'class_count': nb.class_count_,
+        'feature_count': nb.feature_count_,
+        'class_log_prior': nb.class_log_prior_,
+        'feature_log_prob': nb.feature_log_prob_,
+    }
+
+def _restore_nb(nb, arrays):
+    """把保存的数组设回 MultinomialNB，使其无需重新拟合即可预测（及继续 partial_fit）"""
+    nb.classes_ = np.asarray(arrays['classes'])
+    nb.class_count_ = arrays['class_count']
+    nb.feature_count_ = arrays['feature_count']
+    nb.class_log_prior_ = arrays['class_log_prior']
+    nb.feature_log_prob_ = arrays['feature_log_prob']
+    nb.n_features_in_ = arrays['feature_log_prob'].shape[1]
+    return nb
+
+def _json_params(params):
+    """只保留能写入 JSON 的构造参数"""
+    return {key: value for key, value in params.items()
+            if value is None or isinstance(value, (str, int, float, bool, list, tuple))}
+
+def _export(model):
+    """模型 → (kind, 数组 dict, 参数 dict, 训练样本数)"""
+    from sklearn.pipeline import Pipeline
+    from trainer import OnlineTextModel
+
+    if isinstance(model, OnlineTextModel):
+        params = {
+            'classes': list(model.classes),
+            'n_features': model.vectorizer.n_features,
+            'alpha': model.classifier.alpha,
+            'stop_words': model.vectorizer.stop_words,
+            'samples_seen': model.samples_seen,
+            'last_article_id': model.last_article_id,
+        }
+        return 'hashing_nb', _nb_arrays(model.classifier), params, model.samples_seen
+    if isinstance(model, Pipeline) and len(model.steps) == 2:
+        vectorizer, nb = model.steps[0][1], model.steps[1][1]
+        terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+        for term, index in vectorizer.vocabulary_.items():
+            terms[index] = term
+        arrays = _nb_arrays(nb)
+        arrays['vocabulary'] = terms.astype(str)
+        arrays['idf'] = vectorizer.idf_
+        params = {
+            'vectorizer': _json_params(vectorizer.get_params()),
+            'alpha': nb.alpha,
+            'step_names': [name for name, _ in model.steps],
+        }
+        return 'tfidf_nb', arrays, params, int(nb.class_count_.sum())
+    raise ModelStoreError(f"不支持保存的模型类型: {type(model).__name__}")
+
+def save_model(model, root, keep=5):
+    """把模型保存为 root 下的新版本目录（各数组一个 .npy 文件 + metadata.json），返回元数据
+
+    数组先写入本次保存独有的临时目录；持有 root 的锁时再分配版本号、改名并原子替换
+    CURRENT，多个进程同时保存时各得到不同的版本。只保留最近 keep 个版本。
+    """
+    kind, arrays, params, training_size = _export(model)
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = os.path.join(root, f".{uuid.uuid4().hex}.tmp")
+    os.makedirs(tmp_dir)
+    try:
+        files = {}
+        for name, array in arrays.items():
+            filename = f"{name}.npy"
+            path = os.path.join(tmp_dir, filename)
+            np.save(path, np.ascontiguousarray(array), allow_pickle=False)
+            files[filename] = _file_digest(path)
+        feature_log_prob = arrays['feature_log_prob']
+        metadata = {
+            'format_version': FORMAT_VERSION,
+            'kind': kind,
+            'version': None,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'training_size': training_size,
+            'classes': [str(c) for c in arrays['classes']],
+            'feature_count': int(feature_log_prob.shape[1]),
+            'checksum': _combined_checksum(files),
+            'files': files,
+            'params': params,
+        }
+
+        with _store_lock(root):
+            versions = list_versions(root)
+            version = _version_name(int(versions[-1][1:]) + 1 if versions else 1)
+            metadata['version'] = version
+            with open(os.path.join(tmp_dir, METADATA_FILE), 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            os.rename(tmp_dir, os.path.join(root, version))
+
+            current_tmp = os.path.join(root, f".{CURRENT_FILE}.tmp")
+            with open(current_tmp, 'w', encoding='utf-8') as f:
+                f.write(version)
+            os.replace(current_tmp, os.path.join(root, CURRENT_FILE))
+
+            for old in list_versions(root)[:-keep] if keep else []:
+                shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return metadata
+
+def read_metadata(root, version=None):
+    """读取某个版本（默认当前版本）的元数据"""
+    version = version or current_version(root)
+    if not version:
+        raise ModelStoreError(f"模型目录中没有可用版本: {root}")
+    path = os.path.join(root, version, METADATA_FILE)
+    try:
+        with open(path, encoding='utf-8') as f:
+            metadata = json.load(f)
+    except FileNotFoundError:
+        raise ModelStoreError(f"模型版本不存在: {os.path.join(root, version)}")
+    if metadata.get('format_version') != FORMAT_VERSION:
+        raise ModelStoreError(f"不支持的模型格式版本: {metadata.get('format_version')}")
+    return metadata
+
+def verify_model(root, version=None):
+    """重新计算各文件的 SHA-256 并与元数据比对，不一致时抛出 ModelStoreError"""
+    metadata = read_metadata(root, version)
+    directory = os.path.join(root, metadata['version'])
+    files = {name: _file_digest(os.path.join(directory, name)) for name in metadata['files']}
+    if files != metadata['files'] or _combined_checksum(files) != metadata['checksum']:
+        raise ModelStoreError(f"模型文件校验失败: {directory}")
+    return metadata
+
+def load_model(root, version=None, mmap=True, verify=False):
+    """加载某个版本（默认当前版本）的模型
+
+    mmap=True 时数组以只读内存映射方式打开：加载几乎不读盘，多个进程加载同一版本时
+    共享操作系统的页缓存。verify=True 时先校验文件完整性（需要完整读取一遍文件）。
+    """
+    from sklearn.naive_bayes import MultinomialNB
+
+    metadata = verify_model(root, version) if verify else read_metadata(root, version)
+    directory = os.path.join(root, metadata['version'])
+    arrays = {
+        filename[:-len('.npy')]: np.load(os.path.join(directory, filename), mmap_mode='r' if mmap else None,
+                                         allow_pickle=False)
+        for filename in metadata['files']
+    }
+    params = metadata['params']
+
+    if metadata['kind'] == 'hashing_nb':
+        from trainer import OnlineTextModel
+
+        model = OnlineTextModel(params['classes'], n_features=params['n_features'], alpha=params['alpha'])
+        model.vectorizer.set_params(stop_words=params['stop_words'])
+        _restore_nb(model.classifier, arrays)
+        model.samples_seen = params['samples_seen']
+        model.last_article_id = params['last_article_id']
+        return model
+    if metadata['kind'] == 'tfidf_nb':
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.pipeline import Pipeline
+
+        vectorizer_params = dict(params['vectorizer'])
+        # 词表固定后 max_features 等选词参数不再起作用
+        vectorizer_params.pop('max_features', None)
+        vectorizer_params.pop('vocabulary', None)
+        if isinstance(vectorizer_params.get('ngram_range'), list):
+            vectorizer_params['ngram_range'] = tuple(vectorizer_params['ngram_range'])
+        vectorizer = TfidfVectorizer(**vectorizer_params, vocabulary=list(arrays['vocabulary']))
+        vectorizer.idf_ = np.asarray(arrays['idf'])
+        nb = _restore_nb(MultinomialNB(alpha=params['alpha']), arrays)
+        vectorizer_step, nb_step = params['step_names']
+        return Pipeline([(vectorizer_step, vectorizer), (nb_step, nb)])
+    raise ModelStoreError(f"未知的模型类型: {metadata['kind']}")
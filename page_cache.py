@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+from url_utils import canonicalize_url
+
+class CacheMiss(LookupError):
+    """回放模式下请求的页面不在缓存中"""
+
+class CachedResponse:
+    """从缓存读出的响应，提供爬虫用到的 requests.Response 接口子集"""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content, fetched_at):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.fetched_at = fetched_at
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def raise_for_status(self):
+        # 只缓存 200 响应
+        pass
+
+class PageCache:
+    """抓取页面的磁盘缓存
+
+    以规范化 URL 的 SHA-256 为键，每个页面一个 zlib 压缩文件（元数据 JSON + 正文）。
+    超过 ttl 秒的条目视为过期；总大小超过 max_bytes 时按最近访问时间（文件 mtime）淘汰。
+    """
+
+    # 只保留解析时需要的响应头
+    KEPT_HEADERS = ('Content-Type', 'Content-Encoding', 'ETag', 'Last-Modified')
+
+    def __init__(self, cache_dir=None, ttl=7 * 24 * 3600, max_bytes=512 * 1024 * 1024):
+        if cache_dir is None:
+            cache_dir = '/data/page_cache' if os.path.exists('/data') else 'page_cache'
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 首次写入时扫描目录得到
+
+    def _path(self, url):
+        key = hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + '.page')
+
+    def get(self, url, max_age=None):
+        """读取缓存的响应，不存在或超过 max_age 秒（默认 ttl）时返回 None"""
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as f:
+                raw = zlib.decompress(f.read())
+            meta, content = raw.split(b'\n', 1)
+            meta = json.loads(meta)
+        except (OSError, ValueError, zlib.error):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        max_age = self.ttl if max_age is None else max_age
+        if time.time() - meta['fetched_at'] > max_age:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # 更新访问时间，供 LRU 淘汰
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return CachedResponse(meta['url'], meta['status'], meta['headers'], content, meta['fetched_at'])
+
+    def put(self, url, response):
+        """缓存一个 200 响应，返回是否写入"""
+        if response.status_code != 200:
+            return False
+        headers = {k: response.headers[k] for k in self.KEPT_HEADERS if response.headers.get(k)}
+        meta = {
+            'url': getattr(response, 'url', None) or url,
+            'status': response.status_code,
+            'headers': headers,
+            'fetched_at': time.time(),
+        }
+        data = zlib.compress(json.dumps(meta).encode('utf-8') + b'\n' + response.content, 6)
+
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        # 先写临时文件再替换，并发读者不会读到半个文件
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - old_size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+        return True
+
+    def _entries(self):
+        """返回 (mtime, size, path) 列表"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith('.page'):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target_bytes=None):
+        """按最近访问时间淘汰，直到总大小不超过 target_bytes（默认 max_bytes 的 90%），返回删除数"""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= target_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total_bytes = total
+        return removed
+
+    def clear(self):
+        """删除全部缓存条目"""
+        return self.evict(target_bytes=0)
+
+    def stats(self):
+        """缓存条目数、总字节数与本进程的命中/未命中次数"""
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
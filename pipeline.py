@@ -0,0 +1,318 @@
+import time
+import queue
+import threading
+from analyzed_text import AnalyzedText
+
+# 队列结束标记
+_DONE = object()
+
+def cached_difficulty(analyzer, text, cache=None):
+    """难度分析；传入 cache（ResultCache）时相同文本只计算一次"""
+    if cache is None:
+        return analyzer.analyze_difficulty(text)
+    return cache.get_or_compute(
+        'difficulty', text, lambda: analyzer.analyze_difficulty(text),
+        version=analyzer.ALGORITHM_VERSION
+    )
+
+def cached_summary(summarizer, text, method='textrank', sentences_count=3, cache=None):
+    """生成摘要；传入 cache 时按 (文本, 方法, 句数) 缓存"""
+    def compute():
+        # 按关键字传参，只实现 generate_summary(text, sentences_count) 的摘要器也可使用
+        if method == 'textrank':
+            return summarizer.generate_summary(text, sentences_count=sentences_count)
+        return summarizer.generate_summary(text, method=method, sentences_count=sentences_count)
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(
+        'summary', text, compute,
+        params={'method': method, 'sentences_count': sentences_count},
+        version=summarizer.ALGORITHM_VERSION
+    )
+
+def cached_classification(classifier, title, content, url=None, source=None, cache=None):
+    """分类与标签，返回 {'category', 'tags'}；传入 cache 时按 (正文, 标题, URL, 来源, 模型版本) 缓存"""
+    def compute():
+        return classifier.classify_and_tag(title, content, url, source)
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(
+        'classify', content, compute,
+        params={'title': title, 'url': url, 'source': source, 'model': classifier.model_version},
+        version=classifier.ALGORITHM_VERSION
+    )
+
+def cached_classification_batch(classifier, documents, top_k=3, cache=None):
+    """批量分类（见 ArticleClassifier.classify_batch）
+
+    documents 为 [{'title', 'content', 'url', 'source'}]；传入 cache 时已缓存的文档直接复用，
+    其余文档合并为一次 classify_batch 调用。
+    """
+    def compute(indices):
+        selected = [documents[i] for i in indices]
+        return classifier.classify_batch(
+            [d.get('title') or '' for d in selected], [d.get('content') or '' for d in selected],
+            [d.get('url') for d in selected], [d.get('source') for d in selected], top_k=top_k
+        )
+    if cache is None:
+        return compute(range(len(documents)))
+    items = [
+        (d.get('content') or '', {'title': d.get('title') or '', 'url': d.get('url'),
+                                  'source': d.get('source'), 'top_k': top_k, 'model': classifier.model_version})
+        for d in documents
+    ]
+    return cache.get_or_compute_many('classify_batch', items, compute, version=classifier.ALGORITHM_VERSION)
+
+def analyze_article(article, analyzer, summarizer, classifier, cache=None):
+    """对单篇文章做难度分析、摘要、分类与标签，结果写回 article 并返回
+
+    正文只分句、分词一次（AnalyzedText），三个组件共用；传入 cache 时
+    内容相同的文章（如多个来源转载的同一篇）直接复用已有结果。
+    """
+    doc = AnalyzedText(article['content'])
+    difficulty_result = cached_difficulty(analyzer, doc, cache)
+    article['difficulty_level'] = difficulty_result['difficulty_level']
+    article['difficulty_score'] = difficulty_result['difficulty_score']
+
+    article['summary'] = cached_summary(summarizer, doc, sentences_count=3, cache=cache)
+
+    # 分类器无法判断时保留抓取时的默认分类
+    classification = cached_classification(
+        classifier, article['title'], doc, article.get('url'), article.get('source'), cache
+    )
+    article['category'] = classification['category'] or article.get('category')
+    article['tags'] = ', '.join(classification['tags'])
+    return article
+
+class StageStats:
+    """单个阶段的计数：处理/失败篇数、工作耗时与因下游队列满而阻塞的时间"""
+
+    def __init__(self, name):
+        self.name = name
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, processed=0, failed=0, busy=0.0, blocked=0.0):
+        with self._lock:
+            self.processed += processed
+            self.failed += failed
+            self.busy_seconds += busy
+            self.blocked_seconds += blocked
+
+    def to_dict(self, elapsed):
+        return {
+            'name': self.name,
+            'processed': self.processed,
+            'failed': self.failed,
+            'busy_seconds': round(self.busy_seconds, 2),
+            'blocked_seconds': round(self.blocked_seconds, 2),
+            'per_second': round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+class ArticlePipeline:
+    """抓取 → 分析 → 入库 的流式流水线
+
+    三个阶段由有界队列连接：下游处理不过来时上游在 put 处阻塞（背压），
+    内存占用与抓取总量无关。入库阶段每 batch_size 篇（或等待超过
+    flush_interval 秒）提交一次，中途崩溃只丢失未提交的一批。
+    """
+
+    def __init__(self, db, process_article, queue_size=32, analysis_workers=1,
+                 batch_size=20, flush_interval=5.0, progress=None, process_chunk=None, chunk_size=1):
+        self.db = db
+        self.process_article = process_article
+        # process_chunk(articles) 一次分析多篇，返回 [(article, None) 或 (None, 错误信息)]；
+        # 设置后分析线程从队列中取最多 chunk_size 篇（不等待凑满）一起处理
+        self.process_chunk = process_chunk
+        self.chunk_size = max(1, chunk_size)
+        self.queue_size = max(1, queue_size)
+        self.analysis_workers = max(1, analysis_workers)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        # progress(summary) 在每批提交后调用，summary 与 run() 的返回值格式相同
+        self.progress = progress
+        self.stop_event = threading.Event()
+        self._aborted = threading.Event()
+        self._started = None
+        self.stats = {}
+        self.saved = 0
+        self.duplicates = 0
+
+    def cancel(self):
+        """停止从上游取新文章；已取到的文章仍会处理并入库"""
+        self.stop_event.set()
+
+    def run(self, articles):
+        """消费 articles（可迭代对象，通常是爬虫的生成器）直到结束，返回汇总"""
+        self._started = time.monotonic()
+        self.stats = {name: StageStats(name) for name in ('crawl', 'analyze', 'store')}
+        self.saved = 0
+        self.duplicates = 0
+        self.stop_event.clear()
+        self._aborted.clear()
+        crawled = queue.Queue(maxsize=self.queue_size)
+        analyzed = queue.Queue(maxsize=self.queue_size)
+
+        threads = [threading.Thread(target=self._crawl_stage, args=(articles, crawled), daemon=True)]
+        threads += [
+            threading.Thread(target=self._analyze_stage, args=(crawled, analyzed), daemon=True)
+            for _ in range(self.analysis_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            self._store_stage(analyzed)
+        except BaseException:
+            # 入库阶段异常退出：上游不再等待队列空位，尽快结束
+            self.stop_event.set()
+            self._aborted.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        return self.summary()
+
+    def summary(self):
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        stages = [stats.to_dict(elapsed) for stats in self.stats.values()]
+        return {
+            'crawled': self.stats['crawl'].processed if self.stats else 0,
+            'processed': self.stats['analyze'].processed if self.stats else 0,
+            'failed': self.stats['analyze'].failed if self.stats else 0,
+            'saved': self.saved,
+            'duplicates': self.duplicates,
+            'seconds': round(elapsed, 2),
+            'stages': stages,
+        }
+
+    def _put(self, q, item, stats, force=False):
+        """放入下游队列，队列满时阻塞并计入 blocked；入库阶段已异常退出时返回 False
+
+        force=True 时即使已中止也一直等到放入（用于结束标记：分析线程中止后仍会
+        取空队列，必须收到结束标记才能退出）。
+        """
+        started = time.monotonic()
+        while True:
+            try:
+                q.put(item, timeout=0.5)
+                break
+            except queue.Full:
+                if self._aborted.is_set() and not force:
+                    return False
+        stats.add(blocked=time.monotonic() - started)
+        return True
+
+    def _crawl_stage(self, articles, out_queue):
+        stats = self.stats['crawl']
+        iterator = iter(articles)
+        try:
+            while not self.stop_event.is_set():
+                started = time.monotonic()
+                try:
+                    article = next(iterator)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    print(f"抓取阶段失败: {e}")
+                    stats.add(failed=1)
+                    break
+                stats.add(processed=1, busy=time.monotonic() - started)
+                if not self._put(out_queue, article, stats):
+                    break
+        finally:
+            # 提前结束时关闭生成器，让爬虫停止提交新的请求
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            for _ in range(self.analysis_workers):
+                self._put(out_queue, _DONE, stats, force=True)
+
+    def _analyze_stage(self, in_queue, out_queue):
+        stats = self.stats['analyze']
+        finished = False
+        while not finished:
+            chunk = []
+            article = in_queue.get()
+            while True:
+                if article is _DONE:
+                    finished = True
+                    break
+                chunk.append(article)
+                if len(chunk) >= self.chunk_size:
+                    break
+                try:
+                    article = in_queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not chunk or self._aborted.is_set():
+                continue
+            
+            started = time.monotonic()
+            results = self._analyze_chunk(chunk)
+            busy = time.monotonic() - started
+            failed = 0
+            for article, error in results:
+                if error is not None:
+                    print(f"处理文章失败: {error}")
+                    failed += 1
+                    continue
+                self._put(out_queue, article, stats)
+            stats.add(processed=len(results) - failed, failed=failed, busy=busy)
+        self._put(out_queue, _DONE, stats)
+
+    def _analyze_chunk(self, chunk):
+        """返回 [(article, None) 或 (None, 错误信息)]"""
+        if self.process_chunk is not None:
+            try:
+                return self.process_chunk(chunk)
+            except Exception as e:
+                return [(None, str(e))] * len(chunk)
+        results = []
+        for article in chunk:
+            try:
+                results.append((self.process_article(article), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        return results
+
+    def _store_stage(self, in_queue):
+        stats = self.stats['store']
+        batch = []
+        finished_workers = 0
+        last_flush = time.monotonic()
+        while finished_workers < self.analysis_workers:
+            try:
+                article = in_queue.get(timeout=max(self.flush_interval, 0.1))
+            except queue.Empty:
+                article = None
+            if article is _DONE:
+                finished_workers += 1
+            elif article is not None:
+                batch.append(article)
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval):
+                self._flush(batch, stats)
+                batch = []
+                last_flush = time.monotonic()
+        if batch:
+            self._flush(batch, stats)
+
+    def _flush(self, batch, stats):
+        """一批文章在一个事务中入库"""
+        started = time.monotonic()
+        try:
+            results = self.db.add_articles_bulk(batch)
+        except Exception as e:
+            print(f"文章入库失败（{len(batch)} 篇）: {e}")
+            stats.add(failed=len(batch), busy=time.monotonic() - started)
+            return
+        saved = sum(1 for r in results if r['id'])
+        duplicates = sum(1 for r in results if r['duplicate'])
+        self.saved += saved
+        self.duplicates += duplicates
+        stats.add(processed=len(batch), busy=time.monotonic() - started)
+        if self.progress is not None:
+            self.progress(self.summary())
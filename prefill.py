@@ -6,12 +6,18 @@
 运行：
   .\.venv311\Scripts\activate
   python prefill.py
+  python prefill.py --replay   # 只用页面缓存离线重跑（不访问网络）
+  python prefill.py --workers 4  # 分析进程数，默认等于 CPU 核数
 """
 
+import os
+import argparse
+
 from crawler import ArticleCrawler
-from difficulty_analyzer import DifficultyAnalyzer
-from summarizer import ArticleSummarizer
-from classifier import ArticleClassifier
+from pipeline import ArticlePipeline
+from processor import ArticleProcessor
+from result_cache import ResultCache
+from trainer import DEFAULT_MODEL_PATH
 
 # 统一的RSS源与目标分类（每源抓取定额）
 RSS_SOURCES = [
@@ -31,43 +37,49 @@ RSS_SOURCES = [
 
 TARGET_PER_SOURCE = 50  # 每源定额，可按需调整
 
-def main():
+def main(replay=False, workers=None):
     crawler = ArticleCrawler()
-    analyzer = DifficultyAnalyzer()
-    summarizer = ArticleSummarizer()
-    classifier = ArticleClassifier()
-
-    # 分源抓取：每源各取 TARGET_PER_SOURCE
-    articles = []
-    for source_name, rss_url, default_category in RSS_SOURCES:
-        print(f"[预填] 抓取 {source_name} ...")
-        try:
-            batch = crawler.crawl_rss_feed(rss_url, source_name, default_category, max_articles=TARGET_PER_SOURCE)
-            articles.extend(batch)
-        except Exception as e:
-            print(f"[预填] 源失败 {source_name}: {e}")
-            continue
-
-    processed = []
-    for article in articles:
-        try:
-            diff = analyzer.analyze_difficulty(article['content'])
-            article['difficulty_level'] = diff['difficulty_level']
-            article['difficulty_score'] = diff['difficulty_score']
-
-            article['summary'] = summarizer.generate_summary(article['content'], sentences_count=3)
+    if replay:
+        # 回放：页面全部来自缓存，已入库的文章也重新处理（入库时仍按 URL 去重）
+        crawler.replay = True
+        crawler.skip_known_urls = False
+    # 分析是 CPU 密集型，默认每个核一个子进程；多个来源转载的同一篇文章只分析一次
+    processor = ArticleProcessor(workers=workers, cache=ResultCache(db=crawler.db),
+                                 model_path=os.environ.get('CLASSIFIER_MODEL_PATH', DEFAULT_MODEL_PATH))
+    print(f"[预填] 使用 {processor.workers} 个分析进程")
 
-            category = classifier.classify_article(article['title'], article['content'], article['url'])
-            article['category'] = category or article.get('category')
-            article['tags'] = ', '.join(classifier.extract_tags(article['title'], article['content']))
-            processed.append(article)
-        except Exception:
-            continue
+    # 分源抓取：每源各取 TARGET_PER_SOURCE；抓到的文章随即分析，每批提交一次
+    pipeline = ArticlePipeline(
+        crawler.db, processor.process,
+        progress=lambda summary: print(f"[预填] 已入库 {summary['saved']} 篇（处理 {summary['processed']} 篇）"),
+        **processor.pipeline_options()
+    )
+    with processor:
+        result = pipeline.run(crawler.iter_feeds(RSS_SOURCES, TARGET_PER_SOURCE))
+    # RSS源状态在其文章入库后才写入
+    crawler.commit_feed_states()
 
-    saved = crawler.save_articles_to_db(processed)
-    print(f"预填完成，共处理 {len(processed)} 篇，保存 {saved} 篇。")
+    for entry in crawler.last_crawl_report:
+        if entry['status'] != 'ok':
+            print(f"[预填] 源失败 {entry['source']}: {entry.get('error', entry['status'])}")
+    print(f"预填完成，共处理 {result['processed']} 篇，保存 {result['saved']} 篇。")
+    for stage in result['stages']:
+        print(f"  {stage['name']}: {stage['processed']} 篇，{stage['per_second']} 篇/秒，"
+              f"工作 {stage['busy_seconds']}s，等待下游 {stage['blocked_seconds']}s")
+    if not processor.parallel:
+        # 进程池模式下命中计数在各子进程中，这里只在单进程时输出
+        stats = processor.cache.stats()
+        print(f"分析缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次")
+    if crawler.page_cache is not None:
+        stats = crawler.page_cache.stats()
+        print(f"页面缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次，"
+              f"共 {stats['entries']} 个页面 ({stats['bytes'] / 1024 / 1024:.1f} MB)")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="批量预填充文章数据")
+    parser.add_argument('--replay', action='store_true', help='只用页面缓存离线重跑（不访问网络）')
+    parser.add_argument('--workers', type=int, default=None, help='分析进程数，默认等于 CPU 核数')
+    args = parser.parse_args()
+    main(replay=args.replay, workers=args.workers)
 
 
@@ -0,0 +1,174 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pipeline import analyze_article
+
+# 子进程内的分析组件与结果缓存，由 _init_worker 在进程启动时创建一次
+_worker_components = None
+_worker_cache = None
+# 子进程的分类模型目录及已加载的版本名（见 model_store）
+_worker_model_path = None
+_worker_model_version = None
+
+def _create_components():
+    from difficulty_analyzer import DifficultyAnalyzer
+    from summarizer import ArticleSummarizer
+    from classifier import ArticleClassifier
+    return DifficultyAnalyzer(), ArticleSummarizer(), ArticleClassifier()
+
+def _load_current_model(classifier, model_path, loaded_version=None):
+    """把 model_path 的当前模型版本加载到 classifier，返回当前版本名
+
+    当前版本与 loaded_version 相同或还没有保存过模型时不加载。加载失败时仍返回该版本名，
+    不在每块文章前重复尝试。
+    """
+    import model_store
+
+    version = model_store.current_version(model_path)
+    if version is None or version == loaded_version:
+        return loaded_version
+    try:
+        classifier.swap_model(model_store.load_model(model_path, version))
+    except Exception as e:
+        print(f"加载分类模型失败 {model_path} ({version}): {e}")
+    return version
+
+def _create_cache(config):
+    """按 ArticleProcessor._cache_config() 在子进程中重建结果缓存"""
+    if config is None:
+        return None
+    from result_cache import ResultCache
+    db = None
+    if config['db_path'] is not None:
+        from database import DatabaseManager
+        db = DatabaseManager(config['db_path'], pool_size=1)
+    return ResultCache(config['max_entries'], db=db, persistent_max_entries=config['persistent_max_entries'])
+
+def _init_worker(cache_config=None, model_path=None):
+    global _worker_components, _worker_cache, _worker_model_path
+    _worker_components = _create_components()
+    _worker_cache = _create_cache(cache_config)
+    _worker_model_path = model_path
+    _refresh_worker_model()
+
+def _refresh_worker_model():
+    """主进程训练并保存了新模型版本时重新加载，使子进程与主进程的分类结果（及缓存键）一致"""
+    global _worker_model_version
+    if _worker_model_path is not None:
+        _worker_model_version = _load_current_model(_worker_components[2], _worker_model_path,
+                                                    _worker_model_version)
+
+def _process_chunk_in_worker(articles):
+    _refresh_worker_model()
+    return _process_chunk(articles, _worker_components, _worker_cache)
+
+def _process_chunk(articles, components, cache=None):
+    """逐篇分析，返回与 articles 等长的 [(article, None) 或 (None, 错误信息)]"""
+    results = []
+    for article in articles:
+        try:
+            results.append((analyze_article(article, *components, cache=cache), None))
+        except Exception as e:
+            results.append((None, str(e) or e.__class__.__name__))
+    return results
+
+class ArticleProcessor:
+    """文章分析（难度、摘要、分类与标签）的执行器
+
+    workers <= 1 时在当前进程内执行；否则使用进程池，每个子进程只初始化一次
+    DifficultyAnalyzer / ArticleSummarizer / ArticleClassifier，文章按 chunk_size
+    分块发送以摊薄进程间传输开销。子进程以 spawn 方式启动，避免在多线程的
+    父进程中 fork（Windows 上也只能 spawn）。
+
+    传入 cache（ResultCache）时跳过内容相同的文章的重复分析；进程池模式下每个
+    子进程各有一个同样配置的缓存，通过 SQLite 持久层共享结果。
+
+    传入 model_path（model_store 的模型目录）时，执行器自己创建的分类器加载其中的
+    当前模型；子进程在每块文章前检查版本，训练保存新版本后自动重新加载。
+    """
+
+    def __init__(self, workers=None, chunk_size=8, components=None, cache=None, model_path=None):
+        self.workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+        self.chunk_size = max(1, chunk_size)
+        # 单进程模式可复用调用方已有的 (analyzer, summarizer, classifier)
+        self._components = components
+        self.cache = cache
+        self.model_path = model_path
+        self._pool = None
+        # 流水线的多个分析线程会同时首次调用 process_chunk，进程池只能创建一个
+        self._pool_lock = threading.Lock()
+
+    @property
+    def parallel(self):
+        return self.workers > 1
+
+    def _get_components(self):
+        if self._components is None:
+            components = _create_components()
+            if self.model_path is not None:
+                _load_current_model(components[2], self.model_path)
+            self._components = components
+        return self._components
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self._cache_config(), self.model_path)
+                )
+            return self._pool
+
+    def _cache_config(self):
+        if self.cache is None:
+            return None
+        return {
+            'max_entries': self.cache.max_entries,
+            'db_path': self.cache.db.db_path if self.cache.db is not None else None,
+            'persistent_max_entries': self.cache.persistent_max_entries,
+        }
+
+    def process(self, article):
+        """分析单篇文章（当前进程内执行），失败时抛出异常"""
+        return analyze_article(article, *self._get_components(), cache=self.cache)
+
+    def process_chunk(self, articles):
+        """分析一块文章，返回 [(article, None) 或 (None, 错误信息)]，顺序与输入一致"""
+        articles = list(articles)
+        if not self.parallel:
+            return _process_chunk(articles, self._get_components(), self.cache)
+        return self._get_pool().submit(_process_chunk_in_worker, articles).result()
+
+    def process_all(self, articles):
+        """分析全部文章，按输入顺序逐篇产出 (article, None) 或 (None, 错误信息)"""
+        articles = list(articles)
+        chunks = [articles[i:i + self.chunk_size] for i in range(0, len(articles), self.chunk_size)]
+        if not self.parallel:
+            for chunk in chunks:
+                yield from _process_chunk(chunk, self._get_components(), self.cache)
+            return
+        for results in self._get_pool().map(_process_chunk_in_worker, chunks):
+            yield from results
+
+    def pipeline_options(self):
+        """传给 ArticlePipeline 的参数：每个子进程对应一个分析线程，按块提交"""
+        return {
+            'process_chunk': self.process_chunk,
+            'chunk_size': self.chunk_size,
+            'analysis_workers': self.workers,
+        }
+
+    def close(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,89 @@
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+class TokenBucket:
+    """令牌桶：平均 rate 次/秒，允许 burst 次突发"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # 服务端要求退避时，在此之前不发请求
+        self.failures = 0         # 连续 429/503 次数，用于指数退避
+
+    def reserve(self, now):
+        """预定一个令牌，返回需要等待的秒数（令牌可透支，保证先来先得）"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+class HostRateLimiter:
+    """按域名限速：每个域名一个令牌桶，并处理 Retry-After 与 429/503 退避"""
+
+    def __init__(self, rate=2.0, burst=4, backoff_base=2.0, max_backoff=300.0):
+        self.rate = rate
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def acquire(self, host, cancel_event=None):
+        """阻塞直到该域名允许发出下一个请求；cancel_event 被设置时抛出 RuntimeError"""
+        with self._lock:
+            wait = self._bucket(host).reserve(time.monotonic())
+
+        if wait > 0:
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    raise RuntimeError("抓取已取消")
+            else:
+                time.sleep(wait)
+        return wait
+
+    def record_success(self, host):
+        """请求成功，重置该域名的退避计数"""
+        with self._lock:
+            self._bucket(host).failures = 0
+
+    def backoff(self, host, retry_after=None):
+        """收到 429/503 后暂停该域名，返回暂停秒数
+
+        优先使用服务端给出的 Retry-After，否则按连续失败次数指数退避。
+        """
+        delay = parse_retry_after(retry_after)
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.failures += 1
+            if delay is None:
+                delay = self.backoff_base * (2 ** (bucket.failures - 1))
+            delay = min(delay, self.max_backoff)
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+        return delay
+
+def parse_retry_after(value):
+    """解析 Retry-After 头（秒数或 HTTP 日期），无效时返回 None"""
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
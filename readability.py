@@ -0,0 +1,119 @@
+import re
+import numpy as np
+from functools import lru_cache
+from importlib import resources
+from pyphen import Pyphen
+
+# 计数规则与 textstat 0.7.3（英文、默认设置）一致，便于逐项对照；
+# 音节数依赖 pyphen 的断字词典，两者版本都在 requirements.txt 中固定
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_SENTENCE = re.compile(r'\b[^.!?]+[.!?]*')
+_DIFFICULT_WORD_TOKEN = re.compile(r"[\w\='‘’]+")
+
+# Gunning Fog 的难词音节阈值；SMOG 的多音节词阈值
+FOG_SYLLABLE_THRESHOLD = 3
+POLYSYLLABLE_THRESHOLD = 3
+
+@lru_cache(maxsize=1)
+def _hyphenator():
+    """pyphen 英文断字词典（加载约需 0.1 秒，首次计算音节时才加载）"""
+    return Pyphen(lang='en_US')
+
+@lru_cache(maxsize=1)
+def easy_words():
+    """Dale-Chall 常用词表（随 textstat 分发）
+
+    资源路径 resources/en/easy_words.txt 是 textstat 0.7.3 的包内布局，升级 textstat 时需核对。
+    """
+    text = resources.files('textstat').joinpath('resources/en/easy_words.txt').read_text(encoding='utf-8')
+    return frozenset(line.strip() for line in text.splitlines())
+
+@lru_cache(maxsize=65536)
+def word_syllables(word):
+    """单个小写、无标点单词的音节数（pyphen 断字位置数 + 1）"""
+    return len(_hyphenator().positions(word)) + 1
+
+def syllable_count(text):
+    """文本的音节总数（与 textstat.syllable_count 相同）"""
+    return sum(word_syllables(word) for word in _PUNCTUATION.sub('', text.lower()).split())
+
+def _legacy_round(number, points=0):
+    """textstat 的四舍五入方式（远离 0 方向进位），number 可以是数组"""
+    p = 10 ** points
+    return np.floor(number * p + np.copysign(0.5, number)) / p
+
+def text_counts(text):
+    """一次遍历得到各可读性公式共用的计数
+
+    返回 dict：words、sentences、syllables、polysyllables、characters（不含空白）、
+    difficult_words（Gunning Fog 难词数）。
+    """
+    lower = text.lower()
+    words = _PUNCTUATION.sub('', lower).split()
+    syllables = 0
+    polysyllables = 0
+    for word in words:
+        count = word_syllables(word)
+        syllables += count
+        if count >= POLYSYLLABLE_THRESHOLD:
+            polysyllables += 1
+
+    # 少于 3 个词的片段不算句子，至少 1 句
+    fragments = _SENTENCE.findall(text)
+    short = sum(1 for fragment in fragments if len(_PUNCTUATION.sub('', fragment).split()) <= 2)
+
+    easy = easy_words()
+    difficult = sum(
+        1 for token in set(_DIFFICULT_WORD_TOKEN.findall(lower))
+        if token not in easy and syllable_count(token) >= FOG_SYLLABLE_THRESHOLD
+    )
+    return {
+        'words': len(words),
+        'sentences': max(1, len(fragments) - short),
+        'syllables': syllables,
+        'polysyllables': polysyllables,
+        'characters': sum(len(token) for token in text.split()),
+        'difficult_words': difficult,
+    }
+
+# text_counts 中参与公式计算的计数
+COUNT_FIELDS = ('words', 'sentences', 'syllables', 'polysyllables', 'characters', 'difficult_words')
+
+def score_arrays(counts):
+    """由计数数组计算各可读性指标数组（舍入方式与 textstat 相同）
+
+    counts 为 {COUNT_FIELDS 中的名称: 等长数组}，每个下标对应一篇文本；
+    没有单词的文本按 textstat 的约定得到 0（Flesch 两项除外）。
+    """
+    counts = {field: np.asarray(counts[field], dtype=float) for field in COUNT_FIELDS}
+    words = counts['words']
+    sentences = counts['sentences']
+    has_words = words > 0
+    per_word = np.where(has_words, words, 1.0)
+
+    sentence_length = _legacy_round(words / sentences, 1)
+    syllables_per_word = np.where(has_words, _legacy_round(counts['syllables'] / per_word, 1), 0.0)
+    smog = _legacy_round(1.043 * np.sqrt(30 * (counts['polysyllables'] / sentences)) + 3.1291, 1)
+    ari = (4.71 * _legacy_round(counts['characters'] / per_word, 2)
+           + 0.5 * _legacy_round(words / sentences, 2)
+           - 21.43)
+    fog = 0.4 * (sentence_length + counts['difficult_words'] / per_word * 100)
+    return {
+        'flesch_reading_ease': _legacy_round(206.835 - 1.015 * sentence_length - 84.6 * syllables_per_word, 2),
+        'flesch_kincaid_grade': _legacy_round(0.39 * sentence_length + 11.8 * syllables_per_word - 15.59, 1),
+        'gunning_fog': np.where(has_words, _legacy_round(fog, 2), 0.0),
+        'smog_index': np.where(sentences >= 3, smog, 0.0),
+        'automated_readability_index': np.where(has_words, _legacy_round(ari, 1), 0.0),
+    }
+
+def scores_from_counts(counts):
+    """单篇文本：由 text_counts 的结果计算各可读性指标"""
+    arrays = score_arrays({field: np.array([counts[field]]) for field in COUNT_FIELDS})
+    return {metric: float(values[0]) for metric, values in arrays.items()}
+
+def readability(text):
+    """计算全部可读性指标，返回 scores_from_counts 的结果加上 counts"""
+    counts = text_counts(text)
+    scores = scores_from_counts(counts)
+    scores['counts'] = counts
+    return scores
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按当前的难度算法（权重、等级阈值等）重新评分数据库中的全部文章：
+  python rescore.py                    # 默认数据库
+  python rescore.py --db articles.db   # 指定数据库文件
+  python rescore.py --dry-run          # 只统计变化，不写回
+文章按 id 分批读出，每批用 DifficultyAnalyzer.analyze_batch 一次评分后写回。
+"""
+
+import argparse
+import time
+from collections import Counter
+
+from database import DatabaseManager
+from difficulty_analyzer import DifficultyAnalyzer
+
+def main(db_path=None, batch_size=500, dry_run=False):
+    db = DatabaseManager(db_path) if db_path else DatabaseManager()
+    analyzer = DifficultyAnalyzer()
+
+    started = time.monotonic()
+    scanned = 0
+    changed = 0
+    levels = Counter()
+    for batch in db.iter_article_contents(batch_size):
+        results = analyzer.analyze_batch([content or '' for _, content in batch])
+        updates = [
+            (article_id, result['difficulty_level'], result['difficulty_score'])
+            for (article_id, _), result in zip(batch, results)
+        ]
+        levels.update(level for _, level, _ in updates)
+        scanned += len(updates)
+        if dry_run:
+            changed += _count_changes(db, updates)
+        else:
+            changed += db.update_difficulties(updates)
+        print(f"[重评] 已处理 {scanned} 篇")
+
+    seconds = time.monotonic() - started
+    action = "将改变" if dry_run else "已更新"
+    print(f"重评完成：共 {scanned} 篇，{action} {changed} 篇，用时 {seconds:.1f}s")
+    for level, count in levels.most_common():
+        print(f"  {level}: {count} 篇")
+    db.close()
+    return {'scanned': scanned, 'changed': changed, 'levels': dict(levels)}
+
+def _count_changes(db, updates):
+    """--dry-run：与数据库中现有的难度比较，统计会改变的篇数"""
+    current = {}
+    with db.connection() as conn:
+        ids = [article_id for article_id, _, _ in updates]
+        placeholders = ', '.join('?' * len(ids))
+        for article_id, level, score in conn.execute(
+            f"SELECT id, difficulty_level, difficulty_score FROM articles WHERE id IN ({placeholders})", ids
+        ):
+            current[article_id] = (level, score)
+    return sum(1 for article_id, level, score in updates if current.get(article_id) != (level, score))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="按当前难度算法重新评分全部文章")
+    parser.add_argument('--db', default=None, help='数据库文件路径，默认与 Web 服务相同')
+    parser.add_argument('--batch-size', type=int, default=500, help='每批评分的文章数')
+    parser.add_argument('--dry-run', action='store_true', help='只统计变化，不写回数据库')
+    args = parser.parse_args()
+    main(db_path=args.db, batch_size=args.batch_size, dry_run=args.dry_run)
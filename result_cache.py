@@ -0,0 +1,151 @@
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+def normalize_text(text):
+    """缓存键使用的规范化文本：合并连续空白并去掉首尾空白（大小写保留）"""
+    return ' '.join(str(text).split())
+
+def text_digest(text):
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+def make_cache_key(component, text, params=None, version=0):
+    """(文本哈希, 组件, 参数, 算法版本) 组成的缓存键"""
+    params_json = json.dumps(params or {}, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return f"{component}:v{version}:{text_digest(text)}:{params_json}"
+
+class ResultCache:
+    """文本分析结果的两级缓存
+
+    第一级为进程内 LRU（最多 max_entries 条）；传入 db（DatabaseManager）时
+    第二级为 SQLite 的 analysis_cache 表，跨进程、跨重启共享。结果以 JSON
+    保存，命中时返回新的副本，调用方修改结果不会影响缓存。组件算法变化时
+    提高其 version，旧结果自然失效。
+    """
+
+    # 持久层每写入多少条检查一次容量
+    PRUNE_EVERY = 500
+
+    def __init__(self, max_entries=1024, db=None, persistent_max_entries=50000):
+        self.max_entries = max(1, max_entries)
+        self.db = db
+        self.persistent_max_entries = persistent_max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._puts = 0
+
+    def get_or_compute(self, component, text, compute, params=None, version=0):
+        """返回缓存的结果；未命中时调用 compute() 计算并写入缓存"""
+        key = make_cache_key(component, text, params, version)
+        value = self._lookup(key, component)
+        if value is not None:
+            return json.loads(value)
+        result = compute()
+        try:
+            value = json.dumps(result, ensure_ascii=False)
+        except (TypeError, ValueError):
+            # 不能 JSON 序列化的结果不缓存
+            return result
+        self._store(key, component, value)
+        return result
+
+    def get_or_compute_many(self, component, items, compute_many, version=0):
+        """批量版 get_or_compute：items 为 [(文本, params)]
+
+        未命中的条目只调用一次 compute_many(下标列表)，它按同样顺序返回这些条目的结果。
+        """
+        keys = [make_cache_key(component, text, params, version) for text, params in items]
+        results = [None] * len(items)
+        missing = []
+        for i, key in enumerate(keys):
+            value = self._lookup(key, component)
+            if value is None:
+                missing.append(i)
+            else:
+                results[i] = json.loads(value)
+        if missing:
+            for i, result in zip(missing, compute_many(missing)):
+                results[i] = result
+                try:
+                    value = json.dumps(result, ensure_ascii=False)
+                except (TypeError, ValueError):
+                    continue
+                self._store(keys[i], component, value)
+        return results
+
+    def _count(self, component, name):
+        with self._lock:
+            counters = self._counters.setdefault(component, {'memory_hits': 0, 'persistent_hits': 0, 'misses': 0})
+            counters[name] += 1
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key, component):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is not None:
+            self._count(component, 'memory_hits')
+            return value
+
+        if self.db is not None:
+            try:
+                value = self.db.get_cached_result(key)
+            except sqlite3.Error as e:
+                print(f"读取分析缓存失败: {e}")
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                self._count(component, 'persistent_hits')
+                return value
+
+        self._count(component, 'misses')
+        return None
+
+    def _store(self, key, component, value):
+        self._remember(key, value)
+        if self.db is None:
+            return
+        try:
+            self.db.put_cached_result(key, component, value)
+            with self._lock:
+                self._puts += 1
+                prune = self.persistent_max_entries and self._puts % self.PRUNE_EVERY == 0
+            if prune:
+                self.db.prune_cached_results(self.persistent_max_entries)
+        except sqlite3.Error as e:
+            print(f"写入分析缓存失败: {e}")
+
+    def clear(self):
+        """清空两级缓存与计数"""
+        with self._lock:
+            self._entries.clear()
+            self._counters = {}
+        if self.db is not None:
+            self.db.clear_cached_results()
+
+    def stats(self):
+        """命中/未命中计数（总计与按组件）"""
+        with self._lock:
+            components = {name: dict(counters) for name, counters in self._counters.items()}
+            entries = len(self._entries)
+        hits = sum(c['memory_hits'] + c['persistent_hits'] for c in components.values())
+        misses = sum(c['misses'] for c in components.values())
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'persistent': self.db is not None,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'components': components,
+        }
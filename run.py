@@ -13,6 +13,8 @@ from crawler import ArticleCrawler
 from difficulty_analyzer import DifficultyAnalyzer
 from summarizer import ArticleSummarizer
 from classifier import ArticleClassifier
+from pipeline import ArticlePipeline
+from processor import ArticleProcessor
 
 def check_dependencies():
     """检查依赖包是否安装"""
@@ -24,10 +26,10 @@ def check_dependencies():
         'flask': 'flask',
         'flask-cors': 'flask_cors',
         'textstat': 'textstat',
+        'pyphen': 'pyphen',
         'sumy': 'sumy',
         'nltk': 'nltk',
         'scikit-learn': 'sklearn',
-        'jieba': 'jieba',
         'pandas': 'pandas',
         'numpy': 'numpy'
     }
@@ -101,54 +103,23 @@ def crawl_initial_data():
         summarizer = ArticleSummarizer()
         classifier = ArticleClassifier()
         
-        # 爬取少量文章进行测试
-        print("正在从BBC News爬取文章...")
-        bbc_articles = crawler.crawl_bbc_news(max_articles=5)
+        # 爬取少量文章进行测试：边抓取边处理，每批提交一次
+        def bbc_then_cnn():
+            print("正在从BBC News爬取文章...")
+            yield from crawler.iter_bbc_news(max_articles=5)
+            print("正在从CNN News爬取文章...")
+            yield from crawler.iter_cnn_news(max_articles=5)
         
-        print("正在从CNN News爬取文章...")
-        cnn_articles = crawler.crawl_cnn_news(max_articles=5)
+        # 文章很少，不值得启动进程池，直接复用上面的组件
+        processor = ArticleProcessor(workers=1, components=(analyzer, summarizer, classifier))
+        pipeline = ArticlePipeline(crawler.db, processor.process, **processor.pipeline_options())
+        result = pipeline.run(bbc_then_cnn())
         
-        all_articles = bbc_articles + cnn_articles
-        
-        if all_articles:
-            print(f"📰 成功爬取 {len(all_articles)} 篇文章")
-            
-            # 处理文章
-            processed_count = 0
-            processed_articles = []
-            for article in all_articles:
-                try:
-                    # 分析难度
-                    difficulty_result = analyzer.analyze_difficulty(article['content'])
-                    article['difficulty_level'] = difficulty_result['difficulty_level']
-                    article['difficulty_score'] = difficulty_result['difficulty_score']
-                    
-                    # 生成摘要
-                    summary = summarizer.generate_summary(article['content'], sentences_count=3)
-                    article['summary'] = summary
-                    
-                    # 分类和标签
-                    category = classifier.classify_article(
-                        article['title'], 
-                        article['content'], 
-                        article['url']
-                    )
-                    article['category'] = category
-                    
-                    tags = classifier.extract_tags(article['title'], article['content'])
-                    article['tags'] = ', '.join(tags)
-                    
-                    processed_articles.append(article)
-                    processed_count += 1
-                    
-                except Exception as e:
-                    print(f"⚠️ 处理文章失败: {e}")
-                    continue
-            
-            # 保存到数据库
-            saved_count = crawler.save_articles_to_db(processed_articles)
-            print(f"💾 成功保存 {saved_count} 篇文章到数据库")
-            
+        if result['crawled']:
+            print(f"📰 成功爬取 {result['crawled']} 篇文章，处理成功 {result['processed']} 篇")
+            if result['failed']:
+                print(f"⚠️ 处理失败 {result['failed']} 篇")
+            print(f"💾 成功保存 {result['saved']} 篇文章到数据库")
         else:
             print("⚠️ 未能爬取到文章，可能是网络问题")
             
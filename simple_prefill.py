@@ -22,16 +22,16 @@ def main():
     db = DatabaseManager()
     
     # 检查当前文章数量
-    current_articles = db.get_articles(limit=10000)
-    print(f"当前数据库中有 {len(current_articles)} 篇文章")
+    current_count = db.count_articles()
+    print(f"当前数据库中有 {current_count} 篇文章")
     
     target_articles = 500  # 目标文章数量
-    if len(current_articles) >= target_articles:
+    if current_count >= target_articles:
         print(f"已达到目标文章数量 ({target_articles} 篇)")
         show_statistics(db)
         return
     
-    needed_articles = target_articles - len(current_articles)
+    needed_articles = target_articles - current_count
     print(f"需要爬取 {needed_articles} 篇文章")
     
     # 执行爬取
@@ -61,7 +61,7 @@ def main():
             total_crawled += saved_count
             
             print(f"批次 {batch_count} 完成 - 新增: {saved_count} 篇")
-            print(f"总进度: {total_crawled + len(current_articles)}/{target_articles}")
+            print(f"总进度: {total_crawled + current_count}/{target_articles}")
             
             # 检查是否达到目标
             if total_crawled >= needed_articles:
@@ -89,34 +89,18 @@ def main():
 
 def show_statistics(db):
     """显示数据库统计信息"""
-    final_articles = db.get_articles(limit=10000)
-    print(f"最终文章数量: {len(final_articles)} 篇")
+    stats = db.get_stats()
+    print(f"最终文章数量: {stats['total_articles']} 篇")
     
     # 统计各分类文章数量
     print("\n各分类文章统计:")
-    categories = {}
-    sources = {}
-    
-    for article in final_articles:
-        # 处理元组格式的数据
-        if isinstance(article, tuple):
-            # 假设数据库返回的是元组格式 (id, title, author, content, url, source, publish_date, category, ...)
-            category = article[7] if len(article) > 7 and article[7] else '未分类'
-            source = article[5] if len(article) > 5 and article[5] else '未知来源'
-        else:
-            # 字典格式
-            category = article.get('category', '未分类')
-            source = article.get('source', '未知来源')
-        
-        categories[category] = categories.get(category, 0) + 1
-        sources[source] = sources.get(source, 0) + 1
-    
-    for category, count in sorted(categories.items()):
-        print(f"  {category}: {count} 篇")
+    for item in sorted(stats['by_category'], key=lambda x: x['name'] or ''):
+        print(f"  {item['name'] or '未分类'}: {item['count']} 篇")
     
+    sources = stats['by_source']
     print(f"\n共有 {len(sources)} 个不同来源:")
-    for source, count in sorted(sources.items(), key=lambda x: x[1], reverse=True)[:10]:
-        print(f"  {source}: {count} 篇")
+    for item in sources[:10]:
+        print(f"  {item['name'] or '未知来源'}: {item['count']} 篇")
     
     if len(sources) > 10:
         print(f"  ... 还有 {len(sources) - 10} 个其他来源")
@@ -147,7 +131,6 @@ def quick_crawl():
             articles = crawler.crawl_rss_feed(rss_url, source_name, category, max_articles=5)
             all_articles.extend(articles)
             print(f"  获得 {len(articles)} 篇文章")
-            time.sleep(1)
         except Exception as e:
             print(f"  失败: {e}")
     
@@ -11,21 +11,19 @@ document.addEventListener('DOMContentLoaded', function() {
 // 加载统计数据
 async function loadStats() {
     try {
-        // 加载文章统计
-        const articlesResponse = await fetch('/api/articles?limit=1000');
-        const articlesData = await articlesResponse.json();
+        // 加载文章统计（服务端聚合）
+        const statsResponse = await fetch('/api/stats');
+        const statsData = await statsResponse.json();
         
-        if (articlesData.success) {
-            const articles = articlesData.data;
-            document.getElementById('totalArticles').textContent = articles.length;
+        if (statsData.success) {
+            const stats = statsData.data;
+            document.getElementById('totalArticles').textContent = stats.total_articles;
             
-            if (articles.length > 0) {
-                const avgScore = articles.reduce((sum, article) => 
-                    sum + (article.difficulty_score || 0), 0) / articles.length;
-                document.getElementById('avgDifficulty').textContent = avgScore.toFixed(1);
-                
-                const latestArticle = articles[0];
-                document.getElementById('lastUpdate').textContent = formatDate(latestArticle.created_at);
+            if (stats.avg_difficulty_score !== null) {
+                document.getElementById('avgDifficulty').textContent = stats.avg_difficulty_score.toFixed(1);
+            }
+            if (stats.last_update) {
+                document.getElementById('lastUpdate').textContent = formatDate(stats.last_update);
             }
         }
         
@@ -340,20 +338,76 @@ async function crawlNewArticles() {
         
         const data = await response.json();
         
-        if (data.success) {
-            showSuccess(data.message);
+        if (!data.success) {
+            showError('爬取失败: ' + data.error);
+            return;
+        }
+        
+        // 爬取在后台执行，通过任务进度推送等待结果
+        const job = await watchJob(data.job_id, progress => {
+            setLoadingText(`已爬取 ${progress.crawled} 篇，已保存 ${progress.saved} 篇...`);
+            loadStats();
+        });
+        if (job.status === 'succeeded') {
+            showSuccess(job.result.message);
             loadStats(); // 重新加载统计数据
         } else {
-            showError('爬取失败: ' + data.error);
+            showError('爬取失败: ' + job.error);
         }
     } catch (error) {
         console.error('爬取失败:', error);
         showError('网络错误，请稍后重试');
     } finally {
+        setLoadingText(null);
         showLoading(false);
     }
 }
 
+// 等待后台任务结束，返回最终的任务信息；onProgress 接收任务的 progress
+// 优先使用 SSE（/api/jobs/<id>/events），不支持时每 2 秒轮询 /api/jobs/<id>
+function watchJob(jobId, onProgress) {
+    if (!window.EventSource) {
+        return pollJob(jobId, onProgress);
+    }
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`/api/jobs/${jobId}/events`);
+        source.addEventListener('progress', event => {
+            const job = JSON.parse(event.data);
+            if (job.progress && onProgress) {
+                onProgress(job.progress);
+            }
+        });
+        source.addEventListener('done', event => {
+            source.close();
+            resolve(JSON.parse(event.data));
+        });
+        source.onerror = () => {
+            // 服务端按时关闭连接后 EventSource 会自动重连；连接被彻底关闭时改为轮询
+            if (source.readyState === EventSource.CLOSED) {
+                pollJob(jobId, onProgress).then(resolve, reject);
+            }
+        };
+    });
+}
+
+async function pollJob(jobId, onProgress) {
+    while (true) {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.error);
+        }
+        const job = data.data;
+        if (job.status === 'succeeded' || job.status === 'failed') {
+            return job;
+        }
+        if (job.progress && onProgress) {
+            onProgress(job.progress);
+        }
+        await new Promise(resolve => setTimeout(resolve, 2000));
+    }
+}
+
 // 分析文本难度
 async function analyzeDifficulty() {
     const text = document.getElementById('difficultyText').value.trim();
@@ -515,6 +569,18 @@ function showLoading(show) {
     document.getElementById('loading').style.display = show ? 'block' : 'none';
 }
 
+// 设置加载提示文字，传入 null 恢复默认
+function setLoadingText(text) {
+    const label = document.querySelector('#loading p');
+    if (!label) {
+        return;
+    }
+    if (label.dataset.defaultText === undefined) {
+        label.dataset.defaultText = label.textContent;
+    }
+    label.textContent = text === null ? label.dataset.defaultText : text;
+}
+
 // 显示成功消息
 function showSuccess(message) {
     const alert = document.createElement('div');
@@ -5,6 +5,7 @@ let currentSources = [];
 let currentPage = 1;
 let articlesPerPage = 12;
 let totalArticles = 0;
+let nextCursor = null;  // 服务端返回的下一页游标
 
 // 页面加载完成后初始化
 document.addEventListener('DOMContentLoaded', function() {
@@ -39,11 +40,11 @@ async function loadCategories() {
 // 加载来源列表
 async function loadSources() {
     try {
-        const response = await fetch('/api/articles?limit=1000');
+        const response = await fetch('/api/sources');
         const data = await response.json();
         
         if (data.success) {
-            const sources = [...new Set(data.data.map(article => article.source).filter(Boolean))];
+            const sources = data.data.map(source => source.name);
             currentSources = sources;
             
             const sourceSelect = document.getElementById('sourceFilter');
@@ -61,10 +62,9 @@ async function loadSources() {
     }
 }
 
-// 加载文章列表
+// 加载文章列表（服务端排序与分页）
 async function loadArticles(page = 1) {
     showLoading(true);
-    currentPage = page;
     
     try {
         const category = document.getElementById('categoryFilter').value;
@@ -72,29 +72,28 @@ async function loadArticles(page = 1) {
         const source = document.getElementById('sourceFilter').value;
         const sortOrder = document.getElementById('sortOrder').value;
         
-        let url = `/api/articles?limit=1000`;
+        let url = `/api/articles?limit=${articlesPerPage}&sort=${encodeURIComponent(sortOrder)}`;
         if (category) url += `&category=${encodeURIComponent(category)}`;
         if (difficulty) url += `&difficulty=${encodeURIComponent(difficulty)}`;
         if (source) url += `&source=${encodeURIComponent(source)}`;
         
+        // 顺序翻到下一页时使用游标，跳页时按页码
+        if (page === currentPage + 1 && nextCursor) {
+            url += `&cursor=${encodeURIComponent(nextCursor)}`;
+        } else if (page > 1) {
+            url += `&page=${page}`;
+        }
+        
         const response = await fetch(url);
         const data = await response.json();
         
         if (data.success) {
-            let articles = data.data;
-            
-            // 客户端排序
-            articles = sortArticles(articles, sortOrder);
-            
-            currentArticles = articles;
-            totalArticles = articles.length;
-            
-            // 分页处理
-            const startIndex = (currentPage - 1) * articlesPerPage;
-            const endIndex = startIndex + articlesPerPage;
-            const pageArticles = articles.slice(startIndex, endIndex);
+            currentPage = page;
+            currentArticles = data.data;
+            totalArticles = data.total;
+            nextCursor = data.next_cursor;
             
-            displayArticles(pageArticles);
+            displayArticles(currentArticles);
             updatePagination();
             updateArticleCount();
         } else {
@@ -108,26 +107,6 @@ async function loadArticles(page = 1) {
     }
 }
 
-// 排序文章
-function sortArticles(articles, sortOrder) {
-    switch (sortOrder) {
-        case 'newest':
-            return articles.sort((a, b) => new Date(b.created_at || b.publish_date) - new Date(a.created_at || a.publish_date));
-        case 'oldest':
-            return articles.sort((a, b) => new Date(a.created_at || a.publish_date) - new Date(b.created_at || b.publish_date));
-        case 'difficulty_asc':
-            return articles.sort((a, b) => (a.difficulty_score || 0) - (b.difficulty_score || 0));
-        case 'difficulty_desc':
-            return articles.sort((a, b) => (b.difficulty_score || 0) - (a.difficulty_score || 0));
-        case 'length_asc':
-            return articles.sort((a, b) => (a.word_count || 0) - (b.word_count || 0));
-        case 'length_desc':
-            return articles.sort((a, b) => (b.word_count || 0) - (a.word_count || 0));
-        default:
-            return articles;
-    }
-}
-
 // 显示文章列表
 function displayArticles(articles) {
     const articlesList = document.getElementById('articlesList');
@@ -291,6 +270,7 @@ async function searchArticles() {
             currentArticles = data.data;
             totalArticles = data.data.length;
             currentPage = 1;
+            nextCursor = null;
             
             const pageArticles = currentArticles.slice(0, articlesPerPage);
             displayArticles(pageArticles);
@@ -316,11 +296,13 @@ function clearSearch() {
     document.getElementById('difficultyFilter').value = '';
     document.getElementById('sourceFilter').value = '';
     document.getElementById('sortOrder').value = 'newest';
+    nextCursor = null;
     loadArticles(1);
 }
 
 // 筛选文章
 function filterArticles() {
+    nextCursor = null;
     loadArticles(1);
 }
 
@@ -346,21 +328,76 @@ async function crawlNewArticles() {
         
         const data = await response.json();
         
-        if (data.success) {
-            showSuccess(data.message);
+        if (!data.success) {
+            showError('爬取失败: ' + data.error);
+            return;
+        }
+        
+        // 爬取在后台执行，通过任务进度推送等待结果
+        const job = await watchJob(data.job_id, progress => {
+            setLoadingText(`已爬取 ${progress.crawled} 篇，已保存 ${progress.saved} 篇...`);
+        });
+        if (job.status === 'succeeded') {
+            showSuccess(job.result.message);
             loadArticles(1); // 重新加载文章列表
             loadSources(); // 重新加载来源列表
         } else {
-            showError('爬取失败: ' + data.error);
+            showError('爬取失败: ' + job.error);
         }
     } catch (error) {
         console.error('爬取失败:', error);
         showError('网络错误，请稍后重试');
     } finally {
+        setLoadingText(null);
         showLoading(false);
     }
 }
 
+// 等待后台任务结束，返回最终的任务信息；onProgress 接收任务的 progress
+// 优先使用 SSE（/api/jobs/<id>/events），不支持时每 2 秒轮询 /api/jobs/<id>
+function watchJob(jobId, onProgress) {
+    if (!window.EventSource) {
+        return pollJob(jobId, onProgress);
+    }
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`/api/jobs/${jobId}/events`);
+        source.addEventListener('progress', event => {
+            const job = JSON.parse(event.data);
+            if (job.progress && onProgress) {
+                onProgress(job.progress);
+            }
+        });
+        source.addEventListener('done', event => {
+            source.close();
+            resolve(JSON.parse(event.data));
+        });
+        source.onerror = () => {
+            // 服务端按时关闭连接后 EventSource 会自动重连；连接被彻底关闭时改为轮询
+            if (source.readyState === EventSource.CLOSED) {
+                pollJob(jobId, onProgress).then(resolve, reject);
+            }
+        };
+    });
+}
+
+async function pollJob(jobId, onProgress) {
+    while (true) {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.error);
+        }
+        const job = data.data;
+        if (job.status === 'succeeded' || job.status === 'failed') {
+            return job;
+        }
+        if (job.progress && onProgress) {
+            onProgress(job.progress);
+        }
+        await new Promise(resolve => setTimeout(resolve, 2000));
+    }
+}
+
 // 更新分页
 function updatePagination() {
     const totalPages = Math.ceil(totalArticles / articlesPerPage);
@@ -434,6 +471,18 @@ function showLoading(show) {
     document.getElementById('loading').style.display = show ? 'block' : 'none';
 }
 
+// 设置加载提示文字，传入 null 恢复默认
+function setLoadingText(text) {
+    const label = document.querySelector('#loading p');
+    if (!label) {
+        return;
+    }
+    if (label.dataset.defaultText === undefined) {
+        label.dataset.defaultText = label.textContent;
+    }
+    label.textContent = text === null ? label.dataset.defaultText : text;
+}
+
 // 显示成功消息
 function showSuccess(message) {
     const alert = document.createElement('div');
@@ -1,53 +1,68 @@
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lsa import LsaSummarizer
-from sumy.summarizers.luhn import LuhnSummarizer
-from sumy.summarizers.text_rank import TextRankSummarizer
-from sumy.summarizers.lex_rank import LexRankSummarizer
 import re
-import nltk
+import threading
 from collections import Counter
 import math
+from analyzed_text import AnalyzedText, english_stopwords
+
+class _PrecomputedWords:
+    """sumy 的分词接口：句子的词直接取自 AnalyzedText，不再重新分词"""
+
+    def __init__(self):
+        self._words = {}
+
+    def add(self, sentence_text, words):
+        self._words[sentence_text] = tuple(words)
+
+    def to_words(self, sentence_text):
+        return self._words.get(sentence_text, ())
 
 class ArticleSummarizer:
+    # 算法版本：结果会因实现调整而变化时加一，使分析结果缓存失效
+    ALGORITHM_VERSION = 1
+    
     def __init__(self):
-        # 下载必要的NLTK数据
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-        
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords')
-        
-        # 初始化不同的摘要器
-        self.summarizers = {
-            'lsa': LsaSummarizer(),
-            'luhn': LuhnSummarizer(),
-            'textrank': TextRankSummarizer(),
-            'lexrank': LexRankSummarizer()
-        }
-        
-        # 英文停用词
-        self.stop_words = set(nltk.corpus.stopwords.words('english'))
+        # sumy（会导入 nltk）与 NLTK 数据在首次生成摘要时才加载
+        self._summarizers = None
+        self._summarizers_lock = threading.Lock()
+    
+    @property
+    def summarizers(self):
+        """不同的摘要器，首次使用时创建"""
+        if self._summarizers is None:
+            with self._summarizers_lock:
+                if self._summarizers is None:
+                    from sumy.summarizers.lsa import LsaSummarizer
+                    from sumy.summarizers.luhn import LuhnSummarizer
+                    from sumy.summarizers.text_rank import TextRankSummarizer
+                    from sumy.summarizers.lex_rank import LexRankSummarizer
+                    
+                    self._summarizers = {
+                        'lsa': LsaSummarizer(),
+                        'luhn': LuhnSummarizer(),
+                        'textrank': TextRankSummarizer(),
+                        'lexrank': LexRankSummarizer()
+                    }
+        return self._summarizers
+    
+    @property
+    def stop_words(self):
+        """英文停用词"""
+        return english_stopwords()
     
     def generate_summary(self, text, method='textrank', sentences_count=3):
-        """生成文章摘要"""
+        """生成文章摘要（text 可以是 str 或 AnalyzedText）"""
+        doc = AnalyzedText.of(text)
+        text = doc.text
         if not text or len(text.strip()) < 200:
             return "文章内容过短，无法生成摘要。"
         
         try:
-            # 清理文本
-            cleaned_text = self._clean_text(text)
-            
             # 使用指定方法生成摘要
             if method in self.summarizers:
-                summary = self._extractive_summary(cleaned_text, method, sentences_count)
+                summary = self._extractive_summary(doc, method, sentences_count)
             else:
                 # 默认使用关键词提取方法
-                summary = self._keyword_based_summary(cleaned_text, sentences_count)
+                summary = self._keyword_based_summary(self._clean_text(text), sentences_count)
             
             return summary
             
@@ -58,14 +73,14 @@ class ArticleSummarizer:
     def _extractive_summary(self, text, method, sentences_count):
         """使用抽取式摘要方法"""
         try:
-            # 创建解析器
-            parser = PlaintextParser.from_string(text, Tokenizer("english"))
+            # 直接用 AnalyzedText 的分句与分词构建文档，不再由 sumy 解析
+            document = self._build_document(AnalyzedText.of(text))
             
             # 获取摘要器
             summarizer = self.summarizers[method]
             
             # 生成摘要
-            summary_sentences = summarizer(parser.document, sentences_count)
+            summary_sentences = summarizer(document, sentences_count)
             
             # 转换为文本
             summary = ' '.join([str(sentence) for sentence in summary_sentences])
@@ -74,7 +89,21 @@ class ArticleSummarizer:
             
         except Exception as e:
             print(f"抽取式摘要失败 ({method}): {e}")
-            return self._keyword_based_summary(text, sentences_count)
+            return self._keyword_based_summary(self._clean_text(str(text)), sentences_count)
+    
+    def _build_document(self, doc):
+        """由 AnalyzedText 构建 sumy 文档：句子文本经 _clean_text 清理，词取自已有分词"""
+        from sumy.models.dom import ObjectDocumentModel, Paragraph, Sentence
+        
+        tokenizer = _PrecomputedWords()
+        sentences = []
+        for sentence_text, words in zip(doc.sentences, doc.words_by_sentence):
+            cleaned = self._clean_text(sentence_text)
+            if not cleaned:
+                continue
+            tokenizer.add(cleaned, words)
+            sentences.append(Sentence(cleaned, tokenizer))
+        return ObjectDocumentModel([Paragraph(sentences)])
     
     def _keyword_based_summary(self, text, sentences_count):
         """基于关键词的摘要生成"""
@@ -7,6 +7,12 @@
 import sys
 import os
 
+def _remove_db_files(db_path):
+    """删除测试数据库及其 WAL/SHM 文件"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
 def test_imports():
     """测试所有模块导入"""
     print("🔍 测试模块导入...")
@@ -27,6 +33,12 @@ def test_imports():
         from classifier import ArticleClassifier
         print("✅ classifier.py 导入成功")
         
+        from rate_limiter import HostRateLimiter
+        print("✅ rate_limiter.py 导入成功")
+        
+        from extractor import extract_article_text
+        print("✅ extractor.py 导入成功")
+        
         from app import app
         print("✅ app.py 导入成功")
         
@@ -73,8 +85,9 @@ def test_database():
         print(f"✅ 获取分类成功，共 {len(categories)} 个分类")
         
         # 清理测试数据库
+        db.close()
         if os.path.exists("test.db"):
-            os.remove("test.db")
+            _remove_db_files("test.db")
             print("✅ 测试数据库已清理")
         
         return True
@@ -83,6 +96,1230 @@ def test_database():
         print(f"❌ 数据库测试失败: {e}")
         return False
 
+def test_database_pool():
+    """测试数据库连接池"""
+    print("\n🔌 测试数据库连接池...")
+    
+    try:
+        import threading
+        from database import DatabaseManager
+        
+        db = DatabaseManager("test_pool.db", pool_size=2)
+        
+        # WAL 模式与 PRAGMA 生效
+        with db.connection() as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            first_conn = conn
+        if journal_mode.lower() != 'wal':
+            print(f"❌ journal_mode 应为 wal，实际为 {journal_mode}")
+            return False
+        
+        # 连接归还后被复用，而不是每次新建
+        with db.connection() as conn:
+            if conn is not first_conn:
+                print("❌ 连接未被复用")
+                return False
+        print("✅ 连接复用正常")
+        
+        # 多线程并发读写不超过池上限
+        errors = []
+        def worker(n):
+            try:
+                for i in range(20):
+                    db.add_article({
+                        'title': f'Pool {n}-{i}',
+                        'content': 'pool test content',
+                        'url': f'https://example.com/pool/{n}/{i}'
+                    })
+                    db.get_articles(limit=5)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        if errors:
+            print(f"❌ 并发访问失败: {errors[0]}")
+            return False
+        if db._created > db.pool_size:
+            print(f"❌ 连接数超出上限: {db._created}")
+            return False
+        if len(db.get_articles(limit=1000)) != 120:
+            print("❌ 并发写入数量不正确")
+            return False
+        print("✅ 并发访问正常")
+        
+        db.close()
+        _remove_db_files("test_pool.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 连接池测试失败: {e}")
+        return False
+
+def test_bulk_insert():
+    """测试批量入库"""
+    print("\n📦 测试批量入库...")
+    
+    try:
+        from database import DatabaseManager
+        
+        db = DatabaseManager("test_bulk.db")
+        db.add_article({'title': 'Existing', 'content': 'existing content', 'url': 'https://example.com/bulk/0'})
+        
+        articles = [
+            {'title': f'Bulk {i}', 'content': 'bulk content', 'url': f'https://example.com/bulk/{i}'}
+            for i in range(5)
+        ]
+        articles.append({'title': 'Bulk 1 again', 'content': 'bulk content', 'url': 'https://example.com/bulk/1'})
+        
+        results = db.add_articles_bulk(articles, chunk_size=2)
+        duplicates = [r['duplicate'] for r in results]
+        if duplicates != [True, False, False, False, False, True]:
+            print(f"❌ 重复标记错误: {duplicates}")
+            return False
+        
+        inserted_ids = [r['id'] for r in results if not r['duplicate']]
+        if len(inserted_ids) != 4 or not all(inserted_ids):
+            print(f"❌ 插入ID错误: {inserted_ids}")
+            return False
+        
+        if db.get_article_by_id(inserted_ids[0])[1] != 'Bulk 1':
+            print("❌ 插入ID与文章不对应")
+            return False
+        
+        if len(db.get_articles(limit=100)) != 5:
+            print("❌ 批量入库数量不正确")
+            return False
+        print(f"✅ 批量入库成功: 新增 {len(inserted_ids)} 篇，重复 {duplicates.count(True)} 篇")
+        
+        db.close()
+        _remove_db_files("test_bulk.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 批量入库测试失败: {e}")
+        return False
+
+def test_pagination():
+    """测试键集分页"""
+    print("\n📄 测试键集分页...")
+    
+    try:
+        from database import DatabaseManager, ARTICLE_SORT_ORDERS
+        
+        db = DatabaseManager("test_page.db")
+        db.add_articles_bulk([{
+            'title': f'Page {i}',
+            'content': 'page content',
+            'url': f'https://example.com/page/{i}',
+            'source': 'BBC News' if i % 2 else 'CNN',
+            'word_count': i % 4,
+            'difficulty_score': None if i % 5 == 0 else float(i % 7)
+        } for i in range(25)])
+        
+        # 每种排序下逐页翻完，结果应与一次性查询完全一致且无重复
+        for sort in ARTICLE_SORT_ORDERS:
+            expected = [r[0] for r in db.get_articles_page(limit=100, sort=sort)[0]]
+            paged, cursor = [], None
+            while True:
+                rows, cursor = db.get_articles_page(limit=6, sort=sort, cursor=cursor)
+                paged.extend(r[0] for r in rows)
+                if not cursor:
+                    break
+            if paged != expected or len(set(paged)) != 25:
+                print(f"❌ 排序 {sort} 分页结果不一致")
+                return False
+        
+        # 来源筛选与总数
+        rows, _ = db.get_articles_page(limit=100, source='CNN')
+        if len(rows) != 13 or db.count_articles(source='CNN') != 13:
+            print("❌ 来源筛选或计数错误")
+            return False
+        
+        # 游标与排序方式不符时拒绝
+        _, cursor = db.get_articles_page(limit=6, sort='newest')
+        try:
+            db.get_articles_page(limit=6, sort='oldest', cursor=cursor)
+            print("❌ 未拒绝不匹配的游标")
+            return False
+        except ValueError:
+            pass
+        print("✅ 键集分页正常")
+        
+        db.close()
+        _remove_db_files("test_page.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 分页测试失败: {e}")
+        return False
+
+def test_field_projection():
+    """测试列表字段投影"""
+    print("\n✂️ 测试字段投影...")
+    
+    try:
+        from database import DatabaseManager, ARTICLE_LIST_FIELDS
+        
+        db = DatabaseManager("test_fields.db")
+        db.add_articles_bulk([{
+            'title': f'Fields {i}',
+            'content': 'full article body ' * 50,
+            'summary': 'short summary',
+            'url': f'https://example.com/fields/{i}'
+        } for i in range(3)])
+        
+        rows, cursor = db.get_articles_page(limit=2, fields=ARTICLE_LIST_FIELDS)
+        if len(rows[0]) != len(ARTICLE_LIST_FIELDS) or 'full article body' in str(rows):
+            print("❌ 列表投影仍包含正文")
+            return False
+        
+        # 投影不影响游标翻页
+        rows, _ = db.get_articles_page(limit=2, fields=('title', 'id'), cursor=cursor)
+        if [r[0] for r in rows] != ['Fields 0']:
+            print(f"❌ 投影后游标翻页错误: {rows}")
+            return False
+        
+        results = db.search_articles('summary', fields=('id', 'title'))
+        if len(results) != 3 or len(results[0]) != 2:
+            print("❌ 搜索投影错误")
+            return False
+        
+        try:
+            db.get_articles(fields=('id', 'password'))
+            print("❌ 未拒绝未知字段")
+            return False
+        except ValueError:
+            pass
+        print("✅ 字段投影正常")
+        
+        db.close()
+        _remove_db_files("test_fields.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 字段投影测试失败: {e}")
+        return False
+
+def test_stats_summary():
+    """测试增量统计汇总"""
+    print("\n📈 测试统计汇总...")
+    
+    try:
+        from database import DatabaseManager
+        
+        db = DatabaseManager("test_stats.db")
+        db.add_articles_bulk([{
+            'title': f'Stats {i}',
+            'content': 'stats content',
+            'url': f'https://example.com/stats/{i}',
+            'source': 'BBC News' if i % 2 else 'CNN',
+            'category': 'Technology' if i % 3 else 'Business',
+            'difficulty_level': 'Beginner' if i < 5 else 'Advanced',
+            'difficulty_score': None if i == 0 else float(i * 10)
+        } for i in range(10)])
+        
+        # 修改与删除后汇总表应与实时聚合一致
+        with db.connection() as conn:
+            conn.execute("UPDATE articles SET source = 'NPR', difficulty_score = 55 WHERE url = ?", ('https://example.com/stats/1',))
+            conn.execute("DELETE FROM articles WHERE url = ?", ('https://example.com/stats/2',))
+            conn.commit()
+            expected_sources = dict(conn.execute("SELECT source, COUNT(*) FROM articles GROUP BY source").fetchall())
+            expected_avg = conn.execute("SELECT AVG(difficulty_score) FROM articles").fetchone()[0]
+        
+        stats = db.get_stats()
+        if stats['total_articles'] != 9 or stats['scored_articles'] != 8:
+            print(f"❌ 文章计数错误: {stats['total_articles']}/{stats['scored_articles']}")
+            return False
+        if abs(stats['avg_difficulty_score'] - expected_avg) > 0.01:
+            print("❌ 平均难度错误")
+            return False
+        if dict(db.get_sources()) != expected_sources:
+            print(f"❌ 来源统计错误: {db.get_sources()}")
+            return False
+        if stats['difficulty_percentiles']['p50'] != 55.0 or not stats['last_update']:
+            print(f"❌ 分位数或更新时间错误: {stats['difficulty_percentiles']}")
+            return False
+        print("✅ 统计汇总正常")
+        
+        db.close()
+        _remove_db_files("test_stats.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 统计汇总测试失败: {e}")
+        return False
+
+def test_query_plans():
+    """测试列表类查询均命中索引"""
+    print("\n🧭 测试查询计划...")
+    
+    try:
+        import database
+        
+        db = database.DatabaseManager("test_plan.db")
+        if db.get_schema_version() < len(database.SCHEMA_MIGRATIONS):
+            print("❌ 结构迁移未执行")
+            return False
+        
+        queries = [
+            db._build_articles_query(20),
+            db._build_articles_query(20, category='Technology'),
+            db._build_articles_query(20, difficulty='Beginner'),
+            db._build_articles_query(20, category='Technology', difficulty='Beginner'),
+            db._build_articles_query(20, source='BBC News'),
+            db._build_articles_query(20, sort='oldest', after=('2024-01-01', 10)),
+            db._build_articles_query(20, sort='difficulty_desc', after=(50.0, 10)),
+            db._build_articles_query(20, sort='length_asc', after=(800, 10)),
+            (database._ARTICLE_BY_ID_SQL, (1,)),
+            (database._DIFFICULTY_STATS_SQL, ()),
+        ]
+        
+        for query, params in queries:
+            plan = db.explain_query_plan(query, params)
+            uses_index = all('USING' in step for step in plan if 'articles' in step)
+            if not uses_index or any('TEMP B-TREE' in step for step in plan):
+                print(f"❌ 查询未命中索引: {' '.join(query.split())} -> {plan}")
+                return False
+        print(f"✅ {len(queries)} 条查询均命中索引")
+        
+        db.close()
+        _remove_db_files("test_plan.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 查询计划测试失败: {e}")
+        return False
+
+def test_concurrent_crawler():
+    """测试并发抓取：全局/单域名并发上限、单源超时、取消与按源顺序合并（session 使用本地桩）"""
+    print("\n🕸️ 测试并发抓取...")
+    
+    try:
+        import time
+        import types
+        import threading
+        from crawler import ArticleCrawler
+        from database import DatabaseManager
+        
+        page = b'<html><body><article><p>' + b'A long enough paragraph of article text. ' * 10 + b'</p></article></body></html>'
+        def rss(feed):
+            items = ''.join(f"<item><title>{feed} {i}</title><link>https://{feed}.example.com/a/{i}</link></item>"
+                            for i in range(2))
+            return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{feed}</title>{items}</channel></rss>'.encode()
+        
+        class FakeSession:
+            """按 URL 的域名返回 RSS 或正文页面，记录同时进行的请求数"""
+            def __init__(self, delays=None):
+                self.delays = delays or {}
+                self.lock = threading.Lock()
+                self.active = {}
+                self.max_active = {}
+                self.requests = []
+            def _enter(self, key, delta):
+                self.active[key] = self.active.get(key, 0) + delta
+                self.max_active[key] = max(self.max_active.get(key, 0), self.active[key])
+            def get(self, url, timeout=None, **kwargs):
+                host = url.split('/')[2]
+                with self.lock:
+                    self.requests.append(url)
+                    self._enter('*', 1)
+                    self._enter(host, 1)
+                try:
+                    feed = host.split('.')[0]
+                    is_feed = url.endswith('/rss.xml')
+                    time.sleep(self.delays.get((feed, is_feed), 0.02))
+                    body = rss(feed) if is_feed else page
+                    return types.SimpleNamespace(url=url, content=body, status_code=200, headers={},
+                                                 raise_for_status=lambda: None)
+                finally:
+                    with self.lock:
+                        self._enter('*', -1)
+                        self._enter(host, -1)
+        
+        def make_crawler(session, **kwargs):
+            crawler = ArticleCrawler(rate_per_host=1000, burst_per_host=1000, **kwargs)
+            crawler.db.close()
+            crawler.db = DatabaseManager("test_concurrent_crawler.db")
+            crawler.page_cache = None
+            crawler.session = session
+            return crawler
+        def sources(*feeds):
+            return [(feed, f"https://{feed}.example.com/rss.xml", 'World') for feed in feeds]
+        
+        # 全局与单域名并发上限
+        session = FakeSession()
+        crawler = make_crawler(session, max_workers=3, per_host_limit=2)
+        urls = [f"https://{host}.example.com/p/{i}" for host in ('a', 'b') for i in range(6)]
+        threads = [threading.Thread(target=crawler._fetch, args=(url,)) for url in urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(session.requests) != len(urls) or session.max_active['*'] != 3 or \
+                max(session.max_active['a.example.com'], session.max_active['b.example.com']) != 2:
+            print(f"❌ 并发上限错误: {session.max_active}")
+            return False
+        
+        # 先完成的源先产出，crawl_feeds 仍按源的顺序合并
+        session = FakeSession({('slow', True): 0.3})
+        crawler = make_crawler(session, max_workers=4)
+        streamed = [a['source'] for a in crawler.iter_feeds(sources('slow', 'fast'), 5)]
+        merged = [a['title'] for a in crawler.crawl_feeds(sources('slow', 'fast'), 5)]
+        if streamed != ['fast', 'fast', 'slow', 'slow'] or merged != ['slow 0', 'slow 1', 'fast 0', 'fast 1']:
+            print(f"❌ 结果顺序错误: {streamed} / {merged}")
+            return False
+        
+        # 单个源超时：放弃未完成的正文，返回已得到的文章，不影响其他源
+        session = FakeSession({('stuck', False): 1.0})
+        crawler = make_crawler(session, max_workers=4, feed_timeout=0.3)
+        started = time.monotonic()
+        articles = crawler.crawl_feeds(sources('stuck', 'fast'), 5)
+        statuses = [(r['source'], r['status'], r['articles']) for r in crawler.last_crawl_report]
+        if statuses != [('stuck', 'timeout', 0), ('fast', 'ok', 2)] or len(articles) != 2 or \
+                time.monotonic() - started > 0.9:
+            print(f"❌ 单源超时处理错误: {statuses}")
+            return False
+        
+        # 取消：进行中的源尽快返回，未开始的源不再请求
+        session = FakeSession({(f'f{i}', True): 0.3 for i in range(6)})
+        crawler = make_crawler(session, max_workers=2)
+        threading.Timer(0.1, crawler.cancel).start()
+        started = time.monotonic()
+        articles = crawler.crawl_feeds(sources(*[f'f{i}' for i in range(6)]), 5)
+        statuses = [r['status'] for r in crawler.last_crawl_report]
+        if articles or statuses != ['cancelled'] * 6 or len(session.requests) != 2 or \
+                time.monotonic() - started > 0.9:
+            print(f"❌ 取消抓取错误: {statuses}，请求 {session.requests}")
+            return False
+        print("✅ 并发抓取正常")
+        
+        crawler.db.close()
+        _remove_db_files("test_concurrent_crawler.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 并发抓取测试失败: {e}")
+        return False
+
+def test_url_dedup():
+    """测试URL规范化与抓取前去重"""
+    print("\n🔗 测试URL去重...")
+    
+    try:
+        import sqlite3
+        from url_utils import canonicalize_url
+        from database import DatabaseManager
+        
+        same = [
+            'http://www.example.com/news/story-1/?utm_source=rss&utm_medium=feed#comments',
+            'https://example.com/news/story-1',
+            'https://EXAMPLE.com:443/news/story-1?fbclid=abc',
+        ]
+        if len({canonicalize_url(u) for u in same}) != 1:
+            print(f"❌ 规范化结果不一致: {[canonicalize_url(u) for u in same]}")
+            return False
+        if canonicalize_url('https://example.com/a?id=1') == canonicalize_url('https://example.com/a?id=2'):
+            print("❌ 误删了有意义的查询参数")
+            return False
+        
+        # 旧库（无 canonical_url 列）迁移时回填
+        conn = sqlite3.connect("test_dedup.db")
+        conn.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, author TEXT, content TEXT NOT NULL, summary TEXT, url TEXT UNIQUE, source TEXT, publish_date DATE, difficulty_level TEXT, difficulty_score REAL, category TEXT, tags TEXT, word_count INTEGER, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO articles (title, content, url) VALUES ('Old', 'old content', ?)", (same[0],))
+        conn.commit()
+        conn.close()
+        
+        db = DatabaseManager("test_dedup.db")
+        db.add_article({'title': 'New', 'content': 'new content', 'url': 'https://example.com/news/story-2?utm_campaign=x'})
+        
+        candidates = same[1:] + ['https://www.example.com/news/story-2/', 'https://example.com/news/story-3']
+        known = db.known_urls(candidates)
+        if known != set(candidates[:3]):
+            print(f"❌ 已入库URL识别错误: {known}")
+            return False
+        print("✅ URL去重正常")
+        
+        db.close()
+        _remove_db_files("test_dedup.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ URL去重测试失败: {e}")
+        return False
+
+def test_page_cache():
+    """测试页面磁盘缓存"""
+    print("\n💾 测试页面缓存...")
+    
+    try:
+        import shutil
+        import tempfile
+        from page_cache import PageCache
+        
+        class FakeResponse:
+            def __init__(self, url, content, status_code=200):
+                self.url = url
+                self.content = content
+                self.status_code = status_code
+                self.headers = {'Content-Type': 'text/html; charset=utf-8', 'Set-Cookie': 'x=1'}
+        
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = PageCache(cache_dir, ttl=3600, max_bytes=10 ** 6)
+            body = b'<html><p>' + b'cached paragraph ' * 200 + b'</p></html>'
+            url = 'https://example.com/news/a'
+            cache.put(url, FakeResponse(url, body))
+            cache.put('https://example.com/missing', FakeResponse('https://example.com/missing', b'', 404))
+            
+            # 按规范化 URL 命中，去掉了无关响应头
+            cached = cache.get('http://www.example.com/news/a/?utm_source=rss')
+            if cached is None or cached.content != body or 'Set-Cookie' in cached.headers:
+                print("❌ 缓存读取错误")
+                return False
+            if cache.get('https://example.com/missing') is not None:
+                print("❌ 非200响应不应缓存")
+                return False
+            if cache.get(url, max_age=-1) is not None or cache.get(url, max_age=float('inf')) is None:
+                print("❌ 过期判断错误")
+                return False
+            stats = cache.stats()
+            if stats['entries'] != 1 or stats['bytes'] >= len(body) or (stats['hits'], stats['misses']) != (2, 2):
+                print(f"❌ 缓存统计错误: {stats}")
+                return False
+            
+            # 超出容量时淘汰最久未访问的页面
+            small = PageCache(cache_dir, max_bytes=int(stats['bytes'] * 2.5))
+            small.put('https://example.com/news/b', FakeResponse('https://example.com/news/b', body + b'b'))
+            os.utime(small._path(url), (0, 0))
+            small.put('https://example.com/news/c', FakeResponse('https://example.com/news/c', body + b'c'))
+            if small.get(url) is not None or small.get('https://example.com/news/c') is None:
+                print("❌ LRU淘汰错误")
+                return False
+            print("✅ 页面缓存正常")
+            return True
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        
+    except Exception as e:
+        print(f"❌ 页面缓存测试失败: {e}")
+        return False
+
+def test_extractor():
+    """测试lxml正文抽取（使用 fixtures/html 下的页面）"""
+    print("\n📄 测试正文抽取...")
+    
+    try:
+        from extractor import extract_article_text, extract_links, extract_bbc_article, extract_cnn_article
+        
+        fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+        def load(name):
+            with open(os.path.join(fixtures_dir, name), 'rb') as f:
+                return f.read()
+        
+        # 首个容器文本过短时继续尝试后面的容器
+        text = extract_article_text(load('short_teaser_then_body.html'))
+        if 'Short teaser.' in text or len(text) < 200:
+            print("❌ 过短容器未被跳过")
+            return False
+        # 没有正文容器时退回全页段落；页脚段落也会被收入
+        if 'All rights reserved' not in extract_article_text(load('no_container.html')):
+            print("❌ 全页段落兜底失败")
+            return False
+        # 按页面声明的字符集解码，实体与行内标签正确展开
+        if 'Les cafés de la région' not in extract_article_text(load('latin1_charset.html')):
+            print("❌ 非UTF-8页面解码错误")
+            return False
+        text = extract_article_text(load('nested_inline.html'))
+        if 'Prices rose 3.2% in March, according\xa0to the ONS.' not in text or 'Café owners “struggle” — survey.' not in text:
+            print("❌ 行内标签或实体处理错误")
+            return False
+        if extract_article_text(b'') != '' or extract_links(b'') != []:
+            print("❌ 空页面处理错误")
+            return False
+        
+        bbc = extract_bbc_article(load('bbc_story.html'))
+        if bbc['title'] != 'Glaciers in the Alps shrinking faster than expected' or bbc['date'] != '2024-03-14T09:30:00.000Z':
+            print(f"❌ BBC页面抽取错误: {bbc['title']}")
+            return False
+        cnn = extract_cnn_article(load('cnn_story.html'))
+        if cnn['author'] != 'By Alex Chen, CNN' or 'Advertisement' not in cnn['content']:
+            print(f"❌ CNN页面抽取错误: {cnn['author']}")
+            return False
+        if extract_bbc_article(load('cnn_story.html')) is not None:
+            print("❌ 缺少正文容器时应返回 None")
+            return False
+        print("✅ 正文抽取正常")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 正文抽取测试失败: {e}")
+        return False
+
+def test_crawler_sources():
+    """测试BBC/CNN流式抓取接口（iter_*）与列表接口（crawl_*），_fetch 使用本地页面"""
+    print("\n📰 测试新闻源抓取...")
+    
+    try:
+        import types
+        from crawler import ArticleCrawler
+        from database import DatabaseManager
+        
+        fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+        def load(name):
+            with open(os.path.join(fixtures_dir, name), 'rb') as f:
+                return f.read()
+        
+        pages = {
+            'bbc.com/news/science-environment-68000001': load('bbc_story.html'),
+            'cnn.com/2024/03/14/world/glacier-story/index.html': load('cnn_story.html'),
+        }
+        index = (b'<html><body><a href="/news/science-environment-68000001">a</a>'
+                 b'<a href="/2024/03/14/world/glacier-story/index.html">b</a></body></html>')
+        fetched = []
+        def fake_fetch(self, url, timeout=10, **kwargs):
+            fetched.append(url)
+            body = next((page for suffix, page in pages.items() if url.endswith(suffix)), index)
+            return types.SimpleNamespace(url=url, content=body, status_code=200, headers={},
+                                         raise_for_status=lambda: None)
+        
+        crawler = ArticleCrawler()
+        crawler.db.close()
+        crawler.db = DatabaseManager("test_crawler.db")
+        crawler.page_cache = None
+        crawler._fetch = types.MethodType(fake_fetch, crawler)
+        
+        for source, iter_news, crawl_news in (
+            ('BBC News', crawler.iter_bbc_news, crawler.crawl_bbc_news),
+            ('CNN', crawler.iter_cnn_news, crawler.crawl_cnn_news),
+        ):
+            stream = iter_news(max_articles=10)
+            if isinstance(stream, list) or fetched:
+                print(f"❌ {source} 的 iter 接口应返回惰性生成器")
+                return False
+            streamed = list(stream)
+            listed = crawl_news(max_articles=10)
+            fetched.clear()
+            if not isinstance(listed, list) or len(streamed) != 1 or len(listed) != 1:
+                print(f"❌ {source} 抓取结果错误: {len(streamed)} / {listed!r:.80}")
+                return False
+            if streamed[0]['source'] != source or streamed[0]['url'] != listed[0]['url']:
+                print(f"❌ {source} 文章字段错误: {streamed[0]['source']} {streamed[0]['url']}")
+                return False
+        print("✅ 新闻源抓取正常")
+        
+        crawler.db.close()
+        _remove_db_files("test_crawler.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 新闻源抓取测试失败: {e}")
+        return False
+
+def test_pipeline():
+    """测试抓取→分析→入库流式流水线"""
+    print("\n🚰 测试流式流水线...")
+    
+    try:
+        import time
+        from database import DatabaseManager
+        from pipeline import ArticlePipeline
+        
+        db = DatabaseManager("test_pipeline.db")
+        produced = []
+        def fake_crawl():
+            for i in range(25):
+                produced.append(i)
+                url = 'https://example.com/dup' if i == 24 else f'https://example.com/p/{i}'
+                yield {'title': f'Article {i}', 'content': 'text ' * 50, 'url': url, 'source': 'Test'}
+        
+        def fake_process(article):
+            if article['title'] == 'Article 3':
+                raise ValueError('bad article')
+            time.sleep(0.002)
+            article['difficulty_level'] = 'Beginner'
+            return article
+        
+        progress = []
+        def on_progress(summary):
+            # 每批提交后数据库中已有对应文章，且上游没有远远跑在前面（背压）
+            progress.append((summary['saved'], db.count_articles(), len(produced)))
+        
+        db.add_article({'title': 'Existing', 'content': 'existing', 'url': 'https://example.com/dup'})
+        pipeline = ArticlePipeline(db, fake_process, queue_size=2, batch_size=5, progress=on_progress)
+        result = pipeline.run(fake_crawl())
+        
+        if (result['crawled'], result['processed'], result['failed']) != (25, 24, 1):
+            print(f"❌ 阶段计数错误: {result}")
+            return False
+        if (result['saved'], result['duplicates'], db.count_articles()) != (23, 1, 24):
+            print(f"❌ 入库结果错误: {result}")
+            return False
+        if len(progress) != 5 or any(saved + 1 != count for saved, count, _ in progress):
+            print(f"❌ 未按批提交: {progress}")
+            return False
+        # 一批 5 篇 + 两个队列各 2 篇 + 抓取/分析线程手中各 1 篇 + 处理失败的 1 篇
+        if progress[0][2] > 5 + 2 * 2 + 2 + 1:
+            print(f"❌ 上游未受背压限制: 第一批提交时已抓取 {progress[0][2]} 篇")
+            return False
+        if [stage['name'] for stage in result['stages']] != ['crawl', 'analyze', 'store']:
+            print(f"❌ 阶段统计错误: {result['stages']}")
+            return False
+        
+        # 入库阶段异常退出、分析阶段仍在处理时，run() 结束并抛出原异常，而不是卡住
+        import threading
+        def slow_process(article):
+            time.sleep(0.7)
+            return article
+        def failing_progress(summary):
+            raise RuntimeError('store failed')
+        failing = ArticlePipeline(db, slow_process, queue_size=1, analysis_workers=2, batch_size=1,
+                                  progress=failing_progress)
+        outcome = []
+        def run_failing():
+            try:
+                failing.run({'title': f'Slow {i}', 'content': 'text', 'url': f'https://example.com/slow/{i}'}
+                            for i in range(10))
+                outcome.append(None)
+            except RuntimeError as e:
+                outcome.append(str(e))
+        runner = threading.Thread(target=run_failing, daemon=True)
+        runner.start()
+        runner.join(timeout=10)
+        if runner.is_alive() or outcome != ['store failed']:
+            print(f"❌ 入库阶段失败后流水线未退出: {outcome}")
+            return False
+        print(f"✅ 流水线正常（{result['seconds']}s）")
+        
+        db.close()
+        _remove_db_files("test_pipeline.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 流式流水线测试失败: {e}")
+        return False
+
+def test_article_processor():
+    """测试文章分析执行器（单进程模式）及其与流水线的对接"""
+    print("\n🧮 测试文章分析执行器...")
+    
+    try:
+        from database import DatabaseManager
+        from pipeline import ArticlePipeline
+        from processor import ArticleProcessor
+        
+        class FakeAnalyzer:
+            def analyze_difficulty(self, text):
+                if 'broken' in str(text):
+                    raise ValueError('cannot analyze')
+                return {'difficulty_level': 'Beginner', 'difficulty_score': len(str(text).split())}
+        
+        class FakeSummarizer:
+            def generate_summary(self, text, sentences_count=3):
+                return str(text).split('.')[0]
+        
+        class FakeClassifier:
+            def classify_article(self, title, content, url=None, source=None):
+                return None
+            def extract_tags(self, title, content):
+                return ['news', 'test']
+            def classify_and_tag(self, title, content, url=None, source=None):
+                return {'category': None, 'tags': ['news', 'test']}
+        
+        processor = ArticleProcessor(workers=1, chunk_size=3,
+                                     components=(FakeAnalyzer(), FakeSummarizer(), FakeClassifier()))
+        articles = [
+            {'title': f'Article {i}', 'content': 'broken text.' if i == 4 else f'Sentence {i}. More words here.',
+             'url': f'https://example.com/proc/{i}', 'category': 'World'}
+            for i in range(7)
+        ]
+        
+        results = list(processor.process_all(dict(a) for a in articles))
+        errors = [error for _, error in results if error is not None]
+        done = [article for article, error in results if error is None]
+        if len(results) != 7 or errors != ['cannot analyze']:
+            print(f"❌ 分块处理结果错误: {results}")
+            return False
+        if [a['title'] for a in done] != [f'Article {i}' for i in range(7) if i != 4]:
+            print("❌ 处理结果顺序与输入不一致")
+            return False
+        first = done[0]
+        if (first['summary'], first['category'], first['tags'], first['difficulty_score']) != \
+                ('Sentence 0', 'World', 'news, test', 5):
+            print(f"❌ 分析结果错误: {first}")
+            return False
+        
+        options = processor.pipeline_options()
+        if (options['chunk_size'], options['analysis_workers']) != (3, 1):
+            print(f"❌ 流水线参数错误: {options}")
+            return False
+        db = DatabaseManager("test_processor.db")
+        pipeline = ArticlePipeline(db, processor.process, batch_size=2, **options)
+        result = pipeline.run(dict(a) for a in articles)
+        if (result['processed'], result['failed'], result['saved']) != (6, 1, 6):
+            print(f"❌ 流水线按块分析结果错误: {result}")
+            return False
+        processor.close()
+        
+        # 多个分析线程同时首次取进程池时只创建一个（子进程在提交任务时才启动）
+        import threading
+        parallel = ArticleProcessor(workers=2)
+        barrier = threading.Barrier(4)
+        pools = []
+        def get_pool():
+            barrier.wait()
+            pools.append(parallel._get_pool())
+        threads = [threading.Thread(target=get_pool) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        parallel.close()
+        if len(pools) != 4 or len({id(pool) for pool in pools}) != 1:
+            print(f"❌ 并发创建了 {len({id(pool) for pool in pools})} 个进程池")
+            return False
+        print("✅ 文章分析执行器正常")
+        
+        db.close()
+        _remove_db_files("test_processor.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 文章分析执行器测试失败: {e}")
+        return False
+
+def test_result_cache():
+    """测试分析结果缓存"""
+    print("\n🗃️ 测试分析结果缓存...")
+    
+    try:
+        from database import DatabaseManager
+        from pipeline import analyze_article
+        from result_cache import ResultCache, make_cache_key
+        
+        calls = []
+        def compute():
+            calls.append(1)
+            return {'score': len(calls)}
+        
+        cache = ResultCache(max_entries=2)
+        first = cache.get_or_compute('difficulty', 'Some  text\n', compute, version=1)
+        first['score'] = 99
+        # 空白差异视为同一文本；命中返回的是副本
+        if cache.get_or_compute('difficulty', ' Some text', compute, version=1) != {'score': 1} or len(calls) != 1:
+            print("❌ 相同文本未命中缓存")
+            return False
+        if make_cache_key('summary', 'x', {'a': 1}, 1) == make_cache_key('summary', 'x', {'a': 2}, 1) or \
+                make_cache_key('summary', 'x', None, 1) == make_cache_key('summary', 'x', None, 2):
+            print("❌ 参数或算法版本未区分缓存键")
+            return False
+        cache.get_or_compute('difficulty', 'other', compute, version=1)
+        cache.get_or_compute('difficulty', 'third', compute, version=1)
+        cache.get_or_compute('difficulty', 'Some text', compute, version=1)
+        stats = cache.stats()
+        if len(calls) != 4 or (stats['hits'], stats['misses'], stats['entries']) != (1, 4, 2):
+            print(f"❌ LRU 淘汰或计数错误: {stats}")
+            return False
+        
+        # SQLite 持久层：新的缓存实例（如重启后）直接读到已有结果
+        db = DatabaseManager("test_result_cache.db")
+        ResultCache(db=db).get_or_compute('summary', 'persisted text', lambda: 'summary', params={'n': 3})
+        warm = ResultCache(db=db)
+        value = warm.get_or_compute('summary', 'persisted text', lambda: 'recomputed', params={'n': 3})
+        if value != 'summary' or warm.stats()['components']['summary']['persistent_hits'] != 1:
+            print(f"❌ 持久层未命中: {value} {warm.stats()}")
+            return False
+        
+        # 抓取路径：内容相同的转载文章只分析一次
+        class CountingAnalyzer:
+            ALGORITHM_VERSION = 1
+            calls = 0
+            def analyze_difficulty(self, text):
+                CountingAnalyzer.calls += 1
+                return {'difficulty_level': 'Beginner', 'difficulty_score': 10}
+        class StubSummarizer:
+            ALGORITHM_VERSION = 1
+            def generate_summary(self, text, method='textrank', sentences_count=3):
+                return 'summary'
+        class StubClassifier:
+            ALGORITHM_VERSION = 1
+            model_version = 0
+            def classify_article(self, title, content, url=None, source=None):
+                return 'World'
+            def extract_tags(self, title, content):
+                return ['News']
+            def classify_and_tag(self, title, content, url=None, source=None):
+                return {'category': 'World', 'tags': ['News']}
+        components = (CountingAnalyzer(), StubSummarizer(), StubClassifier())
+        crawl_cache = ResultCache()
+        for source in ('Source A', 'Source B'):
+            article = {'title': 'Same story', 'content': 'Syndicated body text.', 'source': source,
+                       'url': f'https://example.com/{source[-1]}'}
+            analyze_article(article, *components, cache=crawl_cache)
+        if CountingAnalyzer.calls != 1 or article['tags'] != 'News':
+            print(f"❌ 转载文章被重复分析: {CountingAnalyzer.calls}")
+            return False
+        print(f"✅ 分析结果缓存正常（命中率 {crawl_cache.stats()['hit_rate']}）")
+        
+        db.close()
+        _remove_db_files("test_result_cache.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 分析结果缓存测试失败: {e}")
+        return False
+
+def test_job_queue():
+    """测试后台任务队列"""
+    print("\n🧵 测试后台任务...")
+    
+    try:
+        import time
+        import threading
+        from database import DatabaseManager
+        from jobs import JobQueue, is_finished
+        
+        db = DatabaseManager("test_jobs.db")
+        # 上次运行中断留下的任务（执行进程已不存在）
+        stale_id = db.create_job('crawl', {'source': 'all'}, owner='no-such-host:1')
+        db.update_job(stale_id, status='running')
+        
+        jobs = JobQueue(db)
+        stale = jobs.get(stale_id)
+        if stale['status'] != 'failed' or not stale['error']:
+            print(f"❌ 中断的任务未被标记失败: {stale}")
+            return False
+        
+        release = threading.Event()
+        def handler(params, report):
+            report({'done': 1})
+            release.wait(5)
+            report({'done': 2})
+            return {'total': params['n'] * 2}
+        def broken(params, report):
+            raise RuntimeError('boom')
+        jobs.register('double', handler)
+        jobs.register('broken', broken)
+        
+        job_id = jobs.submit('double', {'n': 21})
+        failed_id = jobs.submit('broken')
+        
+        deadline = time.time() + 5
+        while jobs.get(job_id)['progress'] != {'done': 1} and time.time() < deadline:
+            jobs.wait_for_change(0.1)
+        running = jobs.get(job_id)
+        if running['status'] != 'running' or running['started_at'] is None:
+            print(f"❌ 任务未在后台运行: {running}")
+            return False
+        
+        release.set()
+        while not (is_finished(jobs.get(job_id)) and is_finished(jobs.get(failed_id))) and time.time() < deadline:
+            jobs.wait_for_change(0.1)
+        done = jobs.get(job_id)
+        if (done['status'], done['result'], done['progress']) != ('succeeded', {'total': 42}, {'done': 2}):
+            print(f"❌ 任务结果错误: {done}")
+            return False
+        if done['version'] <= running['version'] or done['finished_at'] is None:
+            print(f"❌ 任务版本号未递增: {done}")
+            return False
+        failed = jobs.get(failed_id)
+        if failed['status'] != 'failed' or failed['error'] != 'boom':
+            print(f"❌ 失败任务状态错误: {failed}")
+            return False
+        try:
+            jobs.submit('unknown')
+            print("❌ 未知任务类型应抛出 ValueError")
+            return False
+        except ValueError:
+            pass
+        print("✅ 后台任务正常")
+        
+        db.close()
+        _remove_db_files("test_jobs.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 后台任务测试失败: {e}")
+        return False
+
+def test_feed_state():
+    """测试RSS条件请求状态的保存与读取"""
+    print("\n📡 测试RSS抓取状态...")
+    
+    try:
+        from datetime import datetime
+        from database import DatabaseManager, FEED_ENTRY_IDS_LIMIT
+        
+        db = DatabaseManager("test_feed_state.db")
+        feed_url = 'https://example.com/rss.xml'
+        if db.get_feed_state(feed_url) is not None:
+            print("❌ 未抓取过的RSS源不应有状态")
+            return False
+        
+        db.save_feed_state(feed_url, etag='"v1"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT',
+                           entry_ids=['a', 'b'], high_water=datetime(2024, 1, 1, 8, 30), status=200)
+        db.save_feed_state(feed_url, etag='"v2"', entry_ids=['c', 'a'] + [f'x{i}' for i in range(FEED_ENTRY_IDS_LIMIT)],
+                           high_water=datetime(2024, 1, 2), status=200)
+        db.touch_feed_state(feed_url, 304)
+        
+        state = db.get_feed_state(feed_url)
+        if state['etag'] != '"v2"' or state['last_modified'] is not None:
+            print(f"❌ 缓存验证器保存错误: {state}")
+            return False
+        if state['high_water'] != datetime(2024, 1, 2):
+            print(f"❌ 高水位保存错误: {state['high_water']}")
+            return False
+        ids = state['entry_ids']
+        if ids[:2] != ['c', 'a'] or len(ids) != FEED_ENTRY_IDS_LIMIT or 'b' in ids:
+            print(f"❌ 已见条目合并错误: {ids[:3]}... 共 {len(ids)} 个")
+            return False
+        
+        # 超出 max_articles 的条目留到下次；文章入库后才写入状态
+        import types
+        from crawler import ArticleCrawler
+        
+        items = ''.join(
+            f"<item><title>Story {i}</title><link>https://example.com/story/{i}</link><guid>story-{i}</guid>"
+            f"<pubDate>Mon, {10 - i:02d} Jun 2024 08:00:00 GMT</pubDate></item>"
+            for i in range(8)
+        )
+        rss = f'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>{items}</channel></rss>'.encode()
+        page = b'<html><body><article><p>' + b'A long enough paragraph of article text. ' * 10 + b'</p></article></body></html>'
+        def fake_fetch(self, url, timeout=10, headers=None, **kwargs):
+            if url != feed_url:
+                body, status = page, 200
+            elif (headers or {}).get('If-None-Match') == '"feed-v1"':
+                body, status = b'', 304
+            else:
+                body, status = rss, 200
+            return types.SimpleNamespace(url=url, content=body, status_code=status, headers={'ETag': '"feed-v1"'},
+                                         raise_for_status=lambda: None)
+        
+        crawler = ArticleCrawler()
+        crawler.db.close()
+        crawler.db = DatabaseManager("test_feed_state.db")
+        crawler.page_cache = None
+        crawler._fetch = types.MethodType(fake_fetch, crawler)
+        def poll():
+            crawler._reset_seen_urls()
+            return [a['title'] for a in crawler.crawl_rss_feed(feed_url, 'Test', 'World', max_articles=3)]
+        
+        first = poll()
+        # 文章未入库（如分析失败或进程中断）时不写入状态，下次重新抓取
+        if first != ['Story 0', 'Story 1', 'Story 2'] or crawler.commit_feed_states() != 0 or poll() != first:
+            print(f"❌ 未入库的条目不应记为已处理: {first}")
+            return False
+        polls = [first]
+        for _ in range(3):
+            crawler.db.add_articles_bulk([{'title': t, 'content': 'text', 'url': f"https://example.com/story/{t.split()[-1]}"}
+                                          for t in polls[-1]])
+            crawler.commit_feed_states()
+            polls.append(poll())
+        if polls[1:] != [['Story 3', 'Story 4', 'Story 5'], ['Story 6', 'Story 7'], []]:
+            print(f"❌ 分批抓取结果错误: {polls}")
+            return False
+        if crawler.db.get_feed_state(feed_url)['etag'] != '"feed-v1"':
+            print("❌ 条目全部处理后应保存缓存验证器")
+            return False
+        # max_articles=None 表示不限篇数
+        crawler.use_feed_cache = False
+        crawler.skip_known_urls = False
+        crawler._reset_seen_urls()
+        if len(crawler.crawl_rss_feed(feed_url, 'Test', 'World', max_articles=None)) != 8:
+            print("❌ 不限篇数时抓取结果错误")
+            return False
+        print("✅ RSS抓取状态正常")
+        
+        crawler.db.close()
+        db.close()
+        _remove_db_files("test_feed_state.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ RSS抓取状态测试失败: {e}")
+        return False
+
+def test_search_index():
+    """测试全文检索"""
+    print("\n🔎 测试全文检索...")
+    
+    try:
+        from database import DatabaseManager
+        
+        db = DatabaseManager("test_search.db")
+        if not db.fts_enabled:
+            print("⚠️ 当前 SQLite 不支持 FTS5，跳过全文检索测试")
+            db.close()
+            _remove_db_files("test_search.db")
+            return True
+        
+        db.add_article({
+            'title': 'Climate change summit opens',
+            'content': 'Leaders gathered to discuss emissions and renewable energy.',
+            'url': 'https://example.com/search/1'
+        })
+        db.add_article({
+            'title': 'Markets rally',
+            'content': 'Investors say climate change policy could reshape energy markets.',
+            'url': 'https://example.com/search/2'
+        })
+        
+        # bm25 排序：标题命中排在正文命中之前
+        results = db.search_articles('"climate change"')
+        if [r[1] for r in results] != ['Climate change summit opens', 'Markets rally']:
+            print(f"❌ 短语搜索结果或排序错误: {[r[1] for r in results]}")
+            return False
+        
+        # 前缀查询
+        if len(db.search_articles('renew*')) != 1:
+            print("❌ 前缀搜索失败")
+            return False
+        
+        # 触发器同步更新与删除
+        with db.connection() as conn:
+            conn.execute("UPDATE articles SET title = 'Budget vote' WHERE url = ?", ('https://example.com/search/1',))
+            conn.execute("DELETE FROM articles WHERE url = ?", ('https://example.com/search/2',))
+            conn.commit()
+        if db.search_articles('climate') or len(db.search_articles('budget')) != 1:
+            print("❌ 全文索引未随文章同步")
+            return False
+        
+        # 重建索引
+        if db.rebuild_search_index() != 1:
+            print("❌ 全文索引重建失败")
+            return False
+        print("✅ 全文检索正常")
+        
+        db.close()
+        _remove_db_files("test_search.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 全文检索测试失败: {e}")
+        return False
+
+def test_rate_limiter():
+    """测试域名限速器"""
+    print("\n🚦 测试域名限速器...")
+    
+    try:
+        from rate_limiter import TokenBucket, HostRateLimiter, parse_retry_after
+        
+        # 突发量内无需等待，之后按速率排队
+        bucket = TokenBucket(rate=10, burst=2)
+        now = bucket.updated
+        waits = [round(bucket.reserve(now), 2) for _ in range(4)]
+        if waits != [0.0, 0.0, 0.1, 0.2]:
+            print(f"❌ 令牌桶等待时间错误: {waits}")
+            return False
+        
+        # 不同域名互不影响；Retry-After 优先，否则指数退避
+        limiter = HostRateLimiter(rate=10, burst=1, backoff_base=2)
+        if limiter.acquire('a.example.com') or limiter.acquire('b.example.com'):
+            print("❌ 不同域名之间互相限速")
+            return False
+        if limiter.backoff('a.example.com', '30') != 30 or limiter.backoff('b.example.com') != 2 \
+                or limiter.backoff('b.example.com') != 4:
+            print("❌ 退避时间错误")
+            return False
+        limiter.record_success('b.example.com')
+        if limiter.backoff('b.example.com') != 2:
+            print("❌ 成功后未重置退避")
+            return False
+        
+        if parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') != 0 or parse_retry_after('soon') is not None:
+            print("❌ Retry-After 解析错误")
+            return False
+        print("✅ 域名限速器正常")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 限速器测试失败: {e}")
+        return False
+
+def test_analyzed_text():
+    """测试共享分词结构 AnalyzedText"""
+    print("\n🔤 测试共享分词结构...")
+    
+    try:
+        from analyzed_text import AnalyzedText
+        from difficulty_analyzer import DifficultyAnalyzer
+        from classifier import ArticleClassifier
+        
+        text = ("The committee approved the budget. It was a difficult decision! "
+                "Analysts said the economy would recover in 2025.")
+        doc = AnalyzedText(text)
+        if AnalyzedText.of(doc) is not doc or AnalyzedText.of(text).text != text:
+            print("❌ AnalyzedText.of 行为错误")
+            return False
+        if len(doc.sentences) != 3 or doc.sentences[1] != "It was a difficult decision!":
+            print(f"❌ 分句错误: {doc.sentences}")
+            return False
+        if doc.words[:3] != ['the', 'committee', 'approved'] or doc.token_count != len(text.split()):
+            print(f"❌ 分词错误: {doc.words}")
+            return False
+        if [len(words) for words in doc.words_by_sentence] != [5, 5, 7]:
+            print(f"❌ 按句分组错误: {doc.words_by_sentence}")
+            return False
+        if not (len(doc.syllables) == len(doc.stopword_mask) == len(doc.words)):
+            print("❌ 音节数/停用词标记与单词不对齐")
+            return False
+        if doc.stopword_mask[:2] != [True, False] or doc.syllables[1] != 3:
+            print(f"❌ 停用词或音节数错误: {doc.stopword_mask[:2]} {doc.syllables[:2]}")
+            return False
+        
+        # 组件接受 str 与 AnalyzedText 的结果一致
+        long_text = text * 3
+        analyzer = DifficultyAnalyzer()
+        classifier = ArticleClassifier()
+        long_doc = AnalyzedText(long_text)
+        if analyzer.analyze_difficulty(long_text) != analyzer.analyze_difficulty(long_doc):
+            print("❌ 难度分析结果与 str 输入不一致")
+            return False
+        if (classifier.classify_article('Budget', long_text), sorted(classifier.extract_tags('Budget', long_text))) != \
+                (classifier.classify_article('Budget', long_doc), sorted(classifier.extract_tags('Budget', long_doc))):
+            print("❌ 分类结果与 str 输入不一致")
+            return False
+        print("✅ 共享分词结构正常")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 共享分词结构测试失败: {e}")
+        return False
+
+def test_readability():
+    """测试单次计数可读性引擎与 textstat 一致"""
+    print("\n📏 测试可读性引擎...")
+    
+    try:
+        from benchmark import READABILITY_METRICS, readability_corpus, textstat_readability
+        from readability import readability, word_syllables
+        
+        texts = readability_corpus()
+        if len(texts) < 10:
+            print(f"❌ 可读性语料不足: {len(texts)} 篇")
+            return False
+        for text in texts + ["", "Hi.", "Two words"]:
+            expected = textstat_readability(text)
+            actual = readability(text)
+            diffs = {metric: abs(expected[metric] - actual[metric]) for metric in READABILITY_METRICS}
+            if max(diffs.values()) > 0.01 or expected['sentences'] != actual['counts']['sentences']:
+                print(f"❌ 与 textstat 不一致: {diffs} {text[:40]!r}")
+                return False
+        if word_syllables('education') != 4 or word_syllables.cache_info().hits == 0:
+            print("❌ 音节计数或缓存异常")
+            return False
+        print(f"✅ 可读性引擎与 textstat 一致（{len(texts)} 篇）")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 可读性引擎测试失败: {e}")
+        return False
+
 def test_difficulty_analyzer():
     """测试难度分析器"""
     print("\n📈 测试难度分析器...")
@@ -112,6 +1349,56 @@ def test_difficulty_analyzer():
         print(f"❌ 难度分析器测试失败: {e}")
         return False
 
+def test_batch_scoring():
+    """测试批量难度评分与全库重评"""
+    print("\n📊 测试批量难度评分...")
+    
+    try:
+        import rescore
+        from benchmark import readability_corpus
+        from database import DatabaseManager
+        from difficulty_analyzer import DifficultyAnalyzer
+        
+        analyzer = DifficultyAnalyzer()
+        texts = readability_corpus()[:8] + ['too short']
+        batch = analyzer.analyze_batch(texts)
+        if batch != [analyzer.analyze_batch([text])[0] for text in texts] or batch[-1]['difficulty_level'] != 'Unknown':
+            print("❌ 批量结果与逐篇结果不一致")
+            return False
+        buckets = [analyzer._determine_difficulty_level(score) for score in (29.99, 30, 69.99, 70)]
+        if buckets != ['Beginner', 'Intermediate', 'Advanced', 'Expert'] or \
+                analyzer._recommend_exam_level(45) != 'IELTS-6.0 / TOEFL-80':
+            print(f"❌ 等级划分错误: {buckets}")
+            return False
+        
+        db = DatabaseManager("test_rescore.db")
+        db.add_articles_bulk([
+            {'title': f'Article {i}', 'content': text, 'url': f'https://example.com/rescore/{i}',
+             'difficulty_level': 'Unknown', 'difficulty_score': 0}
+            for i, text in enumerate(texts)
+        ])
+        db.close()
+        result = rescore.main("test_rescore.db", batch_size=4)
+        db = DatabaseManager("test_rescore.db")
+        with db.connection() as conn:
+            stored = conn.execute("SELECT difficulty_level, difficulty_score FROM articles ORDER BY id").fetchall()
+        expected = [(r['difficulty_level'], r['difficulty_score']) for r in batch]
+        if result['scanned'] != len(texts) or result['changed'] != len(texts) - 1 or stored != expected:
+            print(f"❌ 重评结果错误: {result}")
+            return False
+        db.close()
+        if rescore.main("test_rescore.db")['changed'] != 0:
+            print("❌ 结果未变化时不应改写")
+            return False
+        print(f"✅ 批量难度评分正常（{len(texts)} 篇）")
+        
+        _remove_db_files("test_rescore.db")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 批量难度评分测试失败: {e}")
+        return False
+
 def test_summarizer():
     """测试摘要生成器"""
     print("\n📝 测试摘要生成器...")
@@ -160,6 +1447,14 @@ def test_classifier():
         category = classifier.classify_article(title, content)
         tags = classifier.extract_tags(title, content)
         
+        # 标题或正文为 None 时按空串处理
+        if classifier.classify_article(None, content) != category or \
+                classifier.extract_tags(None, content) != classifier.extract_tags('', content) or \
+                classifier.classify_and_tag(title, None)['category'] is None or \
+                classifier.classify_batch([None], [content])[0]['category'] != category:
+            print("❌ 标题或正文为 None 时分类失败")
+            return False
+        
         if category and tags:
             print(f"✅ 分类成功: {category}")
             print(f"✅ 标签提取成功: {tags}")
@@ -172,6 +1467,325 @@ def test_classifier():
         print(f"❌ 分类器测试失败: {e}")
         return False
 
+def test_keyword_matcher():
+    """测试分类关键词自动机"""
+    print("\n🔤 测试关键词自动机...")
+    
+    try:
+        from classifier import ArticleClassifier
+        from keyword_matcher import KeywordMatcher
+        
+        matcher = KeywordMatcher([('ai', 'ai'), ('machine learning', 'ml'), ('learning', 'learn'), ('student', 'student')])
+        found = list(matcher.scan("He said students are learning Machine-Learning; AI is everywhere."))
+        if sorted(found) != ['ai', 'learn', 'learn', 'ml', 'student']:
+            print(f"❌ 自动机匹配错误: {found}")
+            return False
+        
+        classifier = ArticleClassifier()
+        # 'said'/'are' 中的 'ai'/'ar' 不再计入 Technology
+        scores, tags = classifier._match_keywords("officials said the markets are calm, according to the bank")
+        if scores['Technology'] != 0 or scores['Business'] != 2 or tags != ['Interview']:
+            print(f"❌ 关键词得分错误: {scores} {tags}")
+            return False
+        if classifier._classify_by_url('https://example.com/article/health-news') != 'Health':
+            print("❌ URL 分类错误")
+            return False
+        
+        title, content = 'Stadium upgrade', 'The team won the match. ' * 20
+        combined = classifier.classify_and_tag(title, content)
+        if combined != {'category': classifier.classify_article(title, content),
+                        'tags': classifier.extract_tags(title, content)} or combined['category'] != 'Sports':
+            print(f"❌ 一次扫描的分类与标签不一致: {combined}")
+            return False
+        classifier.add_category_keywords('Space', ['space station', 'nasa'])
+        if classifier.classify_article('Launch', 'NASA sent a crew to the space station.') != 'Space':
+            print("❌ 新增关键词后未重建自动机")
+            return False
+        print(f"✅ 关键词自动机正常（{classifier.keyword_matcher.pattern_count} 个关键词）")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 关键词自动机测试失败: {e}")
+        return False
+
+def test_classify_batch():
+    """测试批量分类"""
+    print("\n📦 测试批量分类...")
+    
+    try:
+        import app as web
+        from benchmark import fixture_articles
+        from classifier import ArticleClassifier
+        from pipeline import cached_classification_batch
+        from result_cache import ResultCache
+        
+        classifier = ArticleClassifier()
+        articles = fixture_articles(12)
+        titles = [a['title'] for a in articles]
+        contents = [a['content'] for a in articles]
+        urls = [a['url'] for a in articles]
+        results = classifier.classify_batch(titles, contents, urls, top_k=2)
+        singles = [classifier.classify_and_tag(t, c, u) for t, c, u in zip(titles, contents, urls)]
+        if [{'category': r['category'], 'tags': r['tags']} for r in results] != singles:
+            print("❌ 批量分类与逐篇分类不一致")
+            return False
+        top = results[0]['top_categories']
+        if len(top) != 2 or top[0]['probability'] < top[1]['probability'] or not 0 < top[0]['probability'] <= 1:
+            print(f"❌ 候选分类错误: {top}")
+            return False
+        
+        # 训练模型后概率来自模型，按一次 predict_proba 计算
+        training = [{'title': a['title'], 'content': a['content'], 'category': ('Business', 'Health')[i % 2]}
+                    for i, a in enumerate(fixture_articles(20))]
+        classifier.train_classifier(training)
+        trained = classifier.classify_batch(titles, contents, top_k=5)
+        if any(abs(sum(c['probability'] for c in r['top_categories']) - 1) > 0.01 for r in trained) or \
+                {c['category'] for c in trained[0]['top_categories']} != {'Business', 'Health'}:
+            print(f"❌ 模型概率错误: {trained[0]['top_categories']}")
+            return False
+        
+        cache = ResultCache()
+        documents = [{'title': t, 'content': c} for t, c in zip(titles[:4], contents[:4])]
+        first = cached_classification_batch(classifier, documents, cache=cache)
+        second = cached_classification_batch(classifier, documents + [{'title': 'New', 'content': 'Fresh text.'}],
+                                             cache=cache)
+        if second[:4] != first or cache.stats()['hits'] != 4 or cache.stats()['misses'] != 5:
+            print(f"❌ 批量分类缓存错误: {cache.stats()}")
+            return False
+        
+        original_cache, web.analysis_cache = web.analysis_cache, ResultCache()
+        try:
+            with web.app.test_client() as client:
+                response = client.post('/api/classify/batch', json={'articles': documents, 'top_k': 1})
+                data = response.get_json()['data']
+                if response.status_code != 200 or data['count'] != 4 or len(data['results'][0]['top_categories']) != 1:
+                    print(f"❌ 批量分类接口错误: {response.status_code}")
+                    return False
+                if client.post('/api/classify/batch', json={'articles': []}).status_code != 400 or \
+                        client.post('/api/classify/batch', json={'articles': [{'url': 'x'}]}).status_code != 400 or \
+                        client.post('/api/classify/batch', json={'articles': [{'title': 42}]}).status_code != 400 or \
+                        client.post('/api/classify/batch', json={'articles': [{'title': 'T', 'content': ['x']}]}).status_code != 400:
+                    print("❌ 批量分类接口未校验参数")
+                    return False
+        finally:
+            web.analysis_cache = original_cache
+        print(f"✅ 批量分类正常（{len(results)} 篇）")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 批量分类测试失败: {e}")
+        return False
+
+def test_classifier_training():
+    """测试从数据库增量训练分类模型"""
+    print("\n🧠 测试分类模型训练...")
+    
+    try:
+        import shutil
+        from classifier import ArticleClassifier
+        from database import DatabaseManager
+        from trainer import ClassifierTrainer, OnlineTextModel
+        
+        texts = {
+            'Sports': 'The striker scored twice as the team won the league match in front of a packed stadium.',
+            'Health': 'Doctors say the new vaccine cut hospital admissions among elderly patients this winter.',
+        }
+        def articles(start, count, category=None):
+            labels = [category or ('Sports', 'Health')[i % 2] for i in range(start, start + count)]
+            return [{'title': f'Story {i}', 'content': f"{texts.get(label, texts['Sports'])} Item {i}.",
+                     'url': f'https://example.com/train/{i}', 'category': label}
+                    for i, label in zip(range(start, start + count), labels)]
+        
+        db = DatabaseManager("test_training.db")
+        db.add_articles_bulk(articles(0, 12))
+        classifier = ArticleClassifier()
+        trainer = ClassifierTrainer(classifier, db, model_path="test_models", batch_size=5)
+        result = trainer.update()
+        if not (result['mode'] == 'full' and result['trained'] == 12 and classifier.is_trained and
+                isinstance(classifier.ml_classifier, OnlineTextModel)):
+            print(f"❌ 全量训练失败: {result}")
+            return False
+        if classifier._classify_by_ml('the team won the match at the stadium') != 'Sports':
+            print("❌ 训练后的模型预测错误")
+            return False
+        
+        # 增量：只训练新文章；模型整体替换，旧模型不被修改
+        old_model, old_version = classifier.ml_classifier, classifier.model_version
+        db.add_articles_bulk(articles(12, 4) + articles(16, 1, category='Unknown') +
+                             [dict(articles(17, 1)[0], category='Weather')])
+        result = trainer.update()
+        if result['mode'] != 'incremental' or result['trained'] != 4 or result['skipped'] != 1 or \
+                classifier.ml_classifier is old_model or old_model.samples_seen != 12 or \
+                classifier.model_version == old_version:
+            print(f"❌ 增量训练错误: {result}")
+            return False
+        if trainer.update()['swapped']:
+            print("❌ 没有新文章时不应替换模型")
+            return False
+        
+        # 保存的模型可由新进程加载；全量训练纳入新分类
+        reloaded = ArticleClassifier()
+        if not ClassifierTrainer(reloaded, db, model_path="test_models").load() or \
+                reloaded.model_version != classifier.model_version:
+            print("❌ 模型保存/加载失败")
+            return False
+        # 分析子进程加载同一版本的模型（缓存键一致），主进程保存新版本后在下一块文章前重新加载
+        import processor
+        processor._init_worker(model_path="test_models")
+        worker_classifier = processor._worker_components[2]
+        if worker_classifier.model_version != classifier.model_version:
+            print(f"❌ 子进程未加载训练好的模型: {worker_classifier.model_version}")
+            return False
+        result = trainer.update(full=True)
+        if result['trained'] != 17 or 'Weather' not in classifier.ml_classifier.classes:
+            print(f"❌ 全量重训错误: {result}")
+            return False
+        processor._process_chunk_in_worker([])
+        if worker_classifier.model_version != classifier.model_version or \
+                'Weather' not in worker_classifier.ml_classifier.classes:
+            print(f"❌ 子进程未重新加载新模型: {worker_classifier.model_version}")
+            return False
+        processor._worker_components = processor._worker_model_path = processor._worker_model_version = None
+        print(f"✅ 分类模型训练正常（版本 {classifier.model_version}）")
+        
+        db.close()
+        _remove_db_files("test_training.db")
+        shutil.rmtree("test_models")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 分类模型训练测试失败: {e}")
+        return False
+
+def test_model_store():
+    """测试 .npy 模型目录"""
+    print("\n💾 测试模型存储...")
+    
+    try:
+        import copy
+        import pickle
+        import shutil
+        import numpy as np
+        import model_store
+        from classifier import ArticleClassifier
+        from trainer import OnlineTextModel
+        
+        texts = ['The team won the match at the stadium.', 'Doctors tested the vaccine on patients.',
+                 'The bank reported record profits this quarter.'] * 4
+        labels = ['Sports', 'Health', 'Business'] * 4
+        online = OnlineTextModel(['Sports', 'Health', 'Business'], n_features=2 ** 12)
+        online.partial_fit(texts, labels)
+        classifier = ArticleClassifier()
+        classifier.train_classifier([{'title': '', 'content': t, 'category': l} for t, l in zip(texts, labels)])
+        
+        root = "test_model_store"
+        shutil.rmtree(root, ignore_errors=True)
+        for model in (online, classifier.ml_classifier):
+            metadata = model_store.save_model(model, root, keep=1)
+            loaded = model_store.load_model(root, verify=True)
+            if not np.allclose(model.predict_proba(texts), loaded.predict_proba(texts)) or \
+                    list(loaded.predict(texts[:3])) != labels[:3]:
+                print(f"❌ {metadata['kind']} 模型加载后预测不一致")
+                return False
+        if model_store.list_versions(root) != ['v0002'] or metadata['training_size'] != 12 or \
+                metadata['classes'] != ['Business', 'Health', 'Sports']:
+            print(f"❌ 版本或元数据错误: {model_store.list_versions(root)} {metadata['training_size']}")
+            return False
+        
+        # 内存映射加载的模型复制后可以继续增量训练
+        model_store.save_model(online, root)
+        mapped = model_store.load_model(root)
+        if not isinstance(mapped.classifier.feature_log_prob_, np.memmap) or mapped.version != online.version:
+            print("❌ 未以内存映射方式加载")
+            return False
+        copy.deepcopy(mapped).partial_fit(texts[:3], labels[:3])
+        
+        # 文件损坏时校验失败
+        with open(os.path.join(root, 'v0003', 'class_count.npy'), 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\x01')
+        try:
+            model_store.load_model(root, verify=True)
+            print("❌ 未检测到文件损坏")
+            return False
+        except model_store.ModelStoreError:
+            pass
+        
+        # 多个 worker 同时保存时各得到不同的版本，CURRENT 指向最新版本
+        import threading
+        shutil.rmtree(root)
+        barrier = threading.Barrier(4)
+        saved = []
+        def save():
+            barrier.wait()
+            saved.append(model_store.save_model(online, root, keep=10)['version'])
+        threads = [threading.Thread(target=save) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        versions = model_store.list_versions(root)
+        if sorted(saved) != versions or len(versions) != 4 or model_store.current_version(root) != versions[-1] or \
+                any(model_store.verify_model(root, v)['version'] != v for v in versions):
+            print(f"❌ 并发保存错误: {saved} {versions}")
+            return False
+        
+        # 旧的 pickle 文件仍可加载
+        with open("test_model.pkl", 'wb') as f:
+            pickle.dump(online, f)
+        legacy = ArticleClassifier()
+        if not legacy.load_classifier("test_model.pkl") or legacy.model_version != online.version:
+            print("❌ 旧 pickle 模型加载失败")
+            return False
+        print("✅ 模型存储正常")
+        
+        shutil.rmtree(root)
+        os.remove("test_model.pkl")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 模型存储测试失败: {e}")
+        return False
+
+def test_lazy_startup():
+    """测试 import app 不加载重型依赖、组件按需创建"""
+    print("\n🚀 测试延迟初始化...")
+    
+    try:
+        import json
+        import subprocess
+        import tempfile
+        
+        here = os.path.dirname(os.path.abspath(__file__))
+        script = (
+            "import json, sys\n"
+            "import app as web\n"
+            "heavy = ('nltk', 'sumy', 'sklearn', 'jieba', 'crawler', 'feedparser')\n"
+            "loaded = sorted(m for m in heavy if m in sys.modules)\n"
+            "created = [c.initialized for c in (web.crawler, web.difficulty_analyzer, web.summarizer, web.classifier)]\n"
+            "web.warmup()\n"
+            "print(json.dumps({'loaded': loaded, 'created': created, 'nltk_after': 'nltk' in sys.modules,\n"
+            "                  'all_created': all(c.initialized for c in (web.crawler, web.summarizer, web.classifier))}))\n"
+        )
+        env = dict(os.environ, PYTHONPATH=here, ANALYSIS_CACHE_PERSISTENT='0')
+        env.pop('APP_WARMUP', None)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = subprocess.run([sys.executable, '-c', script], cwd=tmp, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if result['loaded'] or any(result['created']):
+            print(f"❌ import app 时已加载: {result['loaded']} {result['created']}")
+            return False
+        if not (result['nltk_after'] and result['all_created']):
+            print(f"❌ warmup() 未完成初始化: {result}")
+            return False
+        print("✅ 延迟初始化正常")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 延迟初始化测试失败: {e}")
+        return False
+
 def test_web_app():
     """测试Web应用"""
     print("\n🌐 测试Web应用...")
@@ -196,6 +1810,13 @@ def test_web_app():
                     print("✅ API路由正常")
                 else:
                     print(f"⚠️ API路由状态码: {response.status_code}")
+                
+                for payload in ({'max_articles': 'abc'}, {'max_articles': None}, {'max_articles': 0}):
+                    response = client.post('/api/crawl', json=payload)
+                    if response.status_code != 400 or response.get_json()['success']:
+                        print(f"❌ 爬取参数未校验: {payload} → {response.status_code}")
+                        return False
+                print("✅ 爬取参数校验正常")
             
             return True
         else:
@@ -215,9 +1836,35 @@ def main():
     tests = [
         ("模块导入", test_imports),
         ("数据库功能", test_database),
+        ("数据库连接池", test_database_pool),
+        ("批量入库", test_bulk_insert),
+        ("键集分页", test_pagination),
+        ("字段投影", test_field_projection),
+        ("统计汇总", test_stats_summary),
+        ("查询计划", test_query_plans),
+        ("域名限速器", test_rate_limiter),
+        ("并发抓取", test_concurrent_crawler),
+        ("URL去重", test_url_dedup),
+        ("RSS抓取状态", test_feed_state),
+        ("页面缓存", test_page_cache),
+        ("正文抽取", test_extractor),
+        ("新闻源抓取", test_crawler_sources),
+        ("流式流水线", test_pipeline),
+        ("文章分析执行器", test_article_processor),
+        ("分析结果缓存", test_result_cache),
+        ("后台任务", test_job_queue),
+        ("全文检索", test_search_index),
+        ("共享分词结构", test_analyzed_text),
+        ("可读性引擎", test_readability),
         ("难度分析器", test_difficulty_analyzer),
+        ("批量难度评分", test_batch_scoring),
         ("摘要生成器", test_summarizer),
         ("分类器", test_classifier),
+        ("关键词自动机", test_keyword_matcher),
+        ("批量分类", test_classify_batch),
+        ("分类模型训练", test_classifier_training),
+        ("模型存储", test_model_store),
+        ("延迟初始化", test_lazy_startup),
         ("Web应用", test_web_app)
     ]
     
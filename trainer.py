@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用数据库中已分类的文章训练 ArticleClassifier 的机器学习模型：
+  python trainer.py                  # 增量：只训练上次之后新入库的文章
+  python trainer.py --full           # 全量：从头训练全部文章
+  python trainer.py --model DIR      # 指定模型目录
+文章按 id 分批从 SQLite 读出，模型用 partial_fit 逐批更新，不一次读入全部正文；
+模型以版本目录的形式保存（见 model_store.py）。
+"""
+
+import argparse
+import copy
+import threading
+
+import model_store
+
+# 模型目录：其中每个版本一个子目录，CURRENT 指向当前版本
+DEFAULT_MODEL_PATH = model_store.DEFAULT_MODEL_ROOT
+
+class OnlineTextModel:
+    """可增量更新的文本分类模型：HashingVectorizer + MultinomialNB
+
+    哈希向量化没有词表，新文章直接 partial_fit，不需要全量重训；分类集合在创建时确定。
+    提供与 sklearn Pipeline 相同的 predict / predict_proba / classes_，可直接作为
+    ArticleClassifier 的 ml_classifier。last_article_id 记录已训练到的文章 id。
+    """
+
+    N_FEATURES = 2 ** 18
+
+    def __init__(self, classes, n_features=N_FEATURES, alpha=0.1):
+        # sklearn 在创建或加载模型时才导入，未训练过模型的进程不必加载
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+
+        self.classes = sorted(classes)
+        # 朴素贝叶斯要求非负特征，关闭哈希符号交替
+        self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, stop_words='english')
+        self.classifier = MultinomialNB(alpha=alpha)
+        self.samples_seen = 0
+        self.last_article_id = 0
+
+    @property
+    def classes_(self):
+        return self.classifier.classes_
+
+    @property
+    def version(self):
+        """训练数据的标识：训练到的文章 id 与样本数"""
+        return f"{self.last_article_id}:{self.samples_seen}"
+
+    def partial_fit(self, texts, labels):
+        self.classifier.partial_fit(self.vectorizer.transform(texts), labels, classes=self.classes)
+        self.samples_seen += len(texts)
+        return self
+
+    def predict(self, texts):
+        return self.classifier.predict(self.vectorizer.transform(texts))
+
+    def predict_proba(self, texts):
+        return self.classifier.predict_proba(self.vectorizer.transform(texts))
+
+class ClassifierTrainer:
+    """从数据库训练分类模型，保存到 model_path 并热替换到 classifier
+
+    每次 update 都在模型副本上训练，完成后整体替换（ArticleClassifier.swap_model），
+    正在进行的分类请求始终使用完整的旧模型或新模型；同一时间只运行一次训练。
+    """
+
+    def __init__(self, classifier, db, model_path=DEFAULT_MODEL_PATH, batch_size=500):
+        self.classifier = classifier
+        self.db = db
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+
+    def load(self):
+        """以内存映射方式加载当前版本的模型并替换到 classifier；没有已保存的模型时返回 False"""
+        if not self.model_path or not model_store.current_version(self.model_path):
+            return False
+        try:
+            model = model_store.load_model(self.model_path)
+        except Exception as e:
+            print(f"加载分类模型失败: {e}")
+            return False
+        self.classifier.swap_model(model)
+        return True
+
+    def save(self, model):
+        """保存为新的模型版本（写完后才切换 CURRENT，其他进程不会读到写了一半的模型）"""
+        return model_store.save_model(model, self.model_path)
+
+    def update(self, full=False, progress=None):
+        """训练并热替换模型
+
+        full=False 且当前模型是 OnlineTextModel 时只用 id 更大的新文章增量训练；否则从头训练。
+        增量训练时不在模型分类集合中的新分类会被跳过（计入 skipped），全量训练时纳入。
+        """
+        with self._lock:
+            current = self.classifier.ml_classifier
+            if full or not isinstance(current, OnlineTextModel):
+                mode = 'full'
+                classes = set(self.classifier.category_keywords) | set(self.db.get_labeled_categories())
+                model = OnlineTextModel(classes)
+            else:
+                mode = 'incremental'
+                model = copy.deepcopy(current)
+
+            trained = 0
+            skipped = 0
+            known = set(model.classes)
+            for rows in self.db.iter_labeled_articles(model.last_article_id, self.batch_size):
+                texts, labels = [], []
+                for _, title, content, category in rows:
+                    if category in known:
+                        texts.append(self.classifier._full_text(title or '', content or ''))
+                        labels.append(category)
+                    else:
+                        skipped += 1
+                if texts:
+                    model.partial_fit(texts, labels)
+                    trained += len(texts)
+                model.last_article_id = rows[-1][0]
+                if progress:
+                    progress({'mode': mode, 'trained': trained, 'skipped': skipped})
+
+            # 没有新样本时保留当前模型；从未训练过的模型不能用于预测
+            swapped = trained > 0 and model.samples_seen > 0
+            if swapped:
+                if self.model_path:
+                    self.save(model)
+                self.classifier.swap_model(model)
+            return {
+                'mode': mode,
+                'trained': trained,
+                'skipped': skipped,
+                'swapped': swapped,
+                'samples_seen': model.samples_seen,
+                'model_version': self.classifier.model_version,
+            }
+
+def main(db_path=None, model_path=DEFAULT_MODEL_PATH, full=False, batch_size=500):
+    from classifier import ArticleClassifier
+    from database import DatabaseManager
+
+    db = DatabaseManager(db_path) if db_path else DatabaseManager()
+    trainer = ClassifierTrainer(ArticleClassifier(), db, model_path=model_path, batch_size=batch_size)
+    if not full and trainer.load():
+        print(f"已加载模型 {model_path}（版本 {trainer.classifier.model_version}）")
+    result = trainer.update(
+        full=full, progress=lambda p: print(f"[训练] 已训练 {p['trained']} 篇，跳过 {p['skipped']} 篇")
+    )
+    if result['swapped']:
+        print(f"训练完成（{result['mode']}）：新增 {result['trained']} 篇，累计 {result['samples_seen']} 篇，"
+              f"模型已保存到 {model_path}")
+    else:
+        print("没有新的已分类文章，模型未变化")
+    db.close()
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="用数据库中的文章训练分类模型")
+    parser.add_argument('--db', default=None, help='数据库文件路径，默认与 Web 服务相同')
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help='模型目录')
+    parser.add_argument('--full', action='store_true', help='从头全量训练')
+    parser.add_argument('--batch-size', type=int, default=500, help='每批训练的文章数')
+    args = parser.parse_args()
+    # 通过模块名调用，保存的模型引用 trainer.OnlineTextModel 而不是 __main__ 中的类
+    import trainer
+    trainer.main(db_path=args.db, model_path=args.model, full=args.full, batch_size=args.batch_size)
@@ -0,0 +1,42 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 不影响页面内容的跟踪参数（小写比较）
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', 'ref', 'ref_src', 'referrer', 'cmpid', 'cmp',
+    'ocid', 'smid', 'smtyp', 'ito', 'guccounter', 'ncid', 'sr_share',
+    'taid', 'mbid',
+}
+TRACKING_PREFIXES = ('utm_', 'at_', 'pk_', 'mtm_')
+
+def canonicalize_url(url):
+    """把文章 URL 规范化为去重用的键
+
+    统一 http/https、小写域名并去掉 www. 与默认端口，删除锚点、
+    跟踪参数和路径末尾的斜杠，其余查询参数排序。结果只用于比较，
+    抓取时仍使用原始 URL。
+    """
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return url.strip()
+
+    host = parts.hostname.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(('https', host, path, urlencode(query), ''))